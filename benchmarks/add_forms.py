@@ -0,0 +1,72 @@
+"""
+Benchmark the conversion of form data into FormTable rows, as done for each form added with
+`LexibankWriter.add_form`.
+
+Compares `LexibankWriter._object_dict` with the previous implementation based on
+`dataclasses.asdict`.
+
+    python benchmarks/add_forms.py --forms 1000000
+"""
+import time
+import random
+import argparse
+import dataclasses
+
+from pylexibank.models import Lexeme
+from pylexibank.cldf import LexibankWriter, ID_PATTERN
+
+
+def synthetic_data(nforms, seed=42):
+    rng = random.Random(seed)
+    languages = [f'lang{i}' for i in range(500)]
+    concepts = [f'{i}_concept' for i in range(1000)]
+    graphemes = [chr(c) for c in range(0x61, 0x7B)]
+    for i in range(nforms):
+        segments = rng.choices(graphemes, k=rng.randint(2, 10))
+        yield dict(
+            ID=f'form-{i}',
+            Language_ID=rng.choice(languages),
+            Parameter_ID=rng.choice(concepts),
+            Value=''.join(segments),
+            Form=''.join(segments),
+            Segments=segments,
+            Graphemes=['^'] + segments + ['$'],
+            Source=['source2020'],
+        )
+
+
+def legacy(cls, **kw):
+    d = dataclasses.asdict(cls(**kw))
+    t = cls.__cldf_table__()
+    for key in ['ID', 'Language_ID', 'Parameter_ID', 'Cognateset_ID']:
+        if d.get(key) is not None:
+            d[key] = f'{d[key]}'
+            if not ID_PATTERN.match(d[key]):
+                raise ValueError(f'invalid CLDF identifier {t}-{key}: {d[key]}')
+    return d
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--forms', type=int, default=1000000)
+    args = parser.parse_args()
+
+    forms = list(synthetic_data(args.forms))
+
+    start = time.perf_counter()
+    fast = [LexibankWriter._object_dict(Lexeme, **kw) for kw in forms]
+    fast_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = [legacy(Lexeme, **kw) for kw in forms]
+    legacy_time = time.perf_counter() - start
+
+    assert fast == slow, 'results differ!'
+    print(f'{len(forms)} forms')
+    print(f'_object_dict:       {fast_time:.2f}s')
+    print(f'dataclasses.asdict: {legacy_time:.2f}s')
+    print(f'speedup: {legacy_time / fast_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark the consonant cluster analysis of `lexibank.consonant_clusters`.
+
+Compares `ConsonantClusters` with the previous implementation, which looked up the sound names of
+all segments of each morpheme and split them to get the sound class - after sorting all forms by
+ID. Requires a clone of the CLTS repository (or the test data in `tests/repos`):
+
+    python benchmarks/consonant_clusters.py --clts tests/repos --forms 500000
+"""
+import time
+import random
+import pathlib
+import argparse
+import operator
+import itertools
+import collections
+
+from pyclts import CLTS
+
+from pylexibank.forms import ConsonantClusters
+from pylexibank.transcription import SEGMENTS_CACHE
+
+CONSONANTS = 'p t k b d g m n s h l r w j ts tʃ pʰ kʷ ŋ'.split()
+VOWELS = 'a e i o u aː ə'.split()
+
+
+def synthetic_data(nforms, seed=42):
+    rng = random.Random(seed)
+    languages = [f'lang{i}' for i in range(500)]
+    for i in range(nforms):
+        segments = []
+        for _ in range(rng.randint(1, 4)):
+            if segments and rng.random() < 0.1:
+                segments.append('+')
+            segments.extend(rng.choices(CONSONANTS, k=rng.choice([0, 1, 1, 1, 2, 3])))
+            segments.append(rng.choice(VOWELS))
+        yield dict(
+            id=f'{i}',
+            languageReference=rng.choice(languages),
+            form=''.join(s for s in segments if s != '+'),
+            segments=segments)
+
+
+def legacy_clusters(segments, clts):
+    out = []
+    sounds = SEGMENTS_CACHE.sounds(clts)
+    for i, (grapheme, sound) in enumerate(zip(segments, [sounds[s].name for s in segments])):
+        sndcls = sound.split(" ")[-1]
+        if i == 0:
+            if sndcls in ["consonant", "cluster", "∼"]:
+                out.append([])
+        if sndcls in ["diphthong", "vowel", "tone", "�", "marker"]:
+            out.append([])
+        elif 'syllabic' in sound.split(" "):
+            out.append([])
+        else:
+            out[-1].append(grapheme)
+    return [chunk for chunk in out if chunk]
+
+
+def legacy(forms, clts, length):
+    by_lang = collections.defaultdict(lambda: collections.defaultdict(list))
+    for row in sorted(forms, key=operator.itemgetter('id')):
+        for morpheme in ' '.join(row['segments']).split(" + "):
+            for cluster in legacy_clusters(morpheme.split(), clts):
+                by_lang[tuple(cluster)][row["languageReference"]] += [row["form"]]
+    return {k: v for k, v in by_lang.items() if len(k) >= length}
+
+
+def engine(forms, clts, length):
+    by_lang = collections.defaultdict(lambda: collections.defaultdict(list))
+    clusters = ConsonantClusters(clts, min_length=length)
+    for row in forms:
+        for cluster in clusters(row['segments']):
+            by_lang[tuple(cluster)][row["languageReference"]].append(row["form"])
+    return by_lang
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clts', type=pathlib.Path, required=True)
+    parser.add_argument('--forms', type=int, default=500000)
+    parser.add_argument('--length', type=int, default=3)
+    args = parser.parse_args()
+
+    clts = CLTS(args.clts)
+    forms = list(synthetic_data(args.forms))
+    # Make sure the sound lookups are cached for both implementations:
+    SEGMENTS_CACHE.sounds(clts)(CONSONANTS + VOWELS + ['+'])
+
+    start = time.perf_counter()
+    fast = engine(forms, clts, args.length)
+    fast_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = legacy(forms, clts, args.length)
+    legacy_time = time.perf_counter() - start
+
+    def words(res):
+        return {k: sorted(itertools.chain(*v.values())) for k, v in res.items()}
+
+    assert words(fast) == words(slow), 'results differ!'
+    print(f'{len(forms)} forms, {len(fast)} clusters with length >= {args.length}')
+    print(f'  ConsonantClusters: {fast_time:.2f}s')
+    print(f'  legacy:            {legacy_time:.2f}s')
+    print(f'  speedup: {legacy_time / fast_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
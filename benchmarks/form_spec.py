@@ -0,0 +1,99 @@
+"""
+Benchmark the value-to-form processing with `FormSpec.split`.
+
+Compares the compiled `FormSpec` with the previous implementation based on
+`clldutils.text.split_text_with_context` and `clldutils.text.strip_brackets`, for values typical
+for ABVD (default `FormSpec`, plus replacements as used in many ABVD-based datasets) and
+Tower-of-Babel (the `FormSpec` of `pylexibank.providers.tob.TOB`) datasets.
+
+    python benchmarks/form_spec.py --values 500000
+"""
+import re
+import time
+import random
+import argparse
+
+from clldutils import text, misc
+
+from pylexibank.forms import FormSpec
+from pylexibank.providers.tob import TOB
+
+SPECS = {
+    'ABVD': FormSpec(replacements=[(' ', '_'), ('ŋ', 'ng'), ('?', 'ʔ')], missing_data=('-',)),
+    'TOB': TOB.form_spec,
+}
+COMMENTS = ['house', 'Fr.', 'obsolete', 'cf. tahi', 'loan', 'to go (away)']
+
+
+def synthetic_data(kind, nvalues, seed=42):
+    rng = random.Random(seed)
+    syllables = [c + v for c in 'ptkmnŋfshlrwv' for v in 'aeiou']
+
+    def word():
+        return ''.join(rng.choices(syllables, k=rng.randint(1, 4)))
+
+    for _ in range(nvalues):
+        r = rng.random()
+        if r < 0.6:  # The most common case: a plain form.
+            yield word()
+        elif r < 0.7:
+            yield f'{word()} {word()}'
+        elif r < 0.8:
+            yield f'{word()} ({rng.choice(COMMENTS)})'
+        elif r < 0.9:
+            yield rng.choice(
+                [', ', '; ', ' / '] + ([' ~ ', ','] if kind == 'TOB' else []),
+            ).join(word() for _ in range(rng.randint(2, 3)))
+        elif r < 0.95:
+            yield f'{word()}, {word()} ({rng.choice(COMMENTS)}, {word()})'
+        else:
+            yield rng.choice(['-', '?', ''])
+
+
+class LegacyFormSpec(FormSpec):
+    def clean(self, form, item=None):
+        if form not in self.missing_data:
+            for source, target in self.replacements:
+                form = form.replace(source, target)
+            if self.strip_inside_brackets:
+                form = text.strip_brackets(form, brackets=self.brackets)
+            if self.normalize_whitespace:
+                return re.sub(r'\s+', ' ', form.strip())
+            return form
+        return None
+
+    def split(self, item, value, lexemes=None):
+        res = misc.nfilter(
+            self.clean(form, item=item)
+            for form in text.split_text_with_context(
+                value, separators=self.separators, brackets=self.brackets))
+        return res[:1] if self.first_form_only else res
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--values', type=int, default=500000)
+    args = parser.parse_args()
+
+    for kind, spec in SPECS.items():
+        legacy = LegacyFormSpec(**{
+            k: getattr(spec, k) for k in FormSpec.__dataclass_fields__})
+        values = list(synthetic_data(kind, args.values))
+
+        start = time.perf_counter()
+        fast = [spec.split(None, v) for v in values]
+        fast_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        slow = [legacy.split(None, v) for v in values]
+        legacy_time = time.perf_counter() - start
+
+        assert fast == slow, 'results differ!'
+        print(f'{kind}: {len(values)} values')
+        print(f'  compiled FormSpec: {fast_time:.2f}s')
+        print(f'  clldutils.text:    {legacy_time:.2f}s')
+        print(f'  speedup: {legacy_time / fast_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
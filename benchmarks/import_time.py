@@ -0,0 +1,54 @@
+"""
+Benchmark the time it takes to import pylexibank, i.e. the startup latency of the `lexibank`
+commands and of dataset modules.
+
+Compares importing the lazily loaded package and the `Dataset` class with importing all modules
+which used to be imported eagerly by `pylexibank/__init__.py` - including LingPy. Each import is
+timed in a fresh interpreter; the minimum over all repetitions is reported. Pass `--budget` to fail
+if `import pylexibank` takes longer than the given number of milliseconds:
+
+    python benchmarks/import_time.py --repeat 5 --budget 100
+"""
+import sys
+import time
+import argparse
+import subprocess
+
+STATEMENTS = {
+    'import pylexibank': 'import pylexibank',
+    'from pylexibank import Dataset': 'from pylexibank import Dataset',
+    'eager (legacy)':
+        'import pylexibank.dataset, pylexibank.models, pylexibank.forms, pylexibank.metadata, '
+        'pylexibank.util, pylexibank.cldf, pylexibank.lingpy_util',
+}
+
+
+def timed(stmt, repeat):
+    res = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', stmt], check=True)
+        res.append(time.perf_counter() - start)
+    return min(res)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=None, help='Maximal milliseconds')
+    args = parser.parse_args()
+
+    baseline = timed('pass', args.repeat)
+    times = {name: timed(stmt, args.repeat) - baseline for name, stmt in STATEMENTS.items()}
+    print(f'interpreter startup: {baseline * 1000:.0f}ms (subtracted)')
+    for name, secs in times.items():
+        print(f'{name + ":":<32} {secs * 1000:.0f}ms')
+    print(f"speedup: {times['eager (legacy)'] / times['import pylexibank']:.1f}x")
+    if args.budget and times['import pylexibank'] * 1000 > args.budget:
+        print(f'import pylexibank exceeds the budget of {args.budget:.0f}ms')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
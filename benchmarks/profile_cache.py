@@ -0,0 +1,63 @@
+"""
+Benchmark loading an orthography profile with `Profile.from_file`.
+
+Compares reading a profile from the cache of compiled profiles with parsing the profile file - as
+done before, and still done when the profile file changed. Both include building the parse tree.
+
+    python benchmarks/profile_cache.py --rules 5000
+"""
+import time
+import random
+import pathlib
+import argparse
+import tempfile
+
+from pylexibank.profile import Profile, CompiledProfiles
+
+
+def synthetic_profile(path, nrules, seed=42):
+    rng = random.Random(seed)
+    chars = [chr(c) for c in range(0x61, 0x7B)] + [chr(c) for c in range(0xE0, 0x100)]
+    rules = {}
+    while len(rules) < nrules:
+        g = ''.join(rng.choices(chars, k=rng.randint(1, 4)))
+        rules[g] = ' '.join(g)
+    path.write_text(
+        'Grapheme\tIPA\tFrequency\n' + '\n'.join(
+            f'{g}\t{ipa}\t{rng.randint(1, 1000)}' for g, ipa in rules.items()),
+        encoding='utf8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rules', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        path = tmp / 'orthography.tsv'
+        synthetic_profile(path, args.rules)
+        cache = CompiledProfiles(tmp / 'cache')
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for p in cache.dir.glob('*.json'):
+                p.unlink()
+            parsed = Profile.from_file(path, form='NFC', cache=cache)
+        parse_time = (time.perf_counter() - start) / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            cached = Profile.from_file(path, form='NFC', cache=cache)
+        cached_time = (time.perf_counter() - start) / args.repeat
+
+        assert cached.graphemes == parsed.graphemes, 'results differ!'
+        print(f'{len(parsed.graphemes)} rules')
+        print(f'parse and compile (and cache): {parse_time * 1000:.1f}ms')
+        print(f'compiled profile from cache:   {cached_time * 1000:.1f}ms '
+              f'(speedup: {parse_time / cached_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
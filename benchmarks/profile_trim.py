@@ -0,0 +1,73 @@
+"""
+Benchmark trimming an orthography profile with `Profile.trim`.
+
+Compares trimming with a shared parse tree - skipping the rule to check - with the previous
+implementation, which re-created `Profile` and `segments.Tokenizer` for each rule to check. Since
+the previous implementation is prohibitively slow for big profiles, it is only timed on a sample
+of the rules to check and the total is extrapolated.
+
+    python benchmarks/profile_trim.py --rules 5000
+"""
+import time
+import random
+import argparse
+
+import segments
+
+from pylexibank.profile import Profile
+
+
+def synthetic_data(nrules, seed=42):
+    """
+    Profiles typically map single characters as well as many multi-character graphemes, some of
+    which are redundant.
+    """
+    rng = random.Random(seed)
+    chars = [chr(c) for c in range(0x61, 0x7B)] + [chr(c) for c in range(0xE0, 0x100)]
+    specs = {c: {'Grapheme': c, 'IPA': c} for c in chars}
+    while len(specs) < nrules:
+        g = ''.join(rng.choices(chars, k=rng.randint(2, 4)))
+        if rng.random() < 0.2:
+            g = '^' + g if rng.random() < 0.5 else g + '$'
+        ipa = ' '.join(c for c in g if c not in '^$')
+        specs[g] = {'Grapheme': g, 'IPA': ipa if rng.random() < 0.7 else ipa.replace(' ', '')}
+    return list(specs.values())
+
+
+def legacy_redundant(specs, grapheme, ipa):
+    t = segments.Tokenizer(profile=Profile(*[dict(s) for s in specs if s['Grapheme'] != grapheme]))
+    return t(grapheme, column='IPA') == ipa
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rules', type=int, default=5000)
+    parser.add_argument('--sample', type=int, default=50, help='Rules to check with Tokenizer')
+    args = parser.parse_args()
+
+    specs = synthetic_data(args.rules)
+    profile = Profile(*[dict(s) for s in specs])
+    candidates = [s for s in specs if len(s['Grapheme']) > 1]
+
+    start = time.perf_counter()
+    removed = profile.trim()
+    trim_time = time.perf_counter() - start
+
+    # The candidates are checked longest first - i.e. before any shorter graphemes are removed,
+    # thus the first checks in the sample are not affected by earlier removals:
+    sample = sorted(candidates, key=lambda s: -len(s['Grapheme']))[:args.sample]
+    start = time.perf_counter()
+    legacy = [legacy_redundant(specs, s['Grapheme'], s['IPA']) for s in sample]
+    legacy_time = (time.perf_counter() - start) * len(candidates) / len(sample)
+
+    for s, redundant in zip(sample, legacy):
+        if not s['Grapheme'].startswith('^') and not s['Grapheme'].endswith('$'):
+            assert redundant == (s['Grapheme'] not in profile.graphemes), 'results differ!'
+    print(f'{len(specs)} rules, {len(candidates)} to check, {removed} removed')
+    print(f'shared parse tree:     {trim_time:.2f}s')
+    print(f'Profile and Tokenizer: {legacy_time:.2f}s (extrapolated from {len(sample)} rules)')
+    print(f'speedup: {legacy_time / trim_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
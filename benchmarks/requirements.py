@@ -0,0 +1,52 @@
+"""
+Benchmark the requirements snapshot written by `LexibankWriter.write`.
+
+Compares `pylexibank.util.iter_requirements` - reading the metadata of the installed
+distributions once per session - with the previous implementation, which loaded all lexibank
+dataset entry points (i.e. imported all installed dataset modules) and ran `pip freeze`:
+
+    python benchmarks/requirements.py --repeat 5
+"""
+import time
+import argparse
+
+from cldfbench.util import iter_requirements, get_entrypoints
+
+from pylexibank import util
+
+
+def legacy():
+    exclude = {'egg=' + ep.load().__module__ for ep in get_entrypoints(util.ENTRY_POINT)}
+    return [req for req in iter_requirements() if not any(mod in req for mod in exclude)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    reqs = [str(r) for r in util.iter_requirements()]
+    first_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        _ = [str(r) for r in util.iter_requirements()]
+    cached_time = (time.perf_counter() - start) / args.repeat
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        old = legacy()
+    legacy_time = (time.perf_counter() - start) / args.repeat
+
+    # pip freeze lists editable installs differently, so only compare pinned requirements:
+    assert {r for r in old if '==' in r} <= set(reqs), 'results differ!'
+    print(f'{len(reqs)} requirements')
+    print(f'importlib.metadata (first call): {first_time * 1000:.1f}ms')
+    print(f'importlib.metadata (cached):     {cached_time * 1000:.1f}ms')
+    print(f'entry points and pip freeze:     {legacy_time * 1000:.1f}ms')
+    print(f'speedup: {legacy_time / first_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark applying the replacements of etc/segments.csv to segmented forms.
+
+Compares the compiled `SegmentReplacer` with the chained `iter_repl` calls used before. Since the
+chained approach is prohibitively slow for large tables, it is only timed on a sample of the forms
+and the total is extrapolated.
+
+    python benchmarks/segment_replacement.py --forms 100000 --rules 3000
+"""
+import time
+import random
+import argparse
+
+from pylexibank.util import iter_repl, SegmentReplacer
+
+
+def synthetic_data(nforms, nrules, seed=42):
+    """
+    Rules map sequences involving "bad" segments to sequences of "good" segments - as is typical
+    for etc/segments.csv - and forms contain bad segments every now and then.
+    """
+    rng = random.Random(seed)
+    good = [chr(c) + m for c in range(0x61, 0x7B) for m in ['', 'ʰ', 'ʲ', 'ʷ', 'ː']]
+    bad = [chr(0x250 + i % 90) + str(i) for i in range(nrules)]
+    rules = {}
+    while len(rules) < nrules:
+        source = rng.choices(good, k=rng.randint(0, 2))
+        source.insert(rng.randint(0, len(source)), rng.choice(bad))
+        rules[' '.join(source)] = ' '.join(rng.choices(good, k=rng.randint(1, 2)))
+    forms = [
+        [rng.choice(bad) if rng.random() < 0.05 else rng.choice(good)
+         for _ in range(rng.randint(2, 12))]
+        for _ in range(nforms)]
+    return rules, forms
+
+
+def chained(rules, segments):
+    for k, v in rules.items():
+        segments = list(iter_repl(segments, k.split(), v.split()))
+    return segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--forms', type=int, default=100000)
+    parser.add_argument('--rules', type=int, default=3000)
+    parser.add_argument('--sample', type=int, default=500, help='Forms to run through iter_repl')
+    args = parser.parse_args()
+
+    rules, forms = synthetic_data(args.forms, args.rules)
+
+    start = time.perf_counter()
+    replacer = SegmentReplacer(rules)
+    compiled = [replacer(f) for f in forms]
+    compiled_time = time.perf_counter() - start
+
+    sample = forms[:args.sample]
+    start = time.perf_counter()
+    legacy = [chained(rules, f) for f in sample]
+    legacy_time = (time.perf_counter() - start) * len(forms) / len(sample)
+
+    assert legacy == compiled[:len(sample)], 'results differ!'
+    print(f'{len(forms)} forms, {len(rules)} rules')
+    print(f'SegmentReplacer: {compiled_time:.2f}s')
+    print(f'iter_repl chain: {legacy_time:.2f}s (extrapolated from {len(sample)} forms)')
+    print(f'speedup: {legacy_time / compiled_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
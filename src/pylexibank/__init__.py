@@ -1,11 +1,51 @@
 """
 pylexibank - extends cldfbench to curate Lexibank datasets.
+
+The public API is imported lazily - i.e. only when accessed - because importing it pulls in heavy
+dependencies like cldfbench, pycldf or pyconcepticon, which is not needed to, e.g., list the
+commands of the `lexibank` CLI.
 """
-from pylexibank.dataset import *  # noqa: F401, F403
-from pylexibank.models import *  # noqa: F401, F403
-from pylexibank.forms import *  # noqa: F401, F403
-from pylexibank.metadata import *  # noqa: F401, F403
-from pylexibank.util import *  # noqa: F401, F403
-from pylexibank.cldf import *  # noqa: F401, F403
+import importlib
 
 __version__ = '4.0.1.dev0'
+
+# Maps names of the public API to the modules they are defined in:
+_API = {
+    'Dataset': 'dataset',
+    'Language': 'models',
+    'Lexeme': 'models',
+    'Concept': 'models',
+    'Cognate': 'models',
+    'CONCEPTICON_CONCEPTS': 'models',
+    'concepticon_concepts': 'models',
+    'FormSpec': 'forms',
+    'ConsonantClusters': 'forms',
+    'compute_consonant_cluster': 'forms',
+    'LexibankMetadata': 'metadata',
+    'check_standard_title': 'metadata',
+    'get_creators_and_contributors': 'metadata',
+    'progressbar': 'util',
+    'iter_repl': 'util',
+    'LexibankWriter': 'cldf',
+}
+# Submodules which used to be available as attributes after `import pylexibank`:
+_MODULES = {
+    'dataset', 'models', 'forms', 'metadata', 'util', 'cldf',
+    'profile', 'transcription', 'report', 'lingpy_util'}
+
+__all__ = list(_API)
+
+
+def __getattr__(name):
+    if name in _API:
+        value = getattr(importlib.import_module(f'{__name__}.{_API[name]}'), name)
+        # Cache the object, so `__getattr__` is only called for the first access:
+        globals()[name] = value
+        return value
+    if name in _MODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_API))
@@ -4,12 +4,16 @@ Functionality bridging cldfbench and pycldf datasets.
 import re
 import logging
 import pathlib
+import operator
 import textwrap
+import zipfile
 import functools
 import collections
 import collections.abc
 import dataclasses
-from typing import Optional, Any, Callable, Union
+import multiprocessing
+import concurrent.futures
+from typing import Optional, Any, Callable, Union, BinaryIO
 
 from csvw.metadata import Column
 from pycldf.dataset import Wordlist
@@ -17,17 +21,71 @@ from pycldf.sources import Source
 from pyconcepticon.api import Concept
 
 from cldfbench.cldf import CLDFWriter
-from cldfbench.util import iter_requirements, get_entrypoints
 
-from pylexibank.transcription import analyze_segments
-from pylexibank.util import iter_repl, get_concepts, get_ids_and_attrs, ENTRY_POINT
-from pylexibank.lingpy_util import iter_alignments
+from pylexibank.transcription import analyze_segments, Analysis, Report, SEGMENTS_CACHE
+from pylexibank.sounds import Sound
+from pylexibank.incremental import SegmentationCache
+from pylexibank.glottolog import GlottologIndex
+from pylexibank.util import SegmentReplacer, get_concepts, get_ids_and_attrs, iter_requirements
 
 __all__ = ['LexibankWriter']
 log = logging.getLogger('pylexibank')
 
 MD_NAME = 'cldf-metadata.json'
 ID_PATTERN = re.compile(r'[A-Za-z0-9_\-]+$')
+# Columns of LanguageTable filled with data from Glottolog, mapped to `Languoid` attributes:
+GLOTTOLOG_COLUMNS = [
+    ('Latitude', 'latitude'),
+    ('Longitude', 'longitude'),
+    ('Glottolog_Name', 'name'),
+    ('ISO639P3code', 'iso'),
+    ('Family', 'family'),
+    ('Macroarea', 'macroarea'),
+]
+# Tables which are written incrementally in streaming mode:
+STREAMED_TABLES = ('FormTable', 'CognateTable')
+# The writer whose pending forms are processed by the worker processes of a process pool. Since
+# workers are forked from the writing process, they inherit the dataset's tokenizer and CLTS data.
+_FORKED_WRITER = None
+
+
+def _process_forms(chunk, with_morphemes):  # pragma: no cover
+    """Entry point for worker processes."""
+    return _FORKED_WRITER.process_forms(chunk, with_morphemes)
+
+
+@functools.cache
+def _fields(cls) -> tuple[tuple[str, ...], Callable[[Any], tuple]]:
+    """The field names of a dataclass and a function extracting the field values from an object."""
+    names = tuple(f.name for f in dataclasses.fields(cls))
+    getter = operator.attrgetter(*names)
+    return names, getter if len(names) > 1 else lambda obj: (getter(obj),)
+
+
+@functools.lru_cache(maxsize=2 ** 16)
+def _valid_reference(value: str) -> bool:
+    """Validate an identifier - typically repeated in many rows - as CLDF ID."""
+    return bool(ID_PATTERN.match(value))
+
+
+@dataclasses.dataclass
+class ProcessedForms:
+    """Results of segmenting and analyzing a chunk of forms, see `LexibankWriter.process_forms`."""
+    # Triples (item, bad, invalid):
+    forms: list[tuple[dict[str, Any], bool, bool]]
+    # Transcription analyses by language ID:
+    analyses: dict[str, Analysis]
+    # Sounds newly looked up in CLTS:
+    sounds: list[Sound]
+    # Pair (hits, misses) of sound cache lookups:
+    sound_lookups: tuple[int, int] = (0, 0)
+    # New entries for the segmentation cache in incremental mode:
+    segmentations: dict[str, list] = dataclasses.field(default_factory=dict)
+    # Keys of the entries of the segmentation cache used:
+    segmentations_used: dict[str, set] = dataclasses.field(default_factory=dict)
+    segmentation_lookups: tuple[int, int] = (0, 0)
+    # Pair (hits, misses) of lookups of memoized tokenizer results:
+    tokenizer_lookups: tuple[int, int] = (0, 0)
 
 
 @dataclasses.dataclass
@@ -35,17 +93,108 @@ class Options:
     """The Lexibank writer object is somewhat configurable."""
     keep_languages: bool = False
     keep_parameters: bool = False
+    # In streaming mode, FormTable and CognateTable rows are written to their CSV files while being
+    # added, rather than collected in memory.
+    stream: bool = False
+
+
+@dataclasses.dataclass
+class StreamedTable:
+    """A table written to its CSV file while rows are added, see `Options.stream`."""
+    path: pathlib.Path
+    file: BinaryIO
+    # The header row as written by csvw:
+    header: bytes
+    rows: int = 0
+
+
+class StreamedObjects(collections.abc.MutableMapping):
+    """
+    The rows collected by a `LexibankWriter` in streaming mode.
+
+    Since rows of streamed tables are not kept in memory, accessing them raises a `ValueError`.
+    """
+    def __init__(self, objects: dict[str, list]):
+        self._objects = objects
+
+    def __getitem__(self, table: str) -> list:
+        if table in STREAMED_TABLES:
+            raise ValueError(f'Rows of {table} are not available in streaming mode')
+        return self._objects[table]
+
+    def __setitem__(self, table: str, rows: list):
+        self._objects[table] = rows
+
+    def __delitem__(self, table: str):
+        del self._objects[table]
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def __len__(self):
+        return len(self._objects)
 
 
 class LexibankWriter(CLDFWriter):
     """
     A Lexibank-specific CLDFWriter.
+
+    When run with `workers`, segmentation and transcription analysis of forms is done in worker
+    processes. Rows are still added to `objects` in order. But the rows returned by `add_form`
+    only contain the data passed in - and are validated and completed with segmentation data when
+    the results of the workers are merged. Thus, these rows are final only after calling `flush` or
+    accessing `objects`.
+
+    In streaming mode (see `Options`), rows of FormTable and CognateTable are written to the CSV
+    files in batches of `buffer_size` rows. Thus, these rows are not available via `objects`.
     """
+    # Number of forms sent to a worker process at once:
+    chunk_size = 500
+    # Number of rows of a streamed table kept in memory before being written to the CSV file:
+    buffer_size = 10000
+
     def __init__(self, dataset=None, **kw):
         super().__init__(dataset=dataset, **kw)
         self._count = collections.defaultdict(int)
         self._cognate_count = collections.defaultdict(int)
         self.options = Options(**getattr(dataset, 'writer_options', {}))
+        # Forms waiting to be segmented and analyzed by worker processes:
+        self._pending: list[tuple[dict, dict, Optional[str]]] = []
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        # The CSV files of streamed tables:
+        self._streams: dict[str, StreamedTable] = {}
+        # In streaming mode, we keep track of the languages and parameters referenced by forms:
+        self._refs: dict[str, set[str]] = {'Language_ID': set(), 'Parameter_ID': set()}
+
+    @property
+    def objects(self) -> collections.abc.MutableMapping[str, list]:
+        """
+        The rows collected so far - including the results for all pending forms.
+
+        In streaming mode, accessing the rows of FormTable or CognateTable raises a `ValueError`.
+        """
+        self.flush()
+        return StreamedObjects(self._objects) if self.options.stream else self._objects
+
+    @objects.setter
+    def objects(self, value):
+        self._objects = value
+
+    @functools.cached_property
+    def workers(self) -> int:
+        """
+        Number of worker processes to use for segmentation and transcription analysis.
+
+        Worker processes are forked from the current process, so parallel processing is only
+        available on platforms supporting the "fork" start method.
+        """
+        workers = getattr(self.args, 'workers', None)
+        if not isinstance(workers, int) or workers < 2:
+            return 0
+        if 'fork' not in multiprocessing.get_all_start_methods():  # pragma: no cover
+            log.warning('Parallel processing not supported on this platform')
+            return 0
+        return workers
 
     def write(self, **kw):
         """Write the collected data to disk."""
@@ -54,14 +203,10 @@ class LexibankWriter(CLDFWriter):
                 ('dc:title', "lingpy-rcParams"), ('dc:relation', 'lingpy-rcParams.json')])])
 
         super().write(**kw)
-        # We rewrite requirements.txt, excluding all lexibank dataset modules:
-        exclude = {'egg=' + ep.load().__module__ for ep in get_entrypoints(ENTRY_POINT)}
-        reqs = []
-        for req in iter_requirements():
-            if not any(mod in req for mod in exclude):
-                reqs.append(req)
-
-        self.cldf_spec.dir.joinpath('requirements.txt').write_text('\n'.join(reqs), encoding='utf8')
+        # We rewrite requirements.txt, excluding all lexibank datasets:
+        self.cldf_spec.dir.joinpath('requirements.txt').write_text(
+            '\n'.join(str(req) for req in iter_requirements(exclude_datasets=True)),
+            encoding='utf8')
 
     def __enter__(self):
         super().__enter__()
@@ -110,27 +255,89 @@ class LexibankWriter(CLDFWriter):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        global _FORKED_WRITER  # pylint: disable=W0603
+        try:
+            self.flush()
+        finally:
+            if self._pool:
+                self._pool.shutdown()
+                self._pool, _FORKED_WRITER = None, None
+        if self.segmentation_cache:
+            # Only prune the cache after a complete run:
+            self.segmentation_cache.save(prune=exc_type is None)
+            log.info(
+                'Incremental build: %s forms tokenized, %s forms replayed from cache',
+                self.segmentation_cache.misses, self.segmentation_cache.hits)
         for table in ['FormTable', 'LanguageTable', 'ParameterTable']:
-            self.objects.setdefault(table, [])
-        if not self.objects.get('CognateTable'):
+            self._objects.setdefault(table, [])
+        if self.options.stream:
+            for table in STREAMED_TABLES:
+                if self._objects.get(table) or table in self._streams:
+                    self._write_rows(table)
+        if not (self._objects.get('CognateTable') or 'CognateTable' in self._streams):
             self.cldf.tablegroup.tables = [
                 t for t in self.cldf.tables if str(t.url) != 'cognates.csv']
-            if 'CognateTable' in self.objects:
-                del self.objects['CognateTable']
+            if 'CognateTable' in self._objects:
+                del self._objects['CognateTable']
         for fk, table in [('Parameter_ID', 'ParameterTable'), ('Language_ID', 'LanguageTable')]:
             if (table == 'ParameterTable' and self.options.keep_parameters) or \
                     (table == 'LanguageTable' and self.options.keep_languages):
                 continue  #
             # If opt-in, we only add concepts and languages that are referenced by forms.
-            refs = set(obj[fk] for obj in self.objects['FormTable'])
-            self.objects[table] = [obj for obj in self.objects[table] if obj['ID'] in refs]
-        super().__exit__(exc_type, exc_val, exc_tb)
+            refs = self._refs[fk] if self.options.stream \
+                else set(obj[fk] for obj in self._objects['FormTable'])
+            self._objects[table] = [obj for obj in self._objects[table] if obj['ID'] in refs]
+        try:
+            for table in list(self._streams):
+                self._close_stream(table)
+            super().__exit__(exc_type, exc_val, exc_tb)
+        finally:
+            for stream in self._streams.values():  # pragma: no cover
+                stream.file.close()
+            self._streams = {}
+
+    def _write_rows(self, table: str):
+        """Write the rows of a streamed table collected so far to the CSV file."""
+        t = self.cldf[table]
+        # We let csvw format the rows - including the header row:
+        rows = self._objects[table]
+        data = t.write(rows, fname=None)
+        if table not in self._streams:
+            path = pathlib.Path(str(t.url.resolve(t.base)))
+            self._streams[table] = StreamedTable(path, path.open('wb'), data.splitlines(True)[0])
+        stream = self._streams[table]
+        if not data.startswith(stream.header):
+            raise ValueError(f'Columns of {table} changed after rows have been written')
+        self._objects[table] = []
+        stream.file.write(data if not stream.rows else data[len(stream.header):])
+        stream.file.flush()
+        stream.rows += len(rows)
+
+    def _close_stream(self, table: str):
+        """Finish writing a streamed table, i.e. zip the CSV file if requested."""
+        stream = self._streams.pop(table)
+        stream.file.close()
+        self.cldf[table].common_props['dc:extent'] = stream.rows
+        if table in (self.cldf_spec.zipped or ()):
+            with zipfile.ZipFile(
+                    stream.path.parent / f'{stream.path.name}.zip',
+                    'w',
+                    compression=zipfile.ZIP_DEFLATED) as zipf:
+                zipf.write(stream.path, arcname=stream.path.name)
+            stream.path.unlink()
+        # Make sure the table is not written again:
+        self._objects.pop(table, None)
 
     @functools.cached_property
     def with_morphemes(self) -> bool:
         """Do we have morpheme segmentation on top of phonemes?"""
         return '+' in self['FormTable', 'Segments'].separator
 
+    @functools.cached_property
+    def segment_replacer(self) -> SegmentReplacer:
+        """The segment replacements of etc/segments.csv, compiled once per run."""
+        return SegmentReplacer(self.dataset.segments)
+
     def add_sources(self, *args: Union[str, Source]):
         """Add sources to the dataset."""
         if not args and self.dataset.raw_dir.joinpath('sources.bib').exists():
@@ -148,9 +355,46 @@ class LexibankWriter(CLDFWriter):
         self._cognate_count[kw['Form_ID']] += 1
         return f"{kw['Form_ID']}-{self._cognate_count[kw['Form_ID']]}"
 
+    @functools.cached_property
+    def glottolog_index(self) -> Optional[GlottologIndex]:
+        """Glottolog data to enrich languages with."""
+        if (not getattr(self.args, 'dev', False)) and hasattr(self.args, 'glottolog'):
+            return GlottologIndex(self.args.glottolog.api)
+        if self.dataset.glottolog:
+            return GlottologIndex(self.dataset.glottolog)
+        return None
+
+    def glottolog_data(self, languages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Look up the Glottolog data to enrich languages with - unless running in dev mode.
+
+        :param languages: `list` of `dict`s describing languages, linked to Glottolog via key \
+        `Glottocode`.
+        :return: `list` of `dict`s, mapping the enrichment columns to Glottolog data for each \
+        language.
+        """
+        if getattr(self.args, 'dev', False) or not hasattr(self.args, 'glottolog'):
+            return [{} for _ in languages]
+        glangs = self.glottolog_index.languoids(
+            kw['Glottocode'] for kw in languages if kw.get('Glottocode'))
+        return [
+            {key: getattr(glangs[kw['Glottocode']], attribute)
+             for key, attribute in GLOTTOLOG_COLUMNS}
+            if kw.get('Glottocode') in glangs else {}
+            for kw in languages]
+
+    @functools.cached_property
+    def segmentation_cache(self) -> Optional[SegmentationCache]:
+        """In incremental mode, tokenizer results are cached across runs."""
+        if getattr(self.args, 'incremental', False) is True and self.dataset.tokenizer:
+            return SegmentationCache(self.dataset)
+        return None
+
     def tokenize(self, item, string, **kw) -> Optional[list[str]]:
         """Tokenize a string."""
         if self.dataset.tokenizer:
+            if self.segmentation_cache:
+                return self.segmentation_cache(self.dataset.tokenizer, item, string, **kw)
             return self.dataset.tokenizer(item, string, **kw)
         return None
 
@@ -169,9 +413,13 @@ class LexibankWriter(CLDFWriter):
         if not all([language, concept, value, form, segments]):
             raise ValueError('language, concept, value, form, and segments must be supplied')
 
+        if self.workers:
+            kw.update(ID=self.lexeme_id(kw), Form=form)
+            return self._add_pending_form(kw)
+
         # Correct segments according to mapping in etc/segments.csv:
-        for k, v in self.dataset.segments.items():
-            segments = list(iter_repl(segments, k.split(), v.split()))
+        if self.segment_replacer:
+            segments = self.segment_replacer(segments)
         kw['Segments'] = segments
         kw.update(ID=self.lexeme_id(kw), Form=form)
         self.analyze_segments(kw)
@@ -200,6 +448,9 @@ class LexibankWriter(CLDFWriter):
         if form and form not in self.dataset.form_spec.missing_data:
             # try to segment the data now
             profile = kw.pop('profile', None)
+            if self.workers:
+                kw.update(ID=self.lexeme_id(kw), Form=form)
+                return self._add_pending_form(kw, profile=profile)
             kw.setdefault(
                 'Segments',
                 self.tokenize(kw, form, **({'profile': profile} if profile else {})) or [])
@@ -210,6 +461,109 @@ class LexibankWriter(CLDFWriter):
             return self._add_object(self.dataset.lexeme_class, **kw)
         return None  # pragma: no cover
 
+    def _add_pending_form(self, kw, profile=None):
+        """
+        Add a form row now - and queue it for segmentation and analysis by a worker process.
+        """
+        # The row is validated and completed when merging the results, see `flush`. Segments passed
+        # with the form are corrected in the worker process.
+        row = dict(kw)
+        self._objects['FormTable'].append(row)
+        self._obj_index['FormTable'].add(row['ID'])
+        self._pending.append((row, kw, profile))
+        if len(self._pending) >= self.chunk_size * self.workers:
+            self.flush()
+        return row
+
+    def process_forms(
+            self,
+            chunk: list[tuple[dict[str, Any], Optional[str]]],
+            with_morphemes: bool,
+    ) -> 'ProcessedForms':
+        """
+        Segment and analyze a chunk of forms.
+        """
+        report, res = Report(), []
+        sounds = SEGMENTS_CACHE.sounds(self.args.clts.api)
+        hits, misses = sounds.cache.hits, sounds.cache.misses
+        cache = self.segmentation_cache
+        if cache:
+            chits, cmisses = cache.hits, cache.misses
+        tokenizer_cache = self.dataset.tokenizer_cache
+        thits, tmisses = tokenizer_cache.hits, tokenizer_cache.misses
+        for item, profile in chunk:
+            if item.get('Segments') is None:
+                item['Segments'] = self.tokenize(
+                    item, item['Form'], **({'profile': profile} if profile else {})) or []
+            bad, invalid = report.stats.bad_words_count, report.stats.invalid_words_count
+            if item['Segments']:
+                if self.segment_replacer:
+                    item['Segments'] = self.segment_replacer(item['Segments'])
+                analyze_segments(self.args.clts.api, item, report, with_morphemes)
+            res.append((
+                item,
+                report.stats.bad_words_count > bad,
+                report.stats.invalid_words_count > invalid))
+        result = ProcessedForms(
+            forms=res,
+            analyses=report.by_language,
+            sounds=sounds.new,
+            sound_lookups=(sounds.cache.hits - hits, sounds.cache.misses - misses),
+            tokenizer_lookups=(tokenizer_cache.hits - thits, tokenizer_cache.misses - tmisses))
+        sounds.new = []
+        if cache:
+            result.segmentations, result.segmentations_used = cache.new, cache.used
+            result.segmentation_lookups = (cache.hits - chits, cache.misses - cmisses)
+            cache.new, cache.used = {}, {}
+        return result
+
+    def flush(self):
+        """
+        Wait for all pending forms to be processed, and merge the results in order - i.e. validate
+        and complete the rows returned by `add_form`.
+        """
+        global _FORKED_WRITER  # pylint: disable=W0603
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        if self._pool is None:
+            # Make sure the worker processes inherit the initialized tokenizer and replacements:
+            _ = self.dataset.tokenizer, self.segment_replacer, self.segmentation_cache
+            _FORKED_WRITER = self
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('fork'))
+        chunks = [pending[i:i + self.chunk_size] for i in range(0, len(pending), self.chunk_size)]
+        futures = [
+            self._pool.submit(
+                _process_forms, [(kw, profile) for _, kw, profile in chunk], self.with_morphemes)
+            for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            result = future.result()
+            self.dataset.tr.merge(result.analyses)
+            sounds = SEGMENTS_CACHE.sounds(self.args.clts.api)
+            sounds.update(result.sounds)
+            sounds.cache.hits += result.sound_lookups[0]
+            sounds.cache.misses += result.sound_lookups[1]
+            self.dataset.tokenizer_cache.hits += result.tokenizer_lookups[0]
+            self.dataset.tokenizer_cache.misses += result.tokenizer_lookups[1]
+            if self.segmentation_cache:
+                self.segmentation_cache.update(result.segmentations)
+                for lid, keys in result.segmentations_used.items():
+                    self.segmentation_cache.used.setdefault(lid, set()).update(keys)
+                self.segmentation_cache.hits += result.segmentation_lookups[0]
+                self.segmentation_cache.misses += result.segmentation_lookups[1]
+            for (row, _, _), (item, bad, invalid) in zip(chunk, result.forms):
+                row.update(self._object_dict(self.dataset.lexeme_class, **item))
+                if self.options.stream:
+                    for fk, refs in self._refs.items():
+                        refs.add(row[fk])
+                if invalid:  # pragma: no cover
+                    self.dataset.tr.add_invalid_word(row)
+                if bad:
+                    self.dataset.tr.add_bad_word(row)
+        if self.options.stream and len(self._objects['FormTable']) >= self.buffer_size:
+            self._write_rows('FormTable')
+
     def add_forms_from_value(self, split_value=None, **kw) -> list[dict]:
         """
         :return: list of dicts corresponding to newly created Lexemes
@@ -242,20 +596,43 @@ class LexibankWriter(CLDFWriter):
         """
         return self.add_forms_from_value(split_value=split_value, **kw)
 
-    def _add_object(self, cls, **kw):
+    @staticmethod
+    def _object_dict(cls, **kw) -> dict[str, Any]:
         # Instantiating an object will trigger potential validators:
-        d = dataclasses.asdict(cls(**kw))
-        t = cls.__cldf_table__()
+        obj = cls(**kw)
+        names, getter = _fields(cls)
+        # Unlike `dataclasses.asdict`, we don't deep-copy the values. But we copy lists (e.g.
+        # `Segments` or `Source`), so rows are not changed when the lists passed in are modified.
+        d = {k: list(v) if isinstance(v, list) else v for k, v in zip(names, getter(obj))}
         for key in ['ID', 'Language_ID', 'Parameter_ID', 'Cognateset_ID']:
             # stringify/sluggify identifiers:
-            if d.get(key) is not None:
-                d[key] = f'{d[key]}'
-                if not ID_PATTERN.match(d[key]):
-                    raise ValueError(f'invalid CLDF identifier {t}-{key}: {d[key]}')
+            value = d.get(key)
+            if value is not None:
+                if type(value) is not str:  # pylint: disable=C0123
+                    d[key] = value = f'{value}'
+                # IDs are unique per table, so caching their validation would not pay off.
+                if not (ID_PATTERN.match(value) if key == 'ID' else _valid_reference(value)):
+                    raise ValueError(
+                        f'invalid CLDF identifier {cls.__cldf_table__()}-{key}: {value}')
+        return d
+
+    def _add_object(self, cls, **kw):
+        return self._append_object(cls, self._object_dict(cls, **kw))
+
+    def _append_object(self, cls, d: dict[str, Any]) -> dict[str, Any]:
+        t = cls.__cldf_table__()
         if 'ID' not in d or d['ID'] not in self._obj_index[t]:
             if 'ID' in d:
                 self._obj_index[t].add(d['ID'])
-            self.objects[t].append(d)
+            self._objects[t].append(d)
+            if self.options.stream and t in STREAMED_TABLES:
+                if t == 'FormTable':
+                    for fk, refs in self._refs.items():
+                        refs.add(d[fk])
+                # With workers, form rows are only complete after flushing, see `flush`.
+                if len(self._objects[t]) >= self.buffer_size \
+                        and not (self.workers and t == 'FormTable'):
+                    self._write_rows(t)
         return d
 
     def add_cognate(self, lexeme=None, **kw):
@@ -277,22 +654,9 @@ class LexibankWriter(CLDFWriter):
 
     def add_language(self, **kw):
         """Add a language to the dataset based on the data in `kw`."""
-        if (not getattr(self.args, 'dev', False)) and 'Glottocode' in kw \
-                and hasattr(self.args, 'glottolog') \
-                and kw['Glottocode'] in self.args.glottolog.api.cached_languoids:
-            glang = self.args.glottolog.api.cached_languoids[kw['Glottocode']]
-            for key, attribute in [
-                ('Latitude', 'latitude'),
-                ('Longitude', 'longitude'),
-                ('Glottolog_Name', 'name'),
-                ('ISO639P3code', 'iso')
-            ]:
-                if kw.get(key) is None:
-                    kw[key] = getattr(glang, attribute)
-            if kw.get('Family') is None:
-                kw['Family'] = glang.lineage[0][0] if glang.lineage else glang.name
-            if kw.get('Macroarea') is None:
-                kw['Macroarea'] = glang.macroareas[0].name if glang.macroareas else None
+        for key, value in self.glottolog_data([kw])[0].items():
+            if kw.get(key) is None:
+                kw[key] = value
 
         return self._add_object(self.dataset.language_class, **kw)
 
@@ -315,9 +679,19 @@ class LexibankWriter(CLDFWriter):
         """
         assert callable(id_factory) or isinstance(id_factory, str)
         ids = collections.OrderedDict()
+        isocodes = [
+            kw['ISO639P3code'] for kw in self.dataset.languages
+            if (not kw.get('Glottocode')) and kw.get('ISO639P3code')]
+        if isocodes:
+            glottocodes = self.glottolog_index.glottocodes_by_iso(isocodes)
+            for kw in self.dataset.languages:
+                if (not kw.get('Glottocode')) and kw.get('ISO639P3code'):
+                    kw['Glottocode'] = glottocodes.get(kw['ISO639P3code'])
+        # Look up the Glottolog data for all languages at once, so `add_language` only has to
+        # access the looked up languoids:
+        self.glottolog_data(self.dataset.languages)
+
         for i, kw in enumerate(self.dataset.languages):
-            if (not kw.get('Glottocode')) and kw.get('ISO639P3code'):
-                kw['Glottocode'] = self.dataset.glottolog.glottocode_by_iso.get(kw['ISO639P3code'])
             kw['ID'] = id_factory(kw) if callable(id_factory) else kw[id_factory]
             if lookup_factory is None:
                 key = i
@@ -374,6 +748,11 @@ class LexibankWriter(CLDFWriter):
                        column: str = 'Segments',
                        method: str = 'library'):
         """Add alignments to cognates."""
+        if self.options.stream and (alm is None or cognates is None):
+            raise ValueError('Aligning all cognates is not supported in streaming mode')
+        # LingPy is only imported when needed, because importing it is slow:
+        from pylexibank.lingpy_util import iter_alignments  # pylint: disable=C0415
+
         # iter_alignments does **not** yield anything but aligns the cognates "in-place", i.e.
         # adding the alignments to the cognate dicts.
         iter_alignments(
@@ -2,17 +2,46 @@
 Functionality used in pylexibank commands.
 """
 import argparse
+from typing import Optional
 
+import csvw
 from cldfbench import cli_util
 from termcolor import colored
 
 from pylexibank.util import ENTRY_POINT
+from pylexibank.tablecache import WordlistCache
+
+
+def iter_forms(dataset):
+    """Iterate over the rows of the lexibank FormTable."""
+    return ParsedCLDF(dataset.get_lexibank_wordlist()).iter_rows(
+        'FormTable', 'id', 'form', 'value', 'segments', 'languageReference', 'parameterReference')
 
 
 def read_forms(dataset):
     """Read the lexibank FormTable."""
-    return list(dataset.get_lexibank_wordlist().iter_rows(
-        'FormTable', 'id', 'form', 'value', 'segments', 'languageReference', 'parameterReference'))
+    return list(iter_forms(dataset))
+
+
+class ParsedCLDF(WordlistCache):
+    """
+    A CLDF dataset, with the rows of each table parsed only once - or read from the table cache
+    (see `pylexibank.tablecache`).
+
+    Thus, several checks can be run on the data of a dataset without re-reading the CSV files.
+    Attributes other than table data are looked up on the wrapped `pycldf.Dataset`.
+    """
+    def __getattr__(self, name):
+        return getattr(self.cldf, name)
+
+    def __getitem__(self, item):
+        if isinstance(item, tuple):  # A column spec.
+            return self.cldf[item]
+        return super().__getitem__(item)
+
+    def get(self, table: str) -> Optional[csvw.Table]:
+        """Get a table object, if the dataset has such a table."""
+        return self.cldf.get(table)
 
 
 def add_dataset_spec(parser: argparse.ArgumentParser, **kw):
@@ -1,28 +1,79 @@
 """
 Run all checks
 """
-from cldfbench.cli_util import with_datasets
-from pylexibank.cli_util import add_dataset_spec
+import logging
+import argparse
+import multiprocessing
+import concurrent.futures
+
+from cldfbench.cli_util import with_dataset, get_datasets
+from pylexibank.cli_util import add_dataset_spec, ParsedCLDF
 
 from pylexibank.commands.check_languages import check as check_languages
 from pylexibank.commands.check_lexibank import check as check_lexibank
 
 CHECKERS = [check_languages, check_lexibank]
+# The datasets and arguments of a run, inherited by forked worker processes:
+_FORKED = None
 
 
 def register(parser):  # pylint: disable=C0116
     add_dataset_spec(parser, multiple=True)
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help="Number of worker processes to use for checking datasets in parallel "
+             "(default: check datasets serially).")
 
 
 def check(ds, args):
     """Run checks for one dataset."""
+    # The CLDF data is parsed only once and shared between all checks:
+    cldf = ParsedCLDF(ds.cldf_reader())
     for checker in CHECKERS:
-        checker(ds, args, warnings=args.warnings)
+        checker(ds, args, warnings=args.warnings, cldf=cldf)
+
+
+class _Records(logging.Handler):
+    """Collects the messages logged in a worker process, to be replayed in the main process."""
+    def __init__(self):
+        super().__init__()
+        self.records: list[tuple[int, str]] = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+def _check(i: int) -> tuple[list[tuple[int, str]], list[str]]:
+    """Entry point for worker processes."""
+    datasets, args = _FORKED
+    handler = _Records()
+    args = argparse.Namespace(**vars(args))
+    args.log, args.warnings = logging.Logger(__name__), []
+    args.log.addHandler(handler)
+    with_dataset(args, check, dataset=datasets[i])
+    return handler.records, args.warnings
 
 
 def run(args):  # pylint: disable=C0116
+    global _FORKED  # pylint: disable=W0603
     args.warnings = []
-    with_datasets(args, check)
+    datasets = get_datasets(args)
+    workers = getattr(args, 'workers', 0) or 0
+    if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        _FORKED = (datasets, args)
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            # Messages and warnings are merged in the order of the datasets:
+            for records, warnings in pool.map(_check, range(len(datasets))):
+                for level, msg in records:
+                    args.log.log(level, msg)
+                args.warnings.extend(warnings)
+        _FORKED = None
+    else:
+        for ds in datasets:
+            with_dataset(args, check, dataset=ds)
     if args.warnings:
         args.log.warning('%s warnings issued', len(args.warnings))
         return 2
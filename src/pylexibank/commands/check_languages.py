@@ -12,12 +12,16 @@ def register(parser):  # pylint: disable=C0116
     add_dataset_spec(parser, multiple=True)
 
 
-def check(ds, args, warnings=None):
-    """Check a single dataset."""
+def check(ds, args, warnings=None, cldf=None):
+    """
+    Check a single dataset.
+
+    :param cldf: The parsed CLDF data of the dataset, shared by several checks.
+    """
     warn = functools.partial(warning, args, dataset=ds, warnings=warnings)
 
     args.log.info('checking %s - languages', ds)
-    cldf = ds.cldf_reader()
+    cldf = cldf or ds.cldf_reader()
 
     cols_with_values = collections.Counter()  # used for check on empty columns
     row = None
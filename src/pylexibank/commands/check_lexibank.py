@@ -2,11 +2,13 @@
 Check lexibank plumbing for lexibank datasets
 """
 import functools
+import dataclasses
 import collections
+from typing import Optional
 
 from cldfbench.cli_util import with_datasets
 
-from pylexibank.cli_util import add_dataset_spec, warning
+from pylexibank.cli_util import add_dataset_spec, warning, ParsedCLDF
 
 
 def register(parser):  # pylint: disable=C0116
@@ -17,8 +19,49 @@ def run(args):  # pylint: disable=C0116
     with_datasets(args, check)
 
 
-def check(ds, args, warnings=None):
-    """Check an individual dataset."""
+@dataclasses.dataclass
+class FormIndex:
+    """
+    The data about forms needed for the plumbing checks, computed in a single pass over FormTable.
+    """
+    # The distinct values of the Value column - or None, if FormTable has no such column:
+    values: Optional[set[str]] = dataclasses.field(default_factory=set)
+    # Concept IDs, indexed by integer code:
+    concepts: list[str] = dataclasses.field(default_factory=list)
+    # Maps form IDs to integer-coded concept IDs:
+    form_to_concept: dict[str, int] = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def from_cldf(cls, cldf, values: bool = True, concepts: bool = True) -> 'FormIndex':
+        """Read the values and/or the form-concept mapping of a CLDF dataset."""
+        res = cls(values=set() if values else None)
+        if not (values or concepts):
+            return res
+        if concepts:
+            fid = cldf['FormTable', 'id'].name
+            pid = cldf['FormTable', 'parameterReference'].name
+            codes = {}
+        for form in cldf['FormTable']:
+            if res.values is not None:
+                try:
+                    res.values.add(form['Value'])
+                except KeyError:  # pragma: no cover
+                    res.values = None
+            if concepts:
+                code = codes.get(form[pid])
+                if code is None:
+                    code = codes[form[pid]] = len(res.concepts)
+                    res.concepts.append(form[pid])
+                res.form_to_concept[form[fid]] = code
+        return res
+
+
+def check(ds, args, warnings=None, cldf=None):
+    """
+    Check an individual dataset.
+
+    :param cldf: The parsed CLDF data of the dataset, shared by several checks.
+    """
     warn = functools.partial(warning, args, dataset=ds, warnings=warnings)
 
     args.log.info('checking %s - plumbing', ds)
@@ -32,31 +75,31 @@ def check(ds, args, warnings=None):
     if etc_concepts.exists():  # pragma: no cover
         warn(f'Dataset uses {etc_concepts} rather than a conceptlist from Concepticon')
 
-    cldf = ds.cldf_reader()
-    # check lexemes.csv
+    cldf = cldf or ParsedCLDF(ds.cldf_reader())
     etc_lexemes = ds.dir / 'etc' / 'lexemes.csv'
+    check_cognates = (not getattr(ds, 'cross_concept_cognates', False)) \
+        and bool(cldf.get('CognateTable'))
+    index = FormIndex.from_cldf(cldf, values=etc_lexemes.exists(), concepts=check_cognates)
+
+    # check lexemes.csv
     if etc_lexemes.exists():
-        try:
-            values = set(f['Value'] for f in cldf['FormTable'])
+        if index.values is None:  # pragma: no cover
+            warn('Dataset does not seem to be a lexibank dataset - FormTable has no Value column!')
+        else:
             for r in ds.lexemes:
-                if ds.lexemes[r] and r not in values:  # replacement of form x -> y
+                if ds.lexemes[r] and r not in index.values:  # replacement of form x -> y
                     warn(f"{etc_lexemes} contains un-needed conversion '{r}' -> '{ds.lexemes[r]}'")
-                if not ds.lexemes[r] and r in values:  # removal of form x -> ""
+                if not ds.lexemes[r] and r in index.values:  # removal of form x -> ""
                     warn(f"{etc_lexemes} contains un-handled removal '{r}' -> '{ds.lexemes[r]}'")
-        except KeyError:  # pragma: no cover
-            warn('Dataset does not seem to be a lexibank dataset - FormTable has no Value column!')
 
-    if (not getattr(ds, 'cross_concept_cognates', False)) and cldf.get('CognateTable'):
+    if check_cognates:
         # check that there are no cross-concept cognate sets:
-        form_to_concept = {
-            form['id']: form['parameterReference'] for form in
-            cldf.iter_rows('FormTable', 'id', 'parameterReference')}
         cogset_to_concepts = collections.defaultdict(set)
         for cog in cldf.iter_rows('CognateTable', 'formReference', 'cognatesetReference'):
-            cid = form_to_concept[cog['formReference']]
-            cogid = cog['cognatesetReference']
-            if len(cogset_to_concepts[cogid]) == 1 \
-                    and cid not in cogset_to_concepts[cogid]:
-                # We warn when a second concept ID is detected for a cognateset.
-                warn(f'Cross-concept cognate set {cogid}')
-            cogset_to_concepts[cogid].add(cid)
+            cogset_to_concepts[cog['cognatesetReference']].add(
+                index.form_to_concept[cog['formReference']])
+        # We warn once per cognate set, listing all concepts:
+        for cogid, cids in cogset_to_concepts.items():
+            if len(cids) > 1:
+                warn('Cross-concept cognate set {}: {}'.format(
+                    cogid, ', '.join(sorted(f'{index.concepts[cid]}' for cid in cids))))
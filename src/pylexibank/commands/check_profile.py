@@ -5,6 +5,7 @@ from cldfbench.cli_util import with_dataset, add_catalog_spec
 from clldutils.clilib import Table, add_format
 
 from pylexibank.cli_util import add_dataset_spec, read_forms
+from pylexibank.transcription import SEGMENTS_CACHE
 from pylexibank.profile import Checker, normalized, unicode2codepointstr, SegmentProblem
 
 
@@ -33,6 +34,7 @@ def check_profile(dataset, args):
     the results.
     """
     checker = Checker(args.clts.api)
+    sounds = SEGMENTS_CACHE.sounds(args.clts.api)
 
     for row in read_forms(dataset):
         if not args.language or args.language == row["languageReference"]:
@@ -65,12 +67,12 @@ def check_profile(dataset, args):
                     cat.name,
                     tk,
                     unicode2codepointstr(tk.split('/')[0] if cat == SegmentProblem.slashed else tk),
-                    "*" if cat == SegmentProblem.generated and tk != str(args.clts.api.bipa[tk])
-                    else "",
+                    "*" if cat == SegmentProblem.generated and tk != str(sounds[tk]) else "",
                     "◌" + tk if cat in {SegmentProblem.missing, SegmentProblem.unknown} else '',
-                    str(args.clts.api.bipa[tk]),
-                    args.clts.api.bipa[tk].codepoints,
+                    str(sounds[tk]),
+                    sounds[tk].codepoints,
                     segmented_forms[0].segments,
                     segmented_forms[0].graphemes,
                     len(segmented_forms),
                 ])
+    SEGMENTS_CACHE.save()
@@ -1,15 +1,14 @@
 """
 Check for (potentially) problematic consonant clusters >= 3.
 """
-import operator
-import itertools
 import collections
 
 from cldfbench.cli_util import with_dataset, add_catalog_spec
 from clldutils.clilib import Table, add_format
 
-from pylexibank.cli_util import add_dataset_spec
-from pylexibank.forms import compute_consonant_cluster
+from pylexibank.cli_util import add_dataset_spec, iter_forms
+from pylexibank.forms import ConsonantClusters
+from pylexibank.transcription import SEGMENTS_CACHE
 
 
 def register(parser):  # pylint: disable=C0116
@@ -33,25 +32,23 @@ def analyze_consonant_clusters(dataset, args):
     """Analyzes clusters of consonants found in the segmented forms of the dataset."""
     by_lang: dict[tuple, dict[str, list[str]]] = collections.defaultdict(
         lambda: collections.defaultdict(list))
-    for row in sorted(
-            dataset.cldf_dir.read_csv("forms.csv", dicts=True), key=operator.itemgetter('ID')
-    ):
-        if "<<" in row["Segments"]:
-            args.log.warning("Invalid segments in %s (ID: %s).", row["Segments"], row["ID"])
+    # Only clusters of the requested length are reported, so we only look for these:
+    clusters = ConsonantClusters(args.clts.api, min_length=args.length)
+    for row in iter_forms(dataset):
+        segments = row['segments'] or []
+        if any("<<" in s for s in segments):
+            args.log.warning("Invalid segments in %s (ID: %s).", ' '.join(segments), row["id"])
             continue
 
-        for morpheme in row["Segments"].split(" + "):
-            for cluster in compute_consonant_cluster(morpheme.split(), args.clts.api):
-                by_lang[tuple(cluster)][row["Language_ID"]] += [row["Form"]]
+        for cluster in clusters(segments):
+            by_lang[tuple(cluster)][row["languageReference"]].append(row["form"])
+    SEGMENTS_CACHE.save()
 
     with Table(args, "Language_ID", "Length", "Cluster", "Words") as table:
-        cases = 0
-        for cluster in itertools.takewhile(
-            lambda c: len(c) >= args.length, sorted(by_lang, key=len, reverse=True)
-        ):
-            cases += 1
+        for cluster in sorted(by_lang, key=len, reverse=True):
             for language, words in by_lang[cluster].items():
                 table.append([language, str(len(cluster)), " ".join(cluster), " // ".join(words)])
 
     args.log.warning(
-        f"{cases} potentially problematic consonant cluster(s) with length >= {args.length}.")
+        f"{len(by_lang)} potentially problematic consonant cluster(s) "
+        f"with length >= {args.length}.")
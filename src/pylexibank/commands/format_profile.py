@@ -2,13 +2,13 @@
 Format (and lint) the orthography profiles of a dataset.
 """
 import argparse
-import collections
 
 from cldfbench.cli_util import add_catalog_spec, get_dataset
 
 from pylexibank import Dataset
-from pylexibank.cli_util import add_dataset_spec
-from pylexibank.profile import IPA_COLUMN
+from pylexibank.cli_util import add_dataset_spec, ParsedCLDF
+from pylexibank.profile import IPA_COLUMN, Profile, GraphemeStats
+from pylexibank.transcription import SEGMENTS_CACHE
 
 
 def register(parser: argparse.ArgumentParser):  # pylint: disable=C0116
@@ -40,39 +40,54 @@ def register(parser: argparse.ArgumentParser):  # pylint: disable=C0116
     )
 
 
+def grapheme_stats(ds: Dataset, profiles: dict[str, Profile]) -> dict[str, GraphemeStats]:
+    """
+    Compute grapheme statistics for all profiles of a dataset in one pass over the FormTable.
+    """
+    stats = {key: GraphemeStats(profile) for key, profile in profiles.items()}
+    # Forms without profile are used for the default profile - if no form specifies a profile:
+    unspecified = GraphemeStats(profiles['default']) if 'default' in profiles else None
+    for form in ParsedCLDF(ds.cldf_reader())['FormTable']:
+        key = form.get('Profile')
+        if key is None:
+            if unspecified:
+                unspecified.add(ds.form_for_segmentation(form['Form']))
+        else:
+            unspecified = None
+            if key in stats:
+                stats[key].add(ds.form_for_segmentation(form['Form']))
+    if unspecified:
+        stats['default'] = unspecified
+    return stats
+
+
 def run(args: argparse.Namespace):  # pylint: disable=C0116
     ds: Dataset = get_dataset(args)
     clts = args.clts.api
 
     # Load the profile(s) specified for the dataset
     profiles = {k or 'default': v for k, v in ds.orthography_profile_dict.items()}
-    forms = collections.defaultdict(list)
-    if ds.cldf_dir.joinpath('forms.csv').exists():
-        for form in ds.cldf_reader().iter_rows('FormTable'):
-            forms[form.get('Profile')].append(ds.form_for_segmentation(form['Form']))
-    if list(forms.keys()) == [None]:  # pragma: no cover
-        forms['default'] = forms[None]
 
-    for key, profile in profiles.items():
+    for profile in profiles.values():
         args.log.info('Processing %s', profile.fname)
         profile.clean(clts, ipa_col=args.ipa)
 
         if args.trim:
-            # Run the trimmer as many times as necessary until nothing more is left to remove
-            total_removed = 0
-            while True:
-                removed = profile.trim(ipa_col=args.ipa)
-                total_removed += removed
-                if removed == 0:
-                    break
-            if total_removed:  # pragma: no cover
-                args.log.info("%s superfluous rules were removed.", total_removed)
-
-        if args.augment and forms[key]:
-            profile.augment(forms[key], clts=args.clts.api)
+            # Run the trimmer until nothing more is left to remove
+            removed = profile.trim(ipa_col=args.ipa, until_stable=True)
+            if removed:  # pragma: no cover
+                args.log.info("%s superfluous rules were removed.", removed)
+
+    stats = grapheme_stats(ds, profiles) \
+        if args.augment and ds.cldf_dir.joinpath('forms.csv').exists() else {}
+
+    for key, profile in profiles.items():
+        if key in stats and stats[key].forms:
+            stats[key].augment(clts=clts, ipa_col=args.ipa)
 
         if args.sort:
             profile.sort(clts=args.clts.api, ipa_col=args.ipa)
 
         profile.check(clts, args.log, ipa_col=args.ipa)
         profile.write()
+    SEGMENTS_CACHE.save()
@@ -2,13 +2,11 @@
 Create an initial orthography profile, seeded from the forms created by a first run
 of lexibank.makecldf.
 """
-from lingpy import Wordlist
-from lingpy.sequence import profile
 from cldfbench.cli_util import get_dataset, add_catalog_spec
 from csvw.dsv import UnicodeWriter
 from clldutils.clilib import ParserError
 
-from pylexibank.cli_util import add_dataset_spec, add_overwrite_profile_flag
+from pylexibank.cli_util import add_dataset_spec, add_overwrite_profile_flag, ParsedCLDF
 
 
 def register(parser):  # pylint: disable=C0116
@@ -37,6 +35,10 @@ def register(parser):  # pylint: disable=C0116
 
 
 def run(args):  # pylint: disable=C0116
+    # LingPy is only imported when needed, because importing it is slow:
+    from lingpy import Wordlist  # pylint: disable=C0415
+    from lingpy.sequence import profile  # pylint: disable=C0415
+
     bipa = args.clts.api.bipa
     func = profile.simple_profile
     cols = ['Grapheme', 'IPA', 'Frequence', 'Codepoints']
@@ -58,7 +60,7 @@ def run(args):  # pylint: disable=C0116
         raise ParserError('Orthography profile exists already. To overwrite, pass "-f" flag')
 
     header, d = [], {}
-    for i, row in enumerate(ds.cldf_reader()['FormTable'], start=1):
+    for i, row in enumerate(ParsedCLDF(ds.cldf_reader())['FormTable'], start=1):
         if i == 1:
             header = [f for f in row.keys() if f != 'ID']
             d = {0: ['lid'] + [h.lower() for h in header]}
@@ -1,7 +1,8 @@
 """
 Create a profile for individual languages from an already prepared general profile.
 """
-from collections import defaultdict
+import collections
+import concurrent.futures
 
 from cldfbench.cli_util import get_dataset
 from clldutils.clilib import ParserError
@@ -9,17 +10,53 @@ from pycldf import Dataset
 from csvw.dsv import reader, UnicodeWriter
 
 from pylexibank import progressbar
-from pylexibank.cli_util import add_dataset_spec, add_overwrite_profile_flag
+from pylexibank.cli_util import add_dataset_spec, add_overwrite_profile_flag, ParsedCLDF
 
 
 def register(parser):  # pylint: disable=C0116
     add_dataset_spec(parser)
     add_overwrite_profile_flag(parser)
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help="Number of threads to use for writing profiles (default: as many as there are CPUs, "
+             "plus 4, up to 32).")
+
+
+def grapheme_counts(wordlist: ParsedCLDF) -> dict[str, collections.Counter]:
+    """
+    Count the graphemes of the forms per language, in one pass over the FormTable.
+    """
+    forms = wordlist["FormTable"]
+    if "Graphemes" not in forms.columns:
+        raise ValueError("Grapheme information missing in CLDF data")
+    languages, lcodes = forms.encoded(wordlist["FormTable", "languageReference"].name)
+    graphemes, gcodes = forms.encoded("Graphemes")
+    # Since forms of a language often share graphemes, we count distinct pairs of (integer-coded)
+    # language and graphemes, before splitting graphemes:
+    res = collections.defaultdict(collections.Counter)
+    for (lcode, gcode), n in collections.Counter(zip(lcodes, gcodes)).items():
+        value = graphemes[gcode]
+        if not value:
+            raise ValueError("Grapheme information missing in CLDF data")
+        counts = res[languages[lcode]]
+        for grapheme in (value.split() if isinstance(value, str) else value):
+            counts[grapheme] += n
+    return res
+
+
+def write_profile(path, counts: collections.Counter, profile: dict[str, str]):
+    """Write a language profile, listing graphemes by descending frequency."""
+    with UnicodeWriter(path, delimiter='\t') as writer:
+        writer.writerow(["Grapheme", "IPA", "Frequency"])
+        for g, freq in counts.most_common():
+            writer.writerow([g, profile.get(g, "?"), freq])
 
 
 def run(args):  # pylint: disable=C0116
     ds = get_dataset(args)
-    wordlist = Dataset.from_metadata(ds.cldf_dir / "cldf-metadata.json")
+    wordlist = ParsedCLDF(Dataset.from_metadata(ds.cldf_dir / "cldf-metadata.json"))
     p = ds.etc_dir / "orthography.tsv"
     if not p.exists():
         raise ParserError("profile does not exist but is needed for creation")  # pragma: no cover
@@ -27,19 +64,20 @@ def run(args):  # pylint: disable=C0116
         ds.etc_dir.joinpath("orthography").mkdir(parents=True, exist_ok=True)
     profile = {row["Grapheme"]: row["IPA"] for row in reader(p, dicts=True, delimiter='\t')}
 
-    for language in progressbar(wordlist.objects("LanguageTable"), desc="creating profiles"):
-        data = defaultdict(int)
-        for form in language.forms:
-            graphemes = form.data.get("Graphemes")
-            if graphemes:
-                for grapheme in (graphemes.split() if isinstance(graphemes, str) else graphemes):
-                    data[grapheme, profile.get(grapheme, "?")] += 1
-            else:
-                raise ValueError("Grapheme information missing in CLDF data")
-        new_path = ds.etc_dir / "orthography" / f"{language.id}.tsv"
-        if new_path.exists() and not args.force:  # pragma: no cover
-            raise ParserError("Orthography profile exists, use --force to override")
-        with UnicodeWriter(new_path, delimiter='\t') as writer:
-            writer.writerow(["Grapheme", "IPA", "Frequency"])
-            for (g, s), freq in sorted(data.items(), key=lambda x: x[1], reverse=True):
-                writer.writerow([g, s, freq])
+    counts = grapheme_counts(wordlist)
+    lid = wordlist["LanguageTable", "id"].name
+    paths = {
+        language: ds.etc_dir / "orthography" / f"{language}.tsv"
+        for language in wordlist["LanguageTable"].column(lid)}
+    if not args.force and any(path.exists() for path in paths.values()):  # pragma: no cover
+        raise ParserError("Orthography profile exists, use --force to override")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(write_profile, path, counts.get(language, collections.Counter()), profile)
+            for language, path in paths.items()]
+        for future in progressbar(
+                concurrent.futures.as_completed(futures),
+                total=len(futures),
+                desc="creating profiles"):
+            future.result()
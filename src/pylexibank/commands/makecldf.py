@@ -15,6 +15,18 @@ def register(parser):  # pylint: disable=C0116
     add_catalogs(parser, with_clts=True)
     parser.add_argument('--verbose', action='store_true', default=False)
     parser.add_argument('--dev', action='store_true', default=False)
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help="Number of worker processes to use for segmentation and transcription analysis of "
+             "forms (default: process forms serially).")
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        default=False,
+        help="Cache tokenizer results per language, to only re-tokenize forms of languages with "
+             "changed orthography profiles or forms which changed when running makecldf again.")
 
 
 def run(args):  # pylint: disable=C0116
@@ -7,7 +7,7 @@ import functools
 import collections
 import dataclasses
 import unicodedata
-from typing import Optional, Protocol, Union
+from typing import Optional, Protocol
 
 import pycldf
 from csvw.dsv import reader
@@ -20,6 +20,7 @@ from segments import Tokenizer
 from cldfbench.dataset import Dataset as BaseDataset
 from cldfbench.cldf import CLDFSpec
 
+from pylexibank import util
 from pylexibank.util import jsondump, log_dump
 from pylexibank import cldf
 from pylexibank import models
@@ -27,9 +28,8 @@ from pylexibank import transcription
 from pylexibank import metadata
 from pylexibank import forms
 from pylexibank import report
-from pylexibank.profile import Profile
+from pylexibank.profile import Profiles, CompiledProfiles
 from pylexibank.util import ENTRY_POINT
-from pylexibank.lingpy_util import settings
 
 __all__ = ['Dataset']
 assert ENTRY_POINT  # ENTRY_POINT used to be imported from here.
@@ -61,6 +61,11 @@ class Dataset(BaseDataset):  # pylint: disable=R0902
 
     form_spec = forms.FormSpec()
 
+    # Maximal number of results of the tokenizer created from orthography profiles to memoize.
+    tokenizer_cache_size = 2 ** 16
+    # Maximal number of compiled orthography profiles to keep in memory.
+    profile_cache_size = 128
+
     # If a dataset provides cross-concept cognate sets, it must declare this by setting the below
     # flag to True.
     cross_concept_cognates = False
@@ -164,8 +169,11 @@ class Dataset(BaseDataset):  # pylint: disable=R0902
     # handling of lexemes/forms/words
     # ---------------------------------------------------------------
     @functools.cached_property
-    def orthography_profile_dict(self) -> dict[Union[None, str], Profile]:
-        """A dict of orthography profiles."""
+    def orthography_profile_dict(self) -> Profiles:
+        """
+        A mapping of keys - `None` for `etc/orthography.tsv` and file stems for profiles in
+        `etc/orthography/` - to orthography profiles, which are read upon first access.
+        """
         res = {}
         profile = self.etc_dir / 'orthography.tsv'
         profile_dir = self.etc_dir / 'orthography'
@@ -175,7 +183,13 @@ class Dataset(BaseDataset):  # pylint: disable=R0902
             for p in profile_dir.glob('*.tsv'):
                 res[p.stem] = p
 
-        return {k: Profile.from_file(str(p), form='NFC') for k, p in res.items()}
+        return Profiles(
+            res, maxsize=self.profile_cache_size, form='NFC', cache=CompiledProfiles())
+
+    @functools.cached_property
+    def tokenizer_cache(self) -> util.LRUCache:
+        """Memoized results of the tokenizer created from orthography profiles."""
+        return util.LRUCache(self.tokenizer_cache_size)
 
     @staticmethod
     def form_for_segmentation(form: str) -> str:
@@ -201,34 +215,51 @@ class Dataset(BaseDataset):  # pylint: disable=R0902
         - `kw` may be used to pass any context info to the tokenizer, when called
           explicitly.
         """
-        tokenizers = {
-            k: Tokenizer(profile=p, errors_replace=lambda c: f'<{c}>')  # pylint: disable=W0108
-            for k, p in self.orthography_profile_dict.items()}
-
-        if tokenizers:
+        profiles = self.orthography_profile_dict
+
+        def tokenize(segmenter, string, kw):
+            form = self.form_for_segmentation(string)
+            column = kw.pop('column')
+            if set(kw) - {'separator', 'segment_separator', 'form'}:
+                # Options not supported by `Segmenter` require `segments.Tokenizer`:
+                tokenizer = Tokenizer(
+                    profile=segmenter.profile, errors_replace=segmenter.errors_replace)
+                return tokenizer(form, column=column, **kw), tokenizer(form, **kw)
+            graphemes, res = segmenter(form, column, **kw)
+            return res, graphemes
+
+        if profiles:
             def _tokenizer(item, string, **kw):
                 """
                 Adds `Profile` and `Graphemes` keys to `item`, returns `list` of segments.
                 """
+                nonlocal profiles
+                if self.orthography_profile_dict is not profiles:
+                    # The profiles have been reset, so memoized results are invalid.
+                    profiles = self.orthography_profile_dict
+                    self.tokenizer_cache = util.LRUCache(self.tokenizer_cache_size)
                 kw.setdefault("column", "IPA")
                 kw.setdefault("separator", " + ")
                 profile = kw.pop('profile', None)
                 if profile:
-                    tokenizer = tokenizers[profile]
+                    key = profile
                     item['Profile'] = profile
                 elif isinstance(item, dict) \
                         and 'Language_ID' in item \
-                        and item['Language_ID'] in tokenizers:
-                    tokenizer = tokenizers[item['Language_ID']]
+                        and item['Language_ID'] in profiles:
+                    key = item['Language_ID']
                     item['Profile'] = item['Language_ID']
                 else:
-                    tokenizer = tokenizers[None]
+                    key = None
                     item['Profile'] = 'default'
-                form = self.form_for_segmentation(string)
-                res = tokenizer(form, **kw).split()
-                kw['column'] = Profile.GRAPHEME_COL
-                item['Graphemes'] = tokenizer(form, **kw)
-                return res
+                # We memoize results by the raw string, so normalization is skipped, too.
+                res, item['Graphemes'] = self.tokenizer_cache.get(
+                    (key, string, tuple(sorted(kw.items()))),
+                    lambda: tokenize(profiles.segmenter(key), string, kw))
+                return res.split()
+            # Results of this tokenizer can be cached by form, profile and options in incremental
+            # mode, see `incremental.SegmentationCache`:
+            _tokenizer.profile_based = True
             return _tokenizer
         return None  # pragma: no cover
 
@@ -240,6 +271,8 @@ class Dataset(BaseDataset):  # pylint: disable=R0902
         # Inject the appropriate CLDFWriter instance:
         self.unmapped.clear()
         self.tr = transcription.Report()
+        transcription.SEGMENTS_CACHE.reset_stats()
+        self.tokenizer_cache.reset_stats()
 
         if len(self.metadata.conceptlist):
             self.conceptlists = [
@@ -251,6 +284,15 @@ class Dataset(BaseDataset):  # pylint: disable=R0902
 
         # During _cmd_makecldf the transcription report will be updated.
         super()._cmd_makecldf(args)
+        transcription.SEGMENTS_CACHE.save()
+        if args.log:
+            hits, misses = transcription.SEGMENTS_CACHE.stats()
+            args.log.info('CLTS lookups: {} cache hits, {} misses ({:.1%} hit rate)'.format(
+                hits, misses, hits / (hits + misses) if hits + misses else 0))
+            if self.tokenizer_cache.hits + self.tokenizer_cache.misses:
+                hits, misses = self.tokenizer_cache.hits, self.tokenizer_cache.misses
+                args.log.info('Tokenizer: {} cache hits, {} misses ({:.1%} hit rate)'.format(
+                    hits, misses, hits / (hits + misses) if hits + misses else 0))
 
         # make sure properties have the appropriate datatypes:
         ds = self.cldf_reader()
@@ -274,6 +316,9 @@ class Dataset(BaseDataset):  # pylint: disable=R0902
         (self.dir / 'TRANSCRIPTION.md').write_text(str(self.tr), encoding='utf8')
         log_dump(self.dir / 'TRANSCRIPTION.md', args.log)
 
+        # LingPy is only imported when needed, because importing it is slow:
+        from pylexibank.lingpy_util import settings  # pylint: disable=C0415
+
         jsondump(settings(), self.cldf_dir / 'lingpy-rcParams.json', log=args.log)
 
     def cmd_readme(self, args: argparse.Namespace) -> str:
@@ -3,24 +3,79 @@ Form handling.
 """
 import re
 import logging
+import functools
 import dataclasses
 import unicodedata
-from typing import Literal, Optional
+from typing import Literal, Optional, Callable
 from collections.abc import Iterable
 
-from clldutils import text
-from clldutils import misc
+from pylexibank.transcription import SEGMENTS_CACHE
 
-__all__ = ['FormSpec', 'compute_consonant_cluster']
+__all__ = ['FormSpec', 'ConsonantClusters', 'compute_consonant_cluster']
 log = logging.getLogger('pylexibank')
 
 
+WHITESPACE = re.compile(r'\s+')
+# For few replacements, chained `str.replace` calls are faster than substituting regex matches:
+MIN_COMBINED_REPLACEMENTS = 5
+
+
 def dcfield(help_, **kw):
     """A dataclasses field with help."""
     kw['metadata'] = {"help": help_}
     return dataclasses.field(**kw)  # pylint: disable=E3701
 
 
+def _overlap(a: str, b: str) -> bool:
+    """Check whether occurrences of a and b in a string may overlap."""
+    return a in b or b in a or any(
+        a.endswith(b[:i]) or b.endswith(a[:i]) for i in range(1, min(len(a), len(b))))
+
+
+def _replacer(replacements: list[tuple[str, str]]) -> Optional[Callable[[str], str]]:
+    """
+    Compile a list of replacements into one function.
+
+    Applying the replacements one after the other is equivalent to substituting matches of one
+    regex alternation - unless the replacements interact, i.e. if sources may overlap or if a
+    replacement may create a match for a later source. Then we fall back to chained `str.replace`.
+    """
+    if not replacements:
+        return None
+    sources = [source for source, _ in replacements]
+    if len(replacements) < MIN_COMBINED_REPLACEMENTS or (not all(sources)) or any(
+            _overlap(source, later)
+            or set(target) & set(later)
+            or (not target and len(later) > 1)
+            for i, (source, target) in enumerate(replacements)
+            for later in sources[i + 1:]):
+        def replace(form):
+            for source, target in replacements:
+                form = form.replace(source, target)
+            return form
+        return replace
+    mapping = dict(replacements)
+    pattern = re.compile('|'.join(re.escape(source) for source in sources))
+    return functools.partial(pattern.sub, lambda m: mapping[m.group()])
+
+
+def _char_class(chars: Iterable[str]) -> Optional[re.Pattern]:
+    chars = ''.join(sorted(set(chars)))
+    return re.compile(f'[{re.escape(chars)}]') if chars else None
+
+
+@dataclasses.dataclass(frozen=True)
+class _Compiled:
+    """The configuration of a `FormSpec`, compiled for fast processing."""
+    replace: Optional[Callable[[str], str]]
+    # Matches opening brackets:
+    brackets: Optional[re.Pattern]
+    # Matches separators:
+    separators: Optional[re.Pattern]
+    # Matches opening brackets or separators, i.e. anything which requires splitting a value:
+    special: Optional[re.Pattern]
+
+
 @dataclasses.dataclass
 class FormSpec:  # pylint: disable=R0902
     """
@@ -96,6 +151,27 @@ class FormSpec:  # pylint: disable=R0902
                     and isinstance(v[0], str)
                     and isinstance(v[1], str)):
                 raise ValueError('replacements must be list of pairs')
+        _ = self._compiled
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        # Changing the specification invalidates the compiled version:
+        self.__dict__.pop('_compiled', None)
+
+    @functools.cached_property
+    def _compiled(self) -> _Compiled:
+        """
+        The specification compiled for fast processing of forms.
+
+        Note: In-place changes of mutable attributes - e.g. appending to `replacements` - are not
+        picked up. Assign a new value instead.
+        """
+        return _Compiled(
+            replace=_replacer(self.replacements),
+            brackets=_char_class(self.brackets),
+            separators=_char_class(self.separators),
+            special=_char_class(list(self.brackets) + list(self.separators)),
+        )
 
     def as_markdown(self, dataset=None) -> str:
         """
@@ -135,15 +211,52 @@ class FormSpec:  # pylint: disable=R0902
         :return: None to skip the form, or the cleaned form as string.
         """
         if form not in self.missing_data:
-            for source, target in self.replacements:
-                form = form.replace(source, target)
+            compiled = self._compiled
+            if compiled.replace:
+                form = compiled.replace(form)
             if self.strip_inside_brackets:
-                form = text.strip_brackets(form, brackets=self.brackets)
+                form = self._strip_brackets(form) \
+                    if compiled.brackets and compiled.brackets.search(form) else form.strip()
             if self.normalize_whitespace:
-                return re.sub(r'\s+', ' ', form.strip())
+                return WHITESPACE.sub(' ', form.strip())
             return form
         return None
 
+    def _strip_brackets(self, form: str) -> str:
+        """Strip brackets and their content - like `clldutils.text.strip_brackets`."""
+        stack, res = [], []
+        for c in form:
+            if stack and c == stack[-1]:
+                stack.pop()
+            elif c in self.brackets:
+                stack.append(self.brackets[c])
+            elif not stack:
+                res.append(c)
+        return ''.join(res).strip()
+
+    def _split(self, value: str) -> list[str]:
+        """Split at separators outside brackets - like `clldutils.text.split_text_with_context`."""
+        compiled = self._compiled
+        if not (compiled.special and compiled.special.search(value)):
+            # Fast path: Nothing to split.
+            chunks = [value]
+        elif compiled.brackets and compiled.brackets.search(value):
+            stack, chunk, chunks = [], [], []
+            for c in value:
+                if stack and c == stack[-1]:
+                    stack.pop()
+                elif c in self.brackets:
+                    stack.append(self.brackets[c])
+                elif (not stack) and c in self.separators:
+                    chunks.append(''.join(chunk))
+                    chunk = []
+                    continue
+                chunk.append(c)
+            chunks.append(''.join(chunk))
+        else:
+            chunks = compiled.separators.split(value)
+        return [chunk for chunk in map(str.strip, chunks) if chunk]
+
     def split(self, item, value, lexemes=None):
         """Splits lexemes as found in Value field."""
         lexemes = lexemes or {}
@@ -152,28 +265,59 @@ class FormSpec:  # pylint: disable=R0902
             value = lexemes[value]
         if self.normalize_unicode:
             value = unicodedata.normalize(self.normalize_unicode, value)
-        res = misc.nfilter(
-            self.clean(form, item=item)
-            for form in text.split_text_with_context(
-                value, separators=self.separators, brackets=self.brackets))
+        clean = self.clean
+        res = [form for form in (clean(chunk, item=item) for chunk in self._split(value)) if form]
         if self.first_form_only:
             return res[:1]
         return res
 
 
+# Sound classes which may be part of a consonant cluster:
+CONSONANTAL = frozenset(["consonant", "cluster", "∼"])
+# Sound classes ending a consonant cluster:
+NON_CONSONANTAL = frozenset(["diphthong", "vowel", "tone", "�", "marker"])
+# Codes for the sound class of a segment:
+BREAK, CONSONANT = 0, 1
+
+
+class ConsonantClusters:
+    """
+    Find consonant clusters in segmented forms.
+
+    The sound class of each distinct segment is looked up only once. Forms are then encoded as
+    byte strings of sound class codes, in which clusters are found with a linear scan.
+
+    >>> clusters = ConsonantClusters(clts)
+    >>> clusters('s c h w i m m e n'.split())
+    [['s', 'c', 'h', 'w'], ['m', 'm'], ['n']]
+    """
+    def __init__(self, clts, min_length: int = 1):
+        self.sounds = SEGMENTS_CACHE.sounds(clts)
+        self.classes: dict[str, int] = {'+': BREAK}
+        self.pattern = re.compile(b'%c{%d,}' % (CONSONANT, max(min_length, 1)))
+
+    def _class(self, grapheme: str) -> int:
+        name = self.sounds[grapheme].name.split(" ")
+        if name[-1] in NON_CONSONANTAL or 'syllabic' in name:
+            return BREAK
+        assert name[-1] in CONSONANTAL, f'Unexpected soundclass {name[-1]}'
+        return CONSONANT
+
+    def encode(self, segments: list[str]) -> bytes:
+        """Encode a list of segments as byte string of sound class codes."""
+        classes = self.classes
+        try:
+            return bytes([classes[s] for s in segments])
+        except KeyError:
+            for s in segments:
+                if s not in classes:
+                    classes[s] = self._class(s)
+            return bytes([classes[s] for s in segments])
+
+    def __call__(self, segments: list[str]) -> list[list[str]]:
+        return [segments[m.start():m.end()] for m in self.pattern.finditer(self.encode(segments))]
+
+
 def compute_consonant_cluster(segments: list[str], clts) -> list:
     """Infer consonant clusters in a list of segments."""
-    out = []
-    for i, (grapheme, sound) in enumerate(zip(segments, [s.name for s in clts.bipa(segments)])):
-        sndcls = sound.split(" ")[-1]
-        if i == 0:
-            if sndcls in ["consonant", "cluster", "∼"]:
-                out.append([])
-        if sndcls in ["diphthong", "vowel", "tone", "�", "marker"]:
-            out.append([])  # Ends a consonant cluster.
-        elif 'syllabic' in sound.split(" "):
-            out.append([])  # Ends a consonant cluster.
-        else:
-            assert sndcls in ["consonant", "cluster", "∼"], f'Unexpected soundclass {sndcls}'
-            out[-1].append(grapheme)
-    return [chunk for chunk in out if chunk]
+    return ConsonantClusters(clts)(segments)
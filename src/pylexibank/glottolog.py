@@ -0,0 +1,199 @@
+"""
+Persisted index of the Glottolog data relevant for Lexibank.
+
+Reading languoids from a Glottolog repository means parsing the INI files of all languoids, which
+takes a lot longer than looking up the few facts Lexibank needs - names, ISO codes, coordinates,
+top-level family, macroarea and whether a languoid is a bookkeeping languoid. So we compute these
+facts once per Glottolog version and persist them in an SQLite database in the user's cache
+directory. Like the CLTS sound data (see `pylexibank.sounds`), the index is kept for the
+`MAX_VERSIONS` most recently used Glottolog versions.
+"""
+import os
+import hashlib
+import logging
+import pathlib
+import sqlite3
+import functools
+import itertools
+import contextlib
+import dataclasses
+import importlib.metadata
+from collections.abc import Iterable
+from typing import Optional
+
+from pylexibank.util import VersionedStore, cache_dir
+
+__all__ = ['Languoid', 'GlottologIndex', 'glottolog_version']
+log = logging.getLogger('pylexibank')
+
+# Number of Glottolog versions for which the index is kept in the persistent cache:
+MAX_VERSIONS = 3
+# Maximal number of parameters in an SQL query:
+CHUNK_SIZE = 500
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS languoid (
+    version TEXT,
+    id TEXT,
+    name TEXT,
+    iso TEXT,
+    latitude REAL,
+    longitude REAL,
+    family TEXT,
+    macroarea TEXT,
+    bookkeeping INTEGER,
+    PRIMARY KEY (version, id)
+);
+CREATE INDEX IF NOT EXISTS languoid_iso ON languoid (version, iso);
+"""
+COLUMNS = 'id, name, iso, latitude, longitude, family, macroarea, bookkeeping'
+
+
+def glottolog_version(api) -> str:
+    """
+    A fingerprint of the Glottolog data relevant for the index.
+
+    Since hashing the content of all languoid files would be about as slow as reading them, we
+    hash paths, sizes and modification times - and the version of `pyglottolog`, which computes
+    some of the data.
+    """
+    md5 = hashlib.md5()
+    try:
+        md5.update(importlib.metadata.version('pyglottolog').encode('utf8'))
+    except importlib.metadata.PackageNotFoundError:  # pragma: no cover
+        pass
+    repos = pathlib.Path(api.repos)
+    for d in [repos / 'languoids' / 'tree', repos / 'config']:
+        for root, dirs, files in os.walk(d):
+            dirs.sort()
+            for fname in sorted(files):
+                p = pathlib.Path(root) / fname
+                stat = p.stat()
+                md5.update(f'{p.relative_to(repos).as_posix()}:{stat.st_size}:{stat.st_mtime_ns}'
+                           .encode('utf8'))
+    return md5.hexdigest()
+
+
+@dataclasses.dataclass(frozen=True)
+class Languoid:
+    """The data of a Glottolog languoid relevant for Lexibank."""
+    id: str
+    name: str
+    iso: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    # The name of the top-level family - or of the languoid itself, if it is a top-level languoid:
+    family: str
+    macroarea: Optional[str]
+    bookkeeping: bool
+
+    @classmethod
+    def from_glottolog(cls, languoid) -> 'Languoid':
+        """Compute the data of a `pyglottolog.languoids.Languoid`."""
+        return cls(
+            id=languoid.id,
+            name=languoid.name,
+            iso=languoid.iso,
+            latitude=languoid.latitude,
+            longitude=languoid.longitude,
+            family=languoid.lineage[0][0] if languoid.lineage else languoid.name,
+            macroarea=languoid.macroareas[0].name if languoid.macroareas else None,
+            bookkeeping=languoid.category == 'Bookkeeping',
+        )
+
+
+def _chunks(items: Iterable, n: int = CHUNK_SIZE):
+    items = iter(items)
+    while chunk := list(itertools.islice(items, n)):
+        yield chunk
+
+
+class GlottologIndex:
+    """
+    Lookup of `Languoid` data, backed by the persistent index for the Glottolog version.
+
+    The Glottolog repository is only read if there is no index for its version yet. Languoids are
+    read from the index when they are looked up.
+    """
+    def __init__(self, api, path: Optional[pathlib.Path] = None):
+        self.api = api
+        self.path = path or cache_dir() / 'glottolog-v1.sqlite'
+        self.db = VersionedStore(self.path, SCHEMA, ['languoid'], MAX_VERSIONS)
+        self._languoids: dict[str, Optional[Languoid]] = {}
+        self._ready = False
+
+    @functools.cached_property
+    def version(self) -> str:
+        """The fingerprint of the Glottolog data."""
+        return glottolog_version(self.api)
+
+    @contextlib.contextmanager
+    def _connection(self):
+        with self.db.connection() as conn:
+            if not self._ready:
+                self._prepare(conn)
+            yield conn
+
+    def _prepare(self, conn):
+        """Make sure the index for the Glottolog version exists, evicting outdated versions."""
+        if not self.db.use(conn, self.version):
+            log.info('Indexing Glottolog data in %s', self.path)
+            conn.execute("DELETE FROM languoid WHERE version = ?", (self.version,))
+            conn.executemany(
+                "INSERT INTO languoid VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(self.version,) + dataclasses.astuple(Languoid.from_glottolog(lg))
+                 for lg in self.api.languoids()])
+        self._ready = True
+
+    @functools.cached_property
+    def _all(self) -> list[Languoid]:  # pragma: no cover
+        """All languoids, read from the Glottolog repository if the index is not available."""
+        return [Languoid.from_glottolog(lg) for lg in self.api.languoids()]
+
+    def _select(self, where: str, values: list[str]) -> list[Languoid]:
+        res = []
+        try:
+            with self._connection() as conn:
+                for chunk in _chunks(values):
+                    res.extend(
+                        Languoid(*row[:-1], bool(row[-1])) for row in conn.execute(
+                            f"SELECT {COLUMNS} FROM languoid WHERE version = ? AND "
+                            f"{where} IN ({', '.join('?' * len(chunk))})",
+                            [self.version] + chunk))
+        except sqlite3.Error as e:  # pragma: no cover
+            log.warning('Could not read Glottolog index %s: %s', self.path, e)
+            values = set(values)
+            return [lg for lg in self._all if getattr(lg, where) in values]
+        return res
+
+    @functools.cached_property
+    def bookkeeping(self) -> set[str]:
+        """The Glottocodes of bookkeeping languoids."""
+        try:
+            with self._connection() as conn:
+                return {row[0] for row in conn.execute(
+                    "SELECT id FROM languoid WHERE version = ? AND bookkeeping = 1",
+                    (self.version,))}
+        except sqlite3.Error as e:  # pragma: no cover
+            log.warning('Could not read Glottolog index %s: %s', self.path, e)
+            return {lg.id for lg in self._all if lg.bookkeeping}
+
+    def languoids(self, glottocodes: Iterable[str]) -> dict[str, Languoid]:
+        """Look up the languoids for a batch of Glottocodes."""
+        glottocodes = set(glottocodes)
+        missing = glottocodes - set(self._languoids)
+        if missing:
+            self._languoids.update((gc, None) for gc in missing)
+            self._languoids.update((lg.id, lg) for lg in self._select('id', sorted(missing)))
+        return {gc: self._languoids[gc] for gc in glottocodes if self._languoids[gc]}
+
+    def get(self, glottocode: str) -> Optional[Languoid]:
+        """Look up the languoid for a Glottocode."""
+        return self.languoids([glottocode]).get(glottocode)
+
+    def glottocodes_by_iso(self, isocodes: Iterable[str]) -> dict[str, str]:
+        """Look up the Glottocodes for a batch of ISO 639-3 codes."""
+        res = {}
+        for lg in self._select('iso', sorted(set(isocodes))):
+            self._languoids[lg.id] = lg
+            res[lg.iso] = lg.id
+        return res
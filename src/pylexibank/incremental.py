@@ -0,0 +1,204 @@
+"""
+Support for incremental builds, i.e. re-running `makecldf` without re-tokenizing unchanged forms.
+
+Tokenizing forms with orthography profiles is typically the most expensive part of `makecldf`. In
+incremental mode, the results are cached per language in the user's cache directory. The cached
+results for a language are only used if the fingerprint of the inputs relevant for tokenization -
+the orthography profiles applicable to the language and the dataset's Python module - did not
+change.
+
+The tokenizer created from orthography profiles only depends on the form, the profile and the
+tokenizer options. Custom tokenizers may use any data of the form `dict` and may read other files.
+Thus, for custom tokenizers, results are keyed by all data of the form, and the fingerprint also
+covers the Python modules in the dataset directory and the files in `etc/`.
+
+Since forms are looked up by content, changes in the raw data, in `etc/lexemes.csv` or in the
+`FormSpec` only require tokenizing the forms which actually changed - when using orthography
+profiles. Replacements from
+`etc/segments.csv` and the transcription analysis are not cached, but re-computed from the
+tokenizer output. Both are cheap, due to the compiled `SegmentReplacer` and the persistent sound
+cache.
+"""
+import json
+import inspect
+import hashlib
+import logging
+import pathlib
+import importlib.metadata
+from typing import Optional, Callable, Any
+
+from pylexibank.util import cache_dir
+
+__all__ = ['SegmentationCache']
+log = logging.getLogger('pylexibank')
+
+# Keys of a form `dict` which may be set by a tokenizer:
+TOKENIZER_KEYS = ('Graphemes', 'Profile')
+# Files in `etc/` written by `makecldf`, see `report.report`:
+GENERATED_FILES = ('badge_*.svg',)
+# Keys of a form `dict` which are set by the writer - depending on whether forms are processed in
+# worker processes or not:
+WRITER_KEYS = ('ID', 'Segments')
+# A cache entry is a list [form, profile, profile fingerprint, context, segments, tokenizer keys],
+# where context is a fingerprint of the tokenizer options - and of the form `dict` for custom
+# tokenizers:
+Entry = list
+
+
+def _md5(*chunks: Any) -> str:
+    md5 = hashlib.md5()
+    for chunk in chunks:
+        md5.update(chunk if isinstance(chunk, bytes) else f'{chunk}'.encode('utf8'))
+        md5.update(b'\x00')
+    return md5.hexdigest()
+
+
+def _file_md5(path) -> Optional[str]:
+    path = pathlib.Path(path) if path else None
+    return _md5(path.read_bytes()) if path and path.is_file() else None
+
+
+def _profile_md5(path: pathlib.Path) -> Optional[str]:
+    """A fingerprint of a profile, including the `.rules` file applied by `profile.Segmenter`."""
+    profile = _file_md5(path)
+    rules = _file_md5(path.parent / f'{path.stem}.rules')
+    return _md5(profile, rules) if profile and rules else profile
+
+
+class SegmentationCache:
+    """
+    Cache of tokenizer results per language of a dataset.
+
+    Use as wrapper of the dataset's tokenizer:
+
+    >>> cache = SegmentationCache(dataset)
+    >>> segments = cache(dataset.tokenizer, item, form)
+    >>> cache.save()
+    """
+    def __init__(self, dataset, directory: Optional[pathlib.Path] = None):
+        self.dir = directory or cache_dir() / 'segmentations' / '{}-{}'.format(
+            dataset.id, _md5(pathlib.Path(dataset.dir).resolve())[:8])
+        profile_dir = dataset.etc_dir / 'orthography'
+        self.profiles = {None: _profile_md5(dataset.etc_dir / 'orthography.tsv')}
+        if profile_dir.is_dir():
+            for p in profile_dir.glob('*.tsv'):
+                self.profiles[p.stem] = _profile_md5(p)
+        try:
+            version = importlib.metadata.version('pylexibank')
+        except importlib.metadata.PackageNotFoundError:  # pragma: no cover
+            version = None
+        try:
+            # Custom tokenizers are implemented in the dataset's module:
+            module = _file_md5(inspect.getfile(type(dataset)))
+        except (TypeError, OSError):  # pragma: no cover
+            module = None
+        # The tokenizer created from orthography profiles is marked as such, see
+        # `Dataset.tokenizer`:
+        self.custom = getattr(dataset.tokenizer, 'profile_based', False) is not True
+        files = []
+        if self.custom:
+            files = sorted(pathlib.Path(dataset.dir).glob('*.py')) + sorted(
+                p for p in pathlib.Path(dataset.etc_dir).rglob('*')
+                if p.is_file() and not any(p.match(pattern) for pattern in GENERATED_FILES))
+        self.fingerprint = _md5(version, module, self.profiles[None], *map(_file_md5, files))
+        # Cached results per language, keyed by (form, profile name, profile fingerprint, context):
+        self._languages: dict[str, dict[tuple, Entry]] = {}
+        # Entries added in this run:
+        self.new: dict[str, list[Entry]] = {}
+        # Keys of the entries used in this run:
+        self.used: dict[str, set[tuple]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, lid: str) -> pathlib.Path:
+        return self.dir / f'{_md5(lid)}.json'
+
+    def _language_fingerprint(self, lid: str) -> str:
+        return _md5(self.fingerprint, self.profiles.get(lid))
+
+    def _entries(self, lid: str) -> dict[tuple, Entry]:
+        if lid not in self._languages:
+            entries, path = {}, self._path(lid)
+            if path.exists():
+                try:
+                    data = json.loads(path.read_text(encoding='utf8'))
+                    if data['fingerprint'] == self._language_fingerprint(lid):
+                        entries = {tuple(e[:4]): e for e in data['forms']}
+                except (ValueError, KeyError, TypeError) as e:  # pragma: no cover
+                    log.warning('Ignoring invalid segmentation cache %s: %s', path, e)
+            self._languages[lid] = entries
+        return self._languages[lid]
+
+    def _key(self, item: dict, string: str, kw: dict[str, Any]) -> tuple:
+        profile = kw.get('profile')
+        context = dict(kw)
+        if self.custom:
+            context['item'] = {
+                k: v for k, v in item.items() if k not in TOKENIZER_KEYS + WRITER_KEYS}
+        return (
+            string,
+            profile,
+            self.profiles.get(profile) if profile else None,
+            _md5(json.dumps(context, sort_keys=True, default=str)))
+
+    def get(self, item: dict, string: str, **kw) -> Optional[list[str]]:
+        """
+        Lookup the tokenizer results for a form, updating `item` with the data set by the tokenizer.
+        """
+        lid, key = f"{item['Language_ID']}", self._key(item, string, kw)
+        entry = self._entries(lid).get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used.setdefault(lid, set()).add(key)
+        item.update(entry[5])
+        return list(entry[4])
+
+    def add(self, item: dict, string: str, segments: Optional[list[str]], **kw):
+        """Add the tokenizer results for a form."""
+        entry = list(self._key(item, string, kw)) + [
+            segments or [], {k: item[k] for k in TOKENIZER_KEYS if k in item}]
+        self.update({f"{item['Language_ID']}": [entry]})
+
+    def update(self, entries: dict[str, list[Entry]]):
+        """Add entries, e.g. computed in another process."""
+        for lid, items in entries.items():
+            lentries = self._entries(lid)
+            for entry in items:
+                key = tuple(entry[:4])
+                self.used.setdefault(lid, set()).add(key)
+                if key not in lentries:
+                    lentries[key] = entry
+                    self.new.setdefault(lid, []).append(entry)
+
+    def __call__(self, tokenizer: Callable, item: dict, string: str, **kw) -> Optional[list[str]]:
+        """Tokenize `string` using `tokenizer` - unless the result is cached already."""
+        segments = self.get(item, string, **kw)
+        if segments is None:
+            segments = tokenizer(item, string, **kw)
+            self.add(item, string, segments, **kw)
+        return segments
+
+    def save(self, prune: bool = True):
+        """
+        Write the data of all languages for which entries have been added or used.
+
+        :param prune: Flag signaling whether to only keep the entries used in this run - and to \
+        remove the data of languages without forms in this run. This should only be done after \
+        a complete run.
+        """
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for lid, used in self.used.items():
+            entries = self._entries(lid)
+            if lid in self.new or (prune and len(used) < len(entries)):
+                self._path(lid).write_text(json.dumps(dict(
+                    fingerprint=self._language_fingerprint(lid),
+                    forms=[e for k, e in entries.items() if k in used or not prune],
+                ), ensure_ascii=False), encoding='utf8')
+        if prune:
+            paths = {self._path(lid) for lid in self.used}
+            for p in self.dir.glob('*.json'):
+                if p not in paths:
+                    p.unlink()
+        self.new = {}
@@ -2,7 +2,7 @@
 LingPy functionality relevant for Lexibank.
 """
 import collections
-from collections.abc import Iterable, Generator
+from collections.abc import Iterable, Generator, Mapping
 from typing import Union, Optional, Any, Literal
 
 import lingpy
@@ -39,7 +39,7 @@ def _get_forms(dataset):
     Return the list of Form `dict`'s for a `cldfbench.CLDFWriter` or a `pycldf.Dataset`.
     """
     return dataset.objects['FormTable'] \
-        if isinstance(getattr(dataset, 'objects', None), dict) \
+        if isinstance(getattr(dataset, 'objects', None), Mapping) \
         else list(dataset.iter_rows(
             'FormTable', 'id', 'parameterReference', 'languageReference'))
 
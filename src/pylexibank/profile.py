@@ -2,25 +2,47 @@
 Orthography profiles in lexibank are based on the Profile class in the `segments` package, adding
 functionality to check and consistently format in a diff-friendly way.
 """
+import os
 import re
-import copy
+import json
+import random
+import hashlib
+import logging
+import pathlib
 import enum
+import functools
 import collections
+import collections.abc
 import dataclasses
 import unicodedata
-from typing import Optional, Literal
+import importlib.metadata
+from typing import Optional, Literal, Any
 
 import pyclts
 import segments
+import segments.errors
+import segments.tokenizer
 from segments.tree import Tree
 from clldutils.misc import log_or_raise
 from csvw import dsv
 from csvw.metadata import TableGroup, Column
 
+from pylexibank.util import LRUCache, cache_dir, trusted, evict_least_recently_used
+from pylexibank.sounds import Sounds
+from pylexibank.transcription import SEGMENTS_CACHE
+
 __all__ = [
-    'Profile', 'IPA_COLUMN', 'Checker', 'unicode2codepointstr', 'normalized', 'SegmentProblem']
+    'Profile', 'IPA_COLUMN', 'Checker', 'unicode2codepointstr', 'normalized', 'SegmentProblem',
+    'Segmenter', 'Annotation', 'annotate', 'GraphemeStats', 'Profiles', 'CompiledProfiles']
 
 IPA_COLUMN = 'IPA'
+# Maximal number of compiled profiles to keep in the persistent cache:
+MAX_COMPILED_PROFILES = 500
+try:
+    VERSION = importlib.metadata.version('pylexibank')
+except importlib.metadata.PackageNotFoundError:  # pragma: no cover
+    VERSION = None
+log = logging.getLogger('pylexibank')
 
 
 class SegmentProblem(enum.Enum):
@@ -34,11 +56,11 @@ class SegmentProblem(enum.Enum):
     @staticmethod
     def check(tk: str, clts: pyclts.CLTS) -> Optional['SegmentProblem']:
         """Check whether tk falls in any of the SegmentProblem categories."""
-        sound = clts.bipa[tk]
+        sound = SEGMENTS_CACHE.sounds(clts)[tk]
         if tk.startswith("<<") and tk.endswith(">>"):
             return SegmentProblem.missing
-        if sound.type == "unknownsound":
-            return SegmentProblem.unknown  # pragma: no cover
+        if sound.unknown:
+            return SegmentProblem.unknown
         if sound.generated:
             return SegmentProblem.generated
         if str(sound) not in {tk, normalized(tk), normalized(tk, mode='NFC')}:
@@ -74,9 +96,59 @@ def ipa2sca(text: str, clts: pyclts.CLTS) -> str:
     >>> ipa2sca('a t au', pyclts.CLTS('PATH/TO/cldf-clts/clts-data'))
     'A T A'
     """
-    sca = clts.soundclass("sca")
-    return " ".join(
-        clts.bipa.translate(t, sca) if t != "NULL" else "NULL" for t in ipa2tokens(text))
+    return annotate(text, clts).sca
+
+
+class Annotation:
+    """
+    Data about an IPA value of a profile, derived from CLTS.
+
+    Sounds are looked up via the persistent sound cache, and each item of data is computed only
+    when needed.
+    """
+    def __init__(self, value: Optional[str], sounds: Sounds):
+        self.value = value
+        self.sounds = sounds
+
+    @functools.cached_property
+    def sca(self) -> str:
+        """The SCA sound classes of the IPA tokens."""
+        return " ".join(
+            self.sounds[t].sca if t != "NULL" else "NULL" for t in ipa2tokens(self.value))
+
+    @functools.cached_property
+    def bipa(self) -> Optional[str]:
+        """The value with segments replaced by the default BIPA graphemes."""
+        if not self.value:
+            return self.value
+
+        def clean_segment(segment):
+            if "/" in segment:
+                left, right = segment.split("/")
+                return f"{left}/{self.sounds[right].bipa}"
+            return self.sounds[segment].bipa
+
+        # Remove any multiple spaces, split IPA first into segments and then
+        # left- and right- slash information (if any), and use the default
+        return " ".join(
+            clean_segment(segment) for segment in re.sub(r"\s+", " ", self.value).strip().split())
+
+    @functools.cached_property
+    def unknown(self) -> bool:
+        """Flag signaling whether the IPA tokens include an unknown sound."""
+        return any(self.sounds[t].unknown for t in ipa2tokens(self.value) if t and t != 'NULL')
+
+
+# Annotations of IPA values, keyed by (id of `Sounds`, value). Since profiles of a dataset (e.g. the
+# per-language profiles in `etc/orthography/`) typically share most IPA values, annotations are
+# shared across profiles:
+ANNOTATIONS = LRUCache(2 ** 16)
+
+
+def annotate(value: Optional[str], clts: pyclts.CLTS) -> Annotation:
+    """Get the - memoized - annotation of an IPA value."""
+    sounds = SEGMENTS_CACHE.sounds(clts)
+    return ANNOTATIONS.get((id(sounds), value), Annotation, value, sounds)
 
 
 class Profile(segments.Profile):
@@ -87,7 +159,38 @@ class Profile(segments.Profile):
         for grapheme in ['^', '$']:
             if grapheme not in self.graphemes:
                 self.graphemes[grapheme] = {k: None for k in default_spec}
-        self.recreate_tree()
+                self.recreate_tree()
+
+    @property
+    def tree(self) -> Tree:
+        """The parse tree - rebuilt upon first access after `recreate_tree` was called."""
+        if self._tree is None:
+            self._tree = Tree(list(self.graphemes.keys()))
+        return self._tree
+
+    @tree.setter
+    def tree(self, value: Optional[Tree]):
+        self._tree = value
+
+    @classmethod
+    def from_file(cls, fname, form=None, cache: Optional['CompiledProfiles'] = None) -> 'Profile':
+        """
+        Read an orthography profile - from a cache of compiled profiles, if one is passed and the
+        file has not changed since it was last read.
+
+        :param cache: The cache of compiled profiles to use, e.g. `CompiledProfiles()` for the \
+        persistent cache in the user's cache directory. If no cache is passed, the profile file is \
+        always parsed.
+        """
+        if cache is None:
+            return super().from_file(fname, form=form)
+        key = cache.key(cls, fname, form)
+        res = cache.get(key, cls, fname=pathlib.Path(fname), form=form) if key else None
+        if res is None:
+            res = super().from_file(fname, form=form)
+            if key:
+                cache.put(key, res)
+        return res
 
     def __str__(self):
         # We overwrite the base class' method to fix the order of columns.
@@ -105,11 +208,13 @@ class Profile(segments.Profile):
         (fname or self.fname).write_text(str(self), encoding='utf8')
 
     def recreate_tree(self):
-        """Rebuild the parse tree."""
-        self.tree = Tree(list(self.graphemes.keys()))
+        """Rebuild the parse tree - upon next access."""
+        self.tree = None
 
     def sort(self, clts=None, ipa_col=IPA_COLUMN):
         """Sort the graphemes in the profile."""
+        sca = {g: annotate(e[ipa_col], clts).sca for g, e in self.graphemes.items()} \
+            if clts else {}
         self.graphemes = collections.OrderedDict(
             sorted(
                 self.graphemes.items(),
@@ -118,26 +223,27 @@ class Profile(segments.Profile):
                     e[0] != "^",
                     e[1][ipa_col] is not None,
                     re.match(r"\^.*\$", e[0]) is None,
-                    len(ipa2sca(e[1][ipa_col], clts)) if clts else False,
-                    ipa2sca(e[1][ipa_col], clts) if clts else False,
+                    len(sca[e[0]]) if clts else False,
+                    sca.get(e[0], False),
                     len(e[0]),
                     e[0],
                 ),
             )
         )
 
-    def trim(self, ipa_col=IPA_COLUMN) -> int:
-        """Trime the profile, removing redundant rules."""
-        # Make a copy of the profile (so we don't change in place)
-        new_profile = collections.OrderedDict()
-        for g, entry in self.graphemes.items():
-            spec = copy.copy(entry)
-            spec[self.GRAPHEME_COL] = g
-            new_profile[g] = spec
+    def trim(self, ipa_col=IPA_COLUMN, until_stable: bool = False) -> int:
+        """
+        Trim the profile, removing redundant rules.
 
+        A rule is redundant, if its grapheme is tokenized into the same IPA without the rule.
+
+        :param until_stable: Repeat trimming until no more redundant rules are found - i.e. the \
+        result of calling `trim` repeatedly until it returns 0.
+        :return: The number of removed rules.
+        """
         # Collect all keys, so that we will gradually remove them; those with
         # ^ and $ go first
-        graphemes = list(new_profile.keys())
+        graphemes = list(self.graphemes.keys())
         bound_graphemes = [graph for graph in graphemes if graph[0] == "^" and graph[-1] == "$"]
         bound_graphemes += [graph for graph in graphemes if graph[0] == "^" and graph[-1] != "$"]
         bound_graphemes += [graph for graph in graphemes if graph[0] != "^" and graph[-1] == "$"]
@@ -145,28 +251,39 @@ class Profile(segments.Profile):
         check_graphemes = bound_graphemes + sorted(
             [graph for graph in graphemes if len(graph) > 1 and graph not in bound_graphemes],
             key=lambda x: -len(x))
-
-        # For each entry, we will remove it from `segment_map`, apply the resulting
-        # profile, and add the entry back at the end of loop (still expansive, but
-        # orders of magnitude less expansive than making a copy at each iteration)
-        removed = 0
-        for grapheme in check_graphemes:
-            if grapheme in new_profile:
-                ipa = new_profile[grapheme][ipa_col]
-                # Obtain the segments without the current rule
-                t = segments.Tokenizer(
-                    profile=Profile(
-                        *[copy.copy(s) for g, s in new_profile.items() if g != grapheme]))
-                if t(grapheme, column=ipa_col) == ipa:
-                    # If the resulting `segments` match the `ipa` reference, we can delete the rule:
-                    removed += 1
-                    del new_profile[grapheme]
-
-        for g in set(self.graphemes.keys()) - set(new_profile.keys()):
+        if check_graphemes and ipa_col not in self.column_labels:
+            raise ValueError(f"Column {ipa_col} not found in profile.")
+
+        trimmer = _Trimmer(self, ipa_col)
+        # The checks in which each candidate has been evaluated last:
+        checked: dict[str, int] = {}
+        # The checks after which a rule has been removed:
+        removed: dict[str, int] = {}
+        check = 0
+        while True:
+            nremoved = len(removed)
+            for grapheme in check_graphemes:
+                if grapheme in removed:
+                    continue
+                # Tokenizing a grapheme only depends on the rules for its substrings, so the result
+                # can only change if one of these has been removed since the last check:
+                if grapheme in checked and not any(
+                        removed.get(g, -1) >= checked[grapheme]
+                        for g in trimmer.substrings(grapheme)):
+                    continue
+                check += 1
+                checked[grapheme] = check
+                if trimmer.redundant(grapheme):
+                    trimmer.remove(grapheme)
+                    removed[grapheme] = check
+            if not until_stable or len(removed) == nremoved:
+                break
+
+        for g in removed:
             del self.graphemes[g]
 
         self.recreate_tree()
-        return removed
+        return len(removed)
 
     @staticmethod
     def segmentable_form(form: str) -> str:
@@ -178,45 +295,26 @@ class Profile(segments.Profile):
             form += '$'
         return form
 
-    def augment(self, forms, clts=None, ipa_col=IPA_COLUMN):
+    def augment(self, forms, clts=None, ipa_col=IPA_COLUMN, examples=5, seed=None):
         """
         Applies a profile to a wordlist, returning new profile counts and segments.
+
+        :param forms: Iterable of forms, e.g. a generator reading the FormTable.
+        :param examples: Maximal number of examples per grapheme.
+        :param seed: If not `None`, a random sample of examples is selected, rather than the first.
         """
-        self.column_labels.add('FREQUENCY')
-        if clts:
-            self.column_labels.add('SCA')
-        self.column_labels.add('EXAMPLES')
-        freqs = collections.Counter()
-        ex = collections.defaultdict(list)
-        t = segments.Tokenizer(profile=self)
+        stats = GraphemeStats(self, examples=examples, seed=seed)
         for form in forms:
-            graphemes = t(self.segmentable_form(form)).split()
-            freqs.update(graphemes)
-            for g in graphemes:
-                ex[g].append(form[1:-1])
-        for g, spec in self.graphemes.items():
-            spec['FREQUENCY'] = freqs.get(g, 0)
-            spec['EXAMPLES'] = ";".join(ex.get(g, [])[:5])
-            if clts:
-                spec['SCA'] = ipa2sca(spec[ipa_col], clts)
+            stats.add(form)
+        stats.augment(clts=clts, ipa_col=ipa_col)
 
     def clean(self, clts, ipa_col=IPA_COLUMN):
         """
         Replace user-provided IPA graphemes with the CLTS/BIPA default ones.
         """
-        def clean_segment(segment, clts):
-            if "/" in segment:
-                left, right = segment.split("/")
-                return f"{left}/{str(clts.bipa[right])}"
-            return str(clts.bipa[segment])
-
         for grapheme, entry in self.graphemes.items():
-            # Remove any multiple spaces, split IPA first into segments and then
-            # left- and right- slash information (if any), and use the default
             if entry[ipa_col]:
-                ipa_value = re.sub(r"\s+", " ", entry[ipa_col]).strip()
-                entry[ipa_col] = " ".join(
-                    clean_segment(segment, clts) for segment in ipa_value.split())
+                entry[ipa_col] = annotate(entry[ipa_col], clts).bipa
                 if 'CODEPOINTS' in self.column_labels:
                     entry["CODEPOINTS"] = unicode2codepointstr(grapheme)
 
@@ -258,8 +356,7 @@ class Profile(segments.Profile):
                 if not value:
                     continue  # pragma: no cover
                 # check for unknown sounds
-                segs = [seg for seg in ipa2tokens(value) if seg and seg != 'NULL']
-                if any(isinstance(clts.bipa[seg], pyclts.models.UnknownSound) for seg in segs):
+                if annotate(value, clts).unknown:
                     log_or_raise(
                         f"Mapping [{grapheme}] ({unicode2codepointstr(grapheme)}) -> "
                         f"[{value}] ({unicode2codepointstr(value)}) includes an unknown sound.",
@@ -268,6 +365,353 @@ class Profile(segments.Profile):
                     )
 
 
+class CompiledProfiles:
+    """
+    Persistent cache of compiled profiles.
+
+    Compiled profiles - i.e. the normalized grapheme specifications and metadata - are stored as
+    JSON, keyed by the content of the profile file, in the user's cache directory - rather than
+    next to the profile files in the dataset repository. Only tab-separated profile files are
+    cached, since profiles described by metadata may span several files.
+
+    A cache file starts with a JSON header, recording the checksum of the data. Files which are
+    not owned - and only writable - by the current user, or do not match their checksum, are
+    ignored.
+    """
+    def __init__(self, directory: Optional[pathlib.Path] = None):
+        self.dir = directory or cache_dir() / 'profiles'
+
+    @staticmethod
+    def key(profile_class: type, fname, form: Optional[str]) -> Optional[str]:
+        """The cache key for a profile file - or `None` if the profile cannot be cached."""
+        fname = pathlib.Path(fname)
+        if fname.suffix.lower() == '.json' or not fname.is_file():
+            return None
+        md5 = hashlib.md5()
+        for chunk in [VERSION, f'{profile_class.__module__}.{profile_class.__qualname__}', form]:
+            md5.update(f'{chunk}'.encode('utf8') + b'\x00')
+        md5.update(fname.read_bytes())
+        return md5.hexdigest()
+
+    def get(self, key: str, profile_class: type, **kw) -> Optional[Profile]:
+        """
+        Read a compiled profile.
+
+        :param kw: Additional keyword arguments passed into `profile_class`, e.g. `fname`.
+        """
+        path = self.dir / f'{key}.json'
+        if path.exists():
+            try:
+                header, data = path.read_bytes().split(b'\n', maxsplit=1)
+                if not trusted(path) or json.loads(header)['md5'] != hashlib.md5(data).hexdigest():
+                    log.warning('Ignoring untrusted compiled profile %s', path)
+                    return None
+                data = json.loads(data)
+                res = profile_class(
+                    *[dict(spec, **{profile_class.GRAPHEME_COL: grapheme})
+                      for grapheme, spec in data['graphemes']],
+                    **data['metadata'], **kw)
+                path.touch()  # Mark as recently used.
+                return res
+            except Exception as e:  # pylint: disable=broad-except
+                log.warning('Ignoring invalid compiled profile %s: %s', path, e)
+        return None
+
+    def put(self, key: str, profile: Profile):
+        """Write a compiled profile, evicting the least recently used ones if necessary."""
+        try:
+            data = json.dumps(dict(
+                metadata=profile.metadata,
+                graphemes=list(profile.graphemes.items()))).encode('utf8')
+        except TypeError:  # pragma: no cover
+            return  # The metadata cannot be serialized.
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            path = self.dir / f'{key}.json'
+            tmp = self.dir / f'{key}.{os.getpid()}.tmp'
+            tmp.write_bytes(
+                json.dumps(dict(md5=hashlib.md5(data).hexdigest())).encode('utf8') + b'\n' + data)
+            # Make sure the file is trusted when read - whatever the umask:
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+            evict_least_recently_used(self.dir.glob('*.json'), MAX_COMPILED_PROFILES)
+        except OSError as e:  # pragma: no cover
+            log.warning('Could not write compiled profile: %s', e)
+
+
+class Profiles(collections.abc.Mapping):
+    """
+    A lazy mapping of keys to the orthography profiles read from files.
+
+    Profiles are only read when accessed. Profiles - together with their compiled `Segmenter` and
+    parse tree - are kept in a bounded cache, so datasets with many per-language profiles only pay
+    for the profiles they use, and memory use is bounded by `maxsize`.
+
+    >>> profiles = Profiles({None: 'etc/orthography.tsv'}, form='NFC')
+    >>> graphemes, ipa = profiles.segmenter(None)('^abc$', 'IPA')
+    """
+    def __init__(self, paths: dict[Optional[str], Any], maxsize: Optional[int] = None, **kw):
+        """
+        :param paths: Mapping of keys to profile paths.
+        :param maxsize: Maximal number of profiles and compiled segmenters to keep in memory.
+        :param kw: Keyword arguments passed into `Profile.from_file`.
+        """
+        self.paths = paths
+        self.kw = kw
+        self.segmenters = LRUCache(maxsize)
+
+    def _read(self, key: Optional[str]) -> 'Segmenter':
+        return Segmenter(Profile.from_file(str(self.paths[key]), **self.kw))
+
+    def __getitem__(self, key: Optional[str]) -> Profile:
+        return self.segmenter(key).profile
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, key):
+        return key in self.paths
+
+    def segmenter(self, key: Optional[str]) -> 'Segmenter':
+        """The - cached - `Segmenter` for the profile with key `key`."""
+        return self.segmenters.get(key, self._read, key)
+
+
+class GraphemeStats:
+    """
+    Frequencies and examples of the graphemes of a profile, computed while streaming the forms of a
+    wordlist.
+
+    Only a bounded number of examples is kept per grapheme - either the first ones or, if a `seed`
+    is passed, a random sample, selected via reservoir sampling. Thus, the forms of all profiles of
+    a dataset can be processed in one pass over the FormTable:
+
+    >>> stats = {key: GraphemeStats(profile) for key, profile in profiles.items()}
+    >>> for form in forms:
+    ...     stats[form['Profile']].add(form['Form'])
+    >>> for s in stats.values():
+    ...     s.augment(clts=clts)
+    """
+    def __init__(self, profile: Profile, examples: int = 5, seed: Optional[int] = None):
+        self.profile = profile
+        # Segment as `segments.Tokenizer` does:
+        self.segmenter = Segmenter(profile, errors_replace=segments.errors.replace)
+        self.examples = examples
+        self.random = random.Random(seed) if seed is not None else None
+        self.forms = 0
+        self.freqs: collections.Counter = collections.Counter()
+        self.ex: dict[str, list[str]] = collections.defaultdict(list)
+
+    def add(self, form: str):
+        """Segment a form, counting graphemes and collecting examples."""
+        self.forms += 1
+        example = form[1:-1]
+        for g in self.segmenter(self.profile.segmentable_form(form))[0].split():
+            self.freqs[g] += 1
+            ex = self.ex[g]
+            if len(ex) < self.examples:
+                ex.append(example)
+            elif self.random:
+                # Replace a random example, such that each occurrence is selected with equal
+                # probability:
+                i = self.random.randrange(self.freqs[g])
+                if i < self.examples:
+                    ex[i] = example
+
+    def augment(self, clts=None, ipa_col=IPA_COLUMN):
+        """Add frequencies, examples and - if `clts` is passed - SCA classes to the profile."""
+        self.profile.column_labels.add('FREQUENCY')
+        if clts:
+            self.profile.column_labels.add('SCA')
+        self.profile.column_labels.add('EXAMPLES')
+        for g, spec in self.profile.graphemes.items():
+            spec['FREQUENCY'] = self.freqs.get(g, 0)
+            spec['EXAMPLES'] = ";".join(self.ex.get(g, []))
+            if clts:
+                spec['SCA'] = annotate(spec[ipa_col], clts).sca
+
+
+class _Trimmer:
+    """
+    Tokenizes graphemes of a profile as `segments.Tokenizer` would with a profile lacking the rule
+    for the grapheme and any removed rules - using one shared parse tree, in which these rules are
+    skipped.
+    """
+    # Markers which are always part of a `Profile`, re-added (without mapping) if removed:
+    boundaries = ('^', '$')
+
+    def __init__(self, profile: Profile, ipa_col: str):
+        self.root = Tree(list(profile.graphemes)).root
+        self.ipa = {g: spec.get(ipa_col) for g, spec in profile.graphemes.items()}
+        self.targets = {
+            g: spec[ipa_col] for g, spec in profile.graphemes.items() if ipa_col in spec}
+        self.removed: set[str] = set()
+        self._substrings: dict[str, set[str]] = {}
+
+    def substrings(self, grapheme: str) -> set[str]:
+        """The graphemes of the profile occurring in `grapheme`."""
+        if grapheme not in self._substrings:
+            res, n = set(), len(grapheme)
+            for i in range(n):
+                node, j = self.root, i
+                while j < n:
+                    node = node.children.get(grapheme[j])
+                    if node is None:
+                        break
+                    j += 1
+                    if node.sentinel and j - i < n:
+                        res.add(grapheme[i:j])
+            self._substrings[grapheme] = res
+        return self._substrings[grapheme]
+
+    def parse(self, word: str, skip: str) -> list[str]:
+        """Segment `word` into graphemes by longest match, skipping removed rules and `skip`."""
+        res, i, n, removed = [], 0, len(word), self.removed
+        while i < n:
+            node, j, end = self.root, i, None
+            while j < n:
+                node = node.children.get(word[j])
+                if node is None:
+                    break
+                j += 1
+                if node.sentinel:
+                    grapheme = word[i:j]
+                    if (grapheme != skip and grapheme not in removed) \
+                            or grapheme in self.boundaries:
+                        end = j
+            if end is None:
+                res.append(segments.errors.replace(word[i]))
+                i += 1
+            else:
+                res.append(word[i:end])
+                i = end
+        return res
+
+    def tokenize(self, string: str, skip: str) -> str:
+        """Tokenize `string` into IPA, as `segments.Tokenizer` would without the rule `skip`."""
+        words = []
+        for word in string.split():
+            res = []
+            for token in self.parse(word, skip):
+                if token in self.boundaries and (token == skip or token in self.removed):
+                    continue  # The rule has been re-added without mapping.
+                # Other than boundaries, skipped rules are never matched by `parse`:
+                target = self.targets[token] if token in self.targets \
+                    else segments.errors.replace(token)
+                if target is not None:
+                    if isinstance(target, (tuple, list)):
+                        res.extend(target)  # pragma: no cover
+                    else:
+                        res.append(target)
+            words.append(' '.join(res).strip())
+        return ' # '.join(words)
+
+    def redundant(self, grapheme: str) -> bool:
+        """Check whether the rule for `grapheme` is redundant."""
+        return self.tokenize(grapheme, grapheme) == self.ipa[grapheme]
+
+    def remove(self, grapheme: str):
+        """Remove the rule for `grapheme`."""
+        self.removed.add(grapheme)
+
+
+class Segmenter:
+    """
+    Segments strings according to an orthography profile, doing one longest-match parse per word
+    to compute the graphemes as well as the mappings to any number of profile columns.
+
+    Output is compatible with `segments.Tokenizer`, i.e.
+
+    >>> Segmenter(profile)(string, 'IPA', separator=' + ')
+
+    returns the same as
+
+    >>> t = segments.Tokenizer(profile)
+    >>> (t(string, separator=' + '), t(string, column='IPA', separator=' + '))
+
+    Note: The profile is compiled upon first use, so changes to the profile afterwards are ignored.
+    """
+    def __init__(self, profile: segments.Profile, errors_replace=lambda c: f'<{c}>'):
+        self.profile = profile
+        self.errors_replace = errors_replace
+        rules = None
+        if profile.fname:
+            rules = pathlib.Path(profile.fname)
+            rules = rules.parent / (rules.stem + '.rules')
+        self.rules = segments.tokenizer.Rules.from_file(rules) \
+            if rules and rules.exists() else None
+        self._mappings: dict[str, dict[str, Any]] = {}
+
+    def mapping(self, column: str) -> dict[str, Any]:
+        """Map graphemes to the values of a profile column."""
+        if column not in self._mappings:
+            if column not in self.profile.column_labels:
+                raise ValueError(f"Column {column} not found in profile.")
+            self._mappings[column] = {
+                g: spec[column] for g, spec in self.profile.graphemes.items() if column in spec}
+        return self._mappings[column]
+
+    def parse(self, word: str) -> list[str]:
+        """Segment `word` into graphemes, replacing characters not covered by the profile."""
+        res, i, n, root = [], 0, len(word), self.profile.tree.root
+        while i < n:
+            node, j, end = root, i, None
+            while j < n:
+                node = node.children.get(word[j])
+                if node is None:
+                    break
+                j += 1
+                if node.sentinel:
+                    end = j
+            if end is None:
+                res.append(self.errors_replace(word[i]))
+                i += 1
+            else:
+                res.append(word[i:end])
+                i = end
+        return res
+
+    def _map(self, graphemes: list[str], column: str) -> list[str]:
+        mapping, res = self.mapping(column), []
+        for grapheme in graphemes:
+            target = mapping[grapheme] if grapheme in mapping else self.errors_replace(grapheme)
+            if target is not None:
+                if isinstance(target, (tuple, list)):
+                    res.extend(target)  # pragma: no cover
+                else:
+                    res.append(target)
+        return res
+
+    def __call__(
+            self,
+            string: str,
+            *columns: str,
+            form: Optional[Literal['NFC', 'NFKC', 'NFD', 'NFKD']] = None,
+            segment_separator: str = ' ',
+            separator: str = ' # ',
+    ) -> tuple[str, ...]:
+        """
+        :return: A tuple with the segmented graphemes and the mapped values for each column.
+        """
+        def pp(word):
+            res = segment_separator.join(word).strip()
+            res = self.rules.apply(res) if self.rules else res
+            return unicodedata.normalize(form, res) if form else res
+
+        results = [[] for _ in range(len(columns) + 1)]
+        for word in string.split():
+            graphemes = self.parse(word)
+            results[0].append(pp(graphemes))
+            for i, column in enumerate(columns, start=1):
+                results[i].append(pp(
+                    graphemes if column == self.profile.GRAPHEME_COL
+                    else self._map(graphemes, column)))
+        return tuple(separator.join(words) for words in results)
+
+
 @dataclasses.dataclass(frozen=True)
 class SegmentedForm:
     """Bag of attributes characterizing a segmented form."""
@@ -1,16 +1,23 @@
 """
 Functionality to create a human readable report on a dataset.
 """
+import array
 import pathlib
+import operator
+import itertools
 import collections
 from collections.abc import Generator
 import dataclasses
 from typing import Optional, Union
 
+import csvw
+from csvw.dsv import UnicodeReader
 import pycldf
 from cldfbench.catalogs import Glottolog
 import anybadge
 
+from pylexibank.glottolog import GlottologIndex
+
 
 @dataclasses.dataclass
 class Badge:
@@ -83,10 +90,49 @@ def report(dataset, tr_analysis=None, glottolog=None, log=None) -> str:
     return '\n'.join(lines)
 
 
+def iter_columns(cldf: pycldf.Dataset, table: str, *columns: str) -> Generator[tuple, None, None]:
+    """
+    Iterate over the values of selected columns of a table.
+
+    Reading rows with `csvw` means parsing and validating all columns, which makes up most of the
+    time needed to compute statistics for big datasets. Thus, for data files in the default CSV
+    dialect, we read the raw CSV and only convert the values of the selected columns.
+    """
+    table = cldf[table]
+    cols = [cldf[table, col] for col in columns]
+    fname = pathlib.Path(str(table.url.resolve(table.base)))
+    dialect = table.dialect or cldf.tablegroup.dialect or csvw.Dialect()
+    if not (fname.exists() and dialect == csvw.Dialect()):
+        # Remote or zipped data, or some special CSV dialect - so we leave reading it to csvw.
+        for row in table:
+            yield tuple(row[col.header] for col in cols)
+        return
+
+    # Values are converted only once per distinct raw value - except for primary key values, which
+    # are unique (and non-empty strings), anyway.
+    pk = table.tableSchema.primaryKey or []
+    converted = [None if col.name in pk else {} for col in cols]
+    with UnicodeReader(fname) as reader:
+        rows = iter(reader)
+        header = next(rows, [])
+        indices = [header.index(col.header) for col in cols]
+        for row in rows:
+            values = [row[i] for i in indices]
+            for i, (col, value) in enumerate(zip(cols, values)):
+                if converted[i] is None:
+                    continue
+                if value not in converted[i]:
+                    converted[i][value] = col.read(value)
+                values[i] = converted[i][value]
+            yield tuple(values)
+
+
 @dataclasses.dataclass
 class Counts:  # pylint: disable=R0902
     """
     Counts of stuff in a dataset to compute summary statistics from.
+
+    Note: `missing_source` lists the IDs of forms without source.
     """
     languages: collections.Counter = dataclasses.field(default_factory=collections.Counter)
     concepts: collections.Counter = dataclasses.field(default_factory=collections.Counter)
@@ -98,39 +144,58 @@ class Counts:  # pylint: disable=R0902
     sids: collections.Counter = dataclasses.field(default_factory=collections.Counter)
     synonyms: dict[str, collections.Counter] = dataclasses.field(
         default_factory=lambda: collections.defaultdict(collections.Counter))
-    missing_source: list[dict] = dataclasses.field(default_factory=list)
+    missing_source: list[str] = dataclasses.field(default_factory=list)
     missing_glottocode: list[dict] = dataclasses.field(default_factory=list)
     bookkeeping_languoids: list[dict] = dataclasses.field(default_factory=list)
 
     @classmethod
     def from_dataset(cls, cldf: pycldf.Dataset, glottolog: Optional[Glottolog]):
-        """Update with the data of a row in FormTable"""
+        """
+        Compute the counts for a CLDF Wordlist.
+
+        Language and parameter references of forms are read into arrays of integer codes, which
+        are then counted in bulk.
+        """
         param2concepticon = {r['ID']: r['Concepticon_ID'] for r in cldf['ParameterTable']}
         lang2glottolog = {r['ID']: r['Glottocode'] for r in cldf['LanguageTable']}
 
         cnt = cls()
-
-        for row in cldf['FormTable']:
-            if row['Source']:
-                cnt.sources.update(['y'])
-                cnt.sids.update(row['Source'])
+        lcodes, pcodes = {}, {}
+        lids, cids, sources = array.array('L'), array.array('L'), []
+
+        for fid, lid, pid, source in iter_columns(
+                cldf, 'FormTable', 'ID', 'Language_ID', 'Parameter_ID', 'Source'):
+            lids.append(lcodes.setdefault(lid, len(lcodes)))
+            cids.append(pcodes.setdefault(pid, len(pcodes)))
+            if source:
+                sources.append(source)
             else:
-                cnt.missing_source.append(row)
-            cnt.concepts.update([param2concepticon[row['Parameter_ID']]])
-            cnt.languages.update([lang2glottolog[row['Language_ID']]])
-            cnt.lexemes += 1
-            cnt.lids.update([row['Language_ID']])
-            cnt.cids.update([row['Parameter_ID']])
-            cnt.synonyms[row['Language_ID']].update([row['Parameter_ID']])
-
-        for row in cldf.get('CognateTable') or []:
-            cnt.cognate_sets.update([row['Cognateset_ID']])
-
-        bookkeeping_languoids_in_gl = set()
-        if glottolog:
-            for lang in glottolog.api.languoids():
-                if lang.category == 'Bookkeeping':
-                    bookkeeping_languoids_in_gl.add(lang.id)  # pragma: no cover
+                cnt.missing_source.append(fid)
+
+        cnt.lexemes = len(lids)
+        if sources:
+            cnt.sources['y'] = len(sources)
+        cnt.sids.update(itertools.chain.from_iterable(sources))
+
+        lids_, cids_ = list(lcodes), list(pcodes)
+        cnt.lids.update({lids_[k]: v for k, v in collections.Counter(lids).items()})
+        cnt.cids.update({cids_[k]: v for k, v in collections.Counter(cids).items()})
+        for lid, n in cnt.lids.items():
+            cnt.languages[lang2glottolog[lid]] += n
+        for pid, n in cnt.cids.items():
+            cnt.concepts[param2concepticon[pid]] += n
+        # Count (language, parameter) pairs, encoded as single integers:
+        ncids = len(pcodes)
+        for k, n in collections.Counter(
+                map(operator.add, map(ncids.__mul__, lids), cids)).items():
+            cnt.synonyms[lids_[k // ncids]][cids_[k % ncids]] = n
+
+        if cldf.get('CognateTable') is not None:
+            cnt.cognate_sets.update(
+                cogid for cogid, in iter_columns(cldf, 'CognateTable', 'Cognateset_ID'))
+
+        bookkeeping_languoids_in_gl = GlottologIndex(glottolog.api).bookkeeping \
+            if glottolog else set()
         for lang in cldf.iter_rows('LanguageTable', 'glottocode'):
             if lang.get('glottocode'):
                 if lang['glottocode'] in bookkeeping_languoids_in_gl:
@@ -0,0 +1,205 @@
+"""
+Cached lookup of BIPA sound data from CLTS.
+
+Looking up a grapheme in CLTS requires loading the BIPA transcription system and parsing the
+grapheme - both of which are expensive. But the data we need for a grapheme (name, type, BIPA
+grapheme and sound classes) only changes with the CLTS data. So we persist it in an SQLite
+database in the user's cache directory, keyed by a fingerprint of the CLTS data.
+
+Since different datasets may be curated with different CLTS versions, the database keeps the data
+for the `MAX_VERSIONS` most recently used CLTS versions. Data for other versions is evicted when
+the database is opened.
+"""
+import logging
+import pathlib
+import hashlib
+import sqlite3
+import itertools
+import unicodedata
+import dataclasses
+from collections.abc import Iterable
+from typing import Optional
+
+import pyclts
+
+from pylexibank.util import LRUCache, VersionedStore, cache_dir
+
+__all__ = ['Sound', 'Sounds', 'SoundStore', 'clts_version']
+log = logging.getLogger('pylexibank')
+
+# Number of CLTS versions for which sound data is kept in the persistent cache:
+MAX_VERSIONS = 3
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sound (
+    version TEXT,
+    grapheme TEXT,
+    type TEXT,
+    name TEXT,
+    bipa TEXT,
+    generated INTEGER,
+    codepoints TEXT,
+    dolgo TEXT,
+    sca TEXT,
+    PRIMARY KEY (version, grapheme)
+);
+"""
+
+
+def clts_version(clts: pyclts.CLTS) -> str:
+    """A fingerprint of the CLTS data relevant for BIPA lookups."""
+    md5 = hashlib.md5()
+    tsdir = clts.transcriptionsystems_dir
+    for p in sorted(itertools.chain(
+            tsdir.joinpath('bipa').glob('*.tsv'),
+            [tsdir / 'transcription-system-metadata.json', tsdir / 'features.json'],
+            clts.soundclasses_dir.glob('*.tsv'),
+    )):
+        if p.is_file():
+            md5.update(p.name.encode('utf8'))
+            md5.update(p.read_bytes())
+    return md5.hexdigest()
+
+
+@dataclasses.dataclass(frozen=True)
+class Sound:
+    """
+    The data of a BIPA sound relevant for Lexibank.
+
+    A `Sound` provides the attributes of `pyclts.models.Symbol` - like `grapheme`, `source`, `s`,
+    `name`, `type()`, `generated`, `codepoints` and `uname` - but not the phonological features of
+    `pyclts.models.Sound`. Unknown sounds are signaled by `unknown`, rather than by being instances
+    of `pyclts.models.UnknownSound`.
+    """
+    grapheme: str
+    sound_type: str
+    name: Optional[str]
+    bipa: str
+    generated: bool
+    codepoints: str
+    dolgo: str
+    sca: str
+
+    def __str__(self):
+        return self.bipa
+
+    def type(self) -> str:
+        """The lowercased name of the pyclts class of the sound, e.g. "vowel" or "unknownsound"."""
+        return self.sound_type
+
+    @property
+    def source(self) -> str:
+        """The grapheme which has been looked up."""
+        return self.grapheme
+
+    @property
+    def s(self) -> str:  # pylint: disable=C0103
+        """The BIPA grapheme."""
+        return self.bipa
+
+    @property
+    def uname(self) -> str:
+        """The Unicode names of the characters of the BIPA grapheme."""
+        try:
+            return ' / '.join(unicodedata.name(c) for c in self.bipa)
+        except ValueError:
+            return '?'
+
+    @property
+    def unknown(self) -> bool:
+        """Flag signaling whether the grapheme could not be parsed as BIPA sound."""
+        return self.sound_type == 'unknownsound'
+
+    @classmethod
+    def from_clts(cls, grapheme: str, clts: pyclts.CLTS) -> 'Sound':
+        """Lookup a grapheme in CLTS."""
+        sound = clts.bipa[grapheme]
+        return cls(
+            grapheme=grapheme,
+            sound_type=sound.type(),
+            name=sound.name,
+            bipa=str(sound),
+            generated=bool(sound.generated),
+            codepoints=sound.codepoints,
+            dolgo=clts.bipa.translate(grapheme, clts.soundclass('dolgo')),
+            sca=clts.bipa.translate(grapheme, clts.soundclass('sca')),
+        )
+
+
+class SoundStore:
+    """SQLite database storing `Sound` data for one CLTS version."""
+    def __init__(self, version: str, path: Optional[pathlib.Path] = None):
+        self.version = version
+        self.path = path or cache_dir() / 'clts-sounds-v1.sqlite'
+        self.db = VersionedStore(self.path, SCHEMA, ['sound'], MAX_VERSIONS)
+
+    def load(self) -> dict[str, Sound]:
+        """Read all sounds stored for the version, evicting data of outdated versions."""
+        try:
+            with self.db.connection() as conn:
+                self.db.use(conn, self.version)
+                return {
+                    row[0]: Sound(row[0], row[1], row[2], row[3], bool(row[4]), *row[5:])
+                    for row in conn.execute(
+                        "SELECT grapheme, type, name, bipa, generated, codepoints, dolgo, sca "
+                        "FROM sound WHERE version = ?", (self.version,))}
+        except sqlite3.Error as e:  # pragma: no cover
+            log.warning('Could not read sound cache %s: %s', self.path, e)
+            return {}
+
+    def save(self, sounds: Iterable[Sound]):
+        """Add sounds to the store."""
+        try:
+            with self.db.connection() as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO sound VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(self.version, s.grapheme, s.sound_type, s.name, s.bipa, int(s.generated),
+                      s.codepoints, s.dolgo, s.sca) for s in sounds])
+        except sqlite3.Error as e:  # pragma: no cover
+            log.warning('Could not write sound cache %s: %s', self.path, e)
+
+
+class Sounds:
+    """
+    A mapping of graphemes to `Sound` data, backed by the persistent store for the CLTS version.
+
+    CLTS is only consulted for graphemes which have not been looked up before.
+    """
+    def __init__(
+            self,
+            clts: pyclts.CLTS,
+            store: Optional[SoundStore] = None,
+            maxsize: Optional[int] = None,
+    ):
+        self.clts = clts
+        self.store = store or SoundStore(clts_version(clts))
+        self.cache = LRUCache(maxsize)
+        for sound in self.store.load().values():
+            self.cache[sound.grapheme] = sound
+        self.new: list[Sound] = []
+
+    def _lookup(self, grapheme: str) -> Sound:
+        sound = Sound.from_clts(grapheme, self.clts)
+        self.new.append(sound)
+        return sound
+
+    def __getitem__(self, grapheme: str) -> Sound:
+        return self.cache.get(grapheme, self._lookup, grapheme)
+
+    def __contains__(self, grapheme: str) -> bool:
+        return grapheme in self.cache
+
+    def __call__(self, graphemes: Iterable[str]) -> list[Sound]:
+        return [self[g] for g in graphemes]
+
+    def update(self, sounds: Iterable[Sound]):
+        """Add sounds looked up elsewhere, e.g. in another process."""
+        for sound in sounds:
+            if sound.grapheme not in self.cache:
+                self.cache[sound.grapheme] = sound
+                self.new.append(sound)
+
+    def save(self):
+        """Persist the sounds looked up in CLTS so far."""
+        if self.new:
+            self.store.save(self.new)
+            self.new = []
@@ -0,0 +1,244 @@
+"""
+A binary, columnar cache of the tables of a CLDF Wordlist.
+
+Reading a table with `csvw` means parsing and converting all values of all rows according to the
+table schema. For big tables this is slow - and it is repeated by every command reading the data.
+Thus, the parsed data of FormTable, LanguageTable, ParameterTable and CognateTable is cached in the
+user's cache directory, keyed by the path of the CLDF directory. A cached table is re-created when
+the data file or the metadata of the dataset changed, as detected by file sizes and modification
+times. The caches of the `MAX_WORDLISTS` most recently used datasets are kept, caches of other
+datasets are evicted when a new cache is written.
+
+A column is stored as the list of its distinct values plus an array of indices into this list
+for all rows. The index arrays are memory-mapped, so opening a cached table only requires loading
+the distinct values.
+
+The distinct values are pickled. Since unpickling means executing data, a cache file is only
+unpickled if it is owned - and only writable - by the current user, and if the checksum recorded
+in its JSON header matches.
+"""
+import os
+import json
+import mmap
+import array
+import pickle
+import struct
+import hashlib
+import logging
+import pathlib
+from collections.abc import Sequence, Generator, Iterable
+from typing import Any, Optional
+
+import pycldf
+
+from pylexibank.util import cache_dir, trusted, evict_least_recently_used
+
+__all__ = ['WordlistCache', 'CachedTable']
+log = logging.getLogger('pylexibank')
+
+# The tables which are cached:
+TABLES = ('FormTable', 'LanguageTable', 'ParameterTable', 'CognateTable')
+# The maximal number of datasets for which tables are cached:
+MAX_WORDLISTS = 50
+MAGIC = b'LXBTAB2\n'
+# Header: magic, length of the JSON table description and of the pickled distinct values.
+HEADER = struct.Struct('<8sQQ')
+# The type of the index arrays:
+TYPECODE = 'I'
+
+
+class CachedTable(Sequence):
+    """
+    The rows of a cached table.
+
+    Rows are decoded into `dict`s when accessed. List values (e.g. `Segments`) are copied, so rows
+    may be modified freely.
+    """
+    def __init__(
+            self,
+            columns: list[str],
+            values: list[list[Any]],
+            codes: list[Sequence[int]],
+            buffer: Optional[mmap.mmap] = None,
+    ):
+        self.columns = columns
+        self._values = values
+        self._codes = codes
+        self._lists = [any(isinstance(v, list) for v in vals) for vals in values]
+        # Keep a reference to the memory-mapped file:
+        self._buffer = buffer
+
+    def __len__(self):
+        return len(self._codes[0]) if self._codes else 0
+
+    def _row(self, codes: Iterable[int]) -> dict[str, Any]:
+        row = {}
+        for col, vals, is_list, code in zip(self.columns, self._values, self._lists, codes):
+            row[col] = list(vals[code]) if is_list and vals[code] is not None else vals[code]
+        return row
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self._row(codes[i] for codes in self._codes)
+
+    def __iter__(self):
+        for codes in zip(*self._codes):
+            yield self._row(codes)
+
+    def column(self, name: str) -> list[Any]:
+        """The values of one column for all rows."""
+        j = self.columns.index(name)
+        vals = self._values[j]
+        return [vals[code] for code in self._codes[j]]
+
+    def encoded(self, name: str) -> tuple[list[Any], Sequence[int]]:
+        """
+        The distinct values of one column and the codes - i.e. indices into the list of distinct
+        values - for all rows.
+        """
+        j = self.columns.index(name)
+        return self._values[j], self._codes[j]
+
+    @staticmethod
+    def _key(value: Any) -> Any:
+        """A hashable key for a value, distinguishing values of different type, like 1 and True."""
+        try:
+            return type(value), tuple(value) if isinstance(value, list) else value
+        except TypeError:  # pragma: no cover
+            return type(value), pickle.dumps(value)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, Any]]) -> 'CachedTable':
+        """Encode rows - as read with `csvw` - column-wise."""
+        columns, values, codes, indices = [], [], [], []
+        for row in rows:
+            if not columns:
+                columns = list(row)
+                values = [[] for _ in columns]
+                codes = [array.array(TYPECODE) for _ in columns]
+                indices = [{} for _ in columns]
+            for col, vals, cds, index in zip(columns, values, codes, indices):
+                value = row.get(col)
+                key = cls._key(value)
+                if key not in index:
+                    index[key] = len(vals)
+                    vals.append(value)
+                cds.append(index[key])
+        return cls(columns, values, codes)
+
+    def write(self, path: pathlib.Path, stamp: tuple):
+        """Write the table to a cache file, marked with `stamp`."""
+        values = pickle.dumps(self._values, protocol=4)
+        description = json.dumps(dict(
+            stamp=stamp,
+            columns=self.columns,
+            rows=len(self),
+            md5=hashlib.md5(values).hexdigest())).encode('utf8')
+        tmp = path.parent / f'{path.name}.{os.getpid()}.tmp'
+        with tmp.open('wb') as f:
+            f.write(HEADER.pack(MAGIC, len(description), len(values)))
+            f.write(description)
+            f.write(values)
+            # Align the index arrays:
+            f.write(b'\x00' * (-f.tell() % 8))
+            for codes in self._codes:
+                f.write(array.array(TYPECODE, codes).tobytes())
+        # Make sure the file is trusted when read - whatever the umask:
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+
+    @classmethod
+    def read(cls, path: pathlib.Path, stamp: tuple) -> Optional['CachedTable']:
+        """Read a table from a cache file - if the file exists and is marked with `stamp`."""
+        if not path.exists():
+            return None
+        with path.open('rb') as f:
+            magic, ldescription, lvalues = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:  # pragma: no cover
+                return None
+            description = json.loads(f.read(ldescription).decode('utf8'))
+            # JSON turns tuples into lists:
+            if description['stamp'] != json.loads(json.dumps(stamp)):
+                return None
+            values = f.read(lvalues)
+            if not trusted(path) or hashlib.md5(values).hexdigest() != description['md5']:
+                log.warning('Ignoring untrusted table cache %s', path)
+                return None
+            values = pickle.loads(values)
+            offset = f.tell() + (-f.tell() % 8)
+            if not description['rows']:
+                return cls(description['columns'], values, [[] for _ in values])
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+        size = description['rows'] * array.array(TYPECODE).itemsize
+        codes = [
+            view[offset + j * size:offset + (j + 1) * size].cast(TYPECODE)
+            for j in range(len(values))]
+        return cls(description['columns'], values, codes, buffer=buffer)
+
+
+class WordlistCache:
+    """
+    Access to the tables of a CLDF Wordlist, read from the cache if possible.
+
+    >>> cache = WordlistCache(pycldf.Dataset.from_metadata('cldf/cldf-metadata.json'))
+    >>> forms = cache['FormTable']
+    """
+    def __init__(self, cldf: pycldf.Dataset, directory: Optional[pathlib.Path] = None):
+        self.cldf = cldf
+        self.dir = directory
+        if self.dir is None and isinstance(cldf.directory, pathlib.Path):
+            path = cldf.directory.resolve()
+            self.dir = cache_dir() / 'wordlists' / '{}-{}'.format(
+                path.parent.name, hashlib.md5(str(path).encode('utf8')).hexdigest()[:8])
+        self._tables: dict[str, CachedTable] = {}
+
+    def _stamp(self, table) -> Optional[tuple]:
+        fname = pathlib.Path(str(table.url.resolve(table.base)))
+        if not fname.exists():
+            fname = fname.parent / f'{fname.name}.zip'
+        stamp = []
+        for p in [fname, pathlib.Path(self.cldf.directory) / self.cldf.filename]:
+            if not p.exists():  # pragma: no cover
+                return None
+            stat = p.stat()
+            stamp.append((p.name, stat.st_size, stat.st_mtime_ns))
+        return tuple(stamp)
+
+    def _read(self, table) -> CachedTable:
+        stamp = self._stamp(table) if self.dir else None
+        if stamp is None:  # pragma: no cover
+            return CachedTable.from_rows(table)
+        path = self.dir / f'{table.url.string}.bin'
+        res = CachedTable.read(path, stamp)
+        if res is None:
+            res = CachedTable.from_rows(table)
+            try:
+                self.dir.mkdir(parents=True, exist_ok=True)
+                res.write(path, stamp)
+                evict_least_recently_used(
+                    (p for p in self.dir.parent.iterdir() if p.is_dir()), MAX_WORDLISTS)
+            except OSError as e:  # pragma: no cover
+                log.warning('Could not write table cache %s: %s', path, e)
+        else:
+            # Mark the cache of the dataset as recently used:
+            os.utime(self.dir)
+        return res
+
+    def __getitem__(self, table: str) -> CachedTable:
+        """The rows of a table."""
+        table = self.cldf[table]
+        key = table.url.string
+        if key not in self._tables:
+            self._tables[key] = self._read(table) \
+                if self.cldf.get_tabletype(table) in TABLES else CachedTable.from_rows(table)
+        return self._tables[key]
+
+    def iter_rows(self, table: str, *cols: str) -> Generator[dict, None, None]:
+        """Iterate over rows, with additional keys for columns specified by CLDF term."""
+        names = {col: self.cldf[table, col].name for col in cols}
+        for row in self[table]:
+            for col, name in names.items():
+                row[col] = row[name]
+            yield row
@@ -1,16 +1,19 @@
 """
 Functionality to analyze transcriptions.
 """
+import warnings
 import itertools
 import collections
 from collections.abc import Iterable
 import dataclasses
-from typing import Any, Union
+from typing import Any, Union, Optional
 
 import pyclts
-import pyclts.models
 from clldutils.markup import Table
 
+from pylexibank.sounds import Sound, Sounds
+from pylexibank.util import LRUCache
+
 
 @dataclasses.dataclass
 class Analysis:
@@ -40,6 +43,15 @@ class Analysis:
             ('segments', collections.OrderedDict(sorted(self.segments.items()))),
         ])
 
+    def update(self, other: 'Analysis'):
+        """Update the analysis with the results of another analysis."""
+        self.segments.update(other.segments)
+        self.bipa_errors.update(other.bipa_errors)
+        self.sclass_errors.update(other.sclass_errors)
+        for source, replacements in other.replacements.items():
+            self.replacements.setdefault(source, set()).update(replacements)
+        self.general_errors += other.general_errors
+
     @property
     def error_segments(self) -> set[str]:
         """Set of invalid segments encountered so far."""
@@ -132,6 +144,11 @@ class Report:
             ('stats', self.stats.to_json()),
         ])
 
+    def merge(self, analyses: dict[str, Analysis]):
+        """Merge language-specific analyses, e.g. computed in another process, into the report."""
+        for lid, analysis in analyses.items():
+            self.get_analysis(lid).update(analysis)
+
     def get_analysis(self, lid: str) -> Analysis:
         """Return the Analysis object for a given language."""
         if lid not in self.by_language:
@@ -180,18 +197,56 @@ def valid_sequence(segments: list[str]) -> Union[bool, list[str]]:
 
 @dataclasses.dataclass
 class CachedSegments:
-    """We cache lookups in CLTS, since these may be expensive."""
-    bipa: dict[str, Any] = dataclasses.field(default_factory=dict)
-    dolgo: dict[str, Any] = dataclasses.field(default_factory=dict)
-
-    def get_bipa(self, grapheme: str, clts: pyclts.CLTS):
-        """Lookup a BIPA sound."""
-        return self.bipa.get(grapheme) or self.bipa.setdefault(grapheme, clts.bipa[grapheme])
+    """
+    We cache lookups in CLTS, since these may be expensive.
 
-    def get_dolgo(self, grapheme: str, clts: pyclts.CLTS):
-        """Lookup a Dolgopolsky soundclass."""
-        return self.dolgo.get(grapheme) or self.dolgo.setdefault(
-            grapheme, clts.bipa.translate(grapheme, clts.soundclass('dolgo')))
+    Lookups are memoized in a bounded LRU cache per CLTS instance, counting hits and misses (see
+    `sounds.Sounds`).
+    """
+    maxsize: Optional[int] = 2 ** 16
+    # Map `id(clts)` to pairs (clts, Sounds) - keeping a reference to the CLTS object makes sure
+    # the id is not re-used:
+    lookups: dict[int, tuple[pyclts.CLTS, Sounds]] = dataclasses.field(default_factory=dict)
+
+    def sounds(self, clts: pyclts.CLTS) -> Sounds:
+        """The `Sounds` mapping for a CLTS instance, backed by the persistent sound cache."""
+        if id(clts) not in self.lookups:
+            self.lookups[id(clts)] = (clts, Sounds(clts, maxsize=self.maxsize))
+        return self.lookups[id(clts)][1]
+
+    def save(self):
+        """Persist all sounds looked up in CLTS."""
+        for _, sounds in self.lookups.values():
+            sounds.save()
+
+    def _caches(self) -> list[LRUCache]:
+        return [sounds.cache for _, sounds in self.lookups.values()]
+
+    def stats(self) -> tuple[int, int]:
+        """Total number of cache hits and misses."""
+        caches = self._caches()
+        return sum(c.hits for c in caches), sum(c.misses for c in caches)
+
+    def reset_stats(self):
+        """Reset the hit and miss counters of all caches."""
+        for cache in self._caches():
+            cache.reset_stats()
+
+    def get_bipa(self, grapheme: str, clts: pyclts.CLTS) -> Sound:
+        """Lookup a BIPA sound. Deprecated: Use `CachedSegments.sounds` instead."""
+        warnings.warn(
+            'CachedSegments.get_bipa is deprecated, use CachedSegments.sounds',
+            DeprecationWarning,
+            stacklevel=2)
+        return self.sounds(clts)[grapheme]
+
+    def get_dolgo(self, grapheme: str, clts: pyclts.CLTS) -> str:
+        """Lookup a Dolgopolsky soundclass. Deprecated: Use `CachedSegments.sounds` instead."""
+        warnings.warn(
+            'CachedSegments.get_dolgo is deprecated, use CachedSegments.sounds',
+            DeprecationWarning,
+            stacklevel=2)
+        return self.sounds(clts)[grapheme].dolgo
 
 
 # A global segments cache:
@@ -203,6 +258,8 @@ def analyze(clts: pyclts.CLTS, segments: Iterable[str], analysis: Analysis):
     Test a sequence for compatibility with CLPA and LingPy.
 
     :param analysis: Pass a `TranscriptionAnalysis` instance for cumulative reporting.
+    :return: Quadruple (segments, BIPA sounds, Dolgopolsky sound classes, analysis), where the \
+    BIPA sounds are `sounds.Sound` objects.
     """
     # raise a ValueError in case of empty segments/strings
     if not segments:
@@ -214,18 +271,15 @@ def analyze(clts: pyclts.CLTS, segments: Iterable[str], analysis: Analysis):
         raise ValueError('No information in the sequence.')
 
     # build the phonologic and sound class analyses
-    bipa_analysis, sc_analysis = [], []
-
-    for s in segments:
-        bipa_analysis.append(SEGMENTS_CACHE.get_bipa(s, clts))
-        sc_analysis.append(SEGMENTS_CACHE.get_dolgo(s, clts))
+    bipa_analysis = SEGMENTS_CACHE.sounds(clts)(segments)
+    sc_analysis = [sound.dolgo for sound in bipa_analysis]
 
     # compute general errors; this loop must take place outside the
     # following one because the code for computing single errors (either
     # in `bipa_analysis` or in `soundclass_analysis`) is unnecessary
     # complicated
     for sound_bipa, sound_class in zip(bipa_analysis, sc_analysis):
-        if isinstance(sound_bipa, pyclts.models.UnknownSound) or sound_class == '?':
+        if sound_bipa.unknown or sound_class == '?':
             analysis.general_errors += 1
 
     # iterate over the segments and analyses, updating counts of occurrences
@@ -236,12 +290,12 @@ def analyze(clts: pyclts.CLTS, segments: Iterable[str], analysis: Analysis):
 
         # add an error if we got an unknown sound, otherwise just append
         # the `replacements` dictionary
-        if isinstance(sound_bipa, pyclts.models.UnknownSound):
+        if sound_bipa.unknown:
             analysis.bipa_errors.add(segment)
         else:
-            if sound_bipa.source not in analysis.replacements:
-                analysis.replacements[sound_bipa.source] = set()
-            analysis.replacements[sound_bipa.source].add(str(sound_bipa))
+            if sound_bipa.grapheme not in analysis.replacements:
+                analysis.replacements[sound_bipa.grapheme] = set()
+            analysis.replacements[sound_bipa.grapheme].add(str(sound_bipa))
 
         # update sound class errors, if any
         if sound_class == '?':
@@ -260,11 +314,8 @@ def analyze_segments(clts: pyclts.CLTS, form_data: dict, report: Report, with_mo
         valid = valid_sequence(segments)
         _, _bipa, _sc, _analysis = analyze(clts, segments, analysis)
 
-        # update the list of `bad_words` if necessary; we precompute a
-        # list of data types in `_bipa` just to make the conditional
-        # checking easier
-        _bipa_types = [type(s) for s in _bipa]
-        if (pyclts.models.UnknownSound in _bipa_types) or '?' in _sc or not valid:
+        # update the list of `bad_words` if necessary
+        if any(s.unknown for s in _bipa) or '?' in _sc or not valid:
             report.add_bad_word(form_data)
     except ValueError:  # pragma: no cover
         report.add_invalid_word(form_data)
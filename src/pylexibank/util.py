@@ -1,14 +1,27 @@
 """
 Utility functions
 """
+import os
 import re
+import sys
+import json
+import time
+import heapq
+import bisect
 import logging
 import pathlib
+import shutil
+import sqlite3
+import functools
 import itertools
+import contextlib
 import collections
+import dataclasses
+import importlib.metadata
 from collections.abc import Iterable, Generator
 from typing import Union, Callable, Any, Optional
 
+import platformdirs
 from termcolor import colored
 from tqdm import tqdm
 
@@ -20,6 +33,8 @@ from pyconcepticon.api import Concept, Conceptlist
 __all__ = ['progressbar', 'iter_repl']
 ENTRY_POINT = 'lexibank.dataset'
 YEAR_PATTERN = re.compile(r'\s+\(?(?P<year>[1-9][0-9]{3}(-[0-9]+)?)(\)|\.)')
+# The location of the cache directory can be customized via environment variable:
+CACHE_DIR_ENV = 'PYLEXIBANK_CACHE_DIR'
 
 
 def progressbar(iterable=None, **kw):
@@ -42,13 +57,275 @@ def iter_repl(seq, subseq, repl) -> Generator[Any, None, None]:
     """
     seq, subseq, repl = list(seq), list(subseq), list(repl)
     subseq_len = len(subseq)
-    rem = seq[:]
-    while rem:
-        if rem[:subseq_len] == subseq:
+    i = 0
+    while i < len(seq):
+        if seq[i:i + subseq_len] == subseq:
             yield from repl
-            rem = rem[subseq_len:]
+            i += subseq_len
         else:
-            yield rem.pop(0)
+            yield seq[i]
+            i += 1
+
+
+class SegmentReplacer:
+    """
+    A compiled table of segment replacements, as specified in a dataset's etc/segments.csv.
+
+    Applying the replacer is equivalent to chaining `iter_repl` calls for each rule in order, i.e.
+    each rule operates on the output of the rules before it. But rather than running every rule on
+    every form, we only try the rules which are triggered by a segment actually present in the form
+    - or introduced by an earlier replacement.
+
+    >>> r = SegmentReplacer({'x y': 'u', 'u': 'a b'})
+    >>> r(['x', 'y', 'z'])
+    ['a', 'b', 'z']
+    """
+    def __init__(self, replacements: dict[str, str]):
+        self.rules: list[tuple[list[str], list[str]]] = [
+            (source.split(), target.split()) for source, target in replacements.items()
+            if source.split()]
+        # A rule can only match if all of its source segments are present. So we index each rule
+        # by its least common source segment, mapping segments to ordered lists of rule indices:
+        freq = collections.Counter(itertools.chain(*[set(source) for source, _ in self.rules]))
+        self._triggers: dict[str, list[int]] = collections.defaultdict(list)
+        for i, (source, _) in enumerate(self.rules):
+            self._triggers[min(source, key=lambda s: freq[s])].append(i)
+
+    def __len__(self):
+        return len(self.rules)
+
+    @staticmethod
+    def _replace(seq: list[str], subseq: list[str], repl: list[str]) -> Optional[list[str]]:
+        """Replace `subseq` in `seq` - returning `None` if there was nothing to replace."""
+        first, subseq_len, res, i, changed = subseq[0], len(subseq), [], 0, False
+        while i < len(seq):
+            if seq[i] == first and seq[i:i + subseq_len] == subseq:
+                res.extend(repl)
+                i += subseq_len
+                changed = True
+            else:
+                res.append(seq[i])
+                i += 1
+        return res if changed else None
+
+    def _triggered(self, segments: Iterable[str], after: int = -1) -> Generator[int, None, None]:
+        for segment in set(segments):
+            indices = self._triggers.get(segment)
+            if indices:
+                yield from indices[bisect.bisect_right(indices, after):]
+
+    def __call__(self, segments: Iterable[str]) -> list[str]:
+        seq = list(segments)
+        candidates = list(self._triggered(seq))
+        heapq.heapify(candidates)
+        last = -1
+        while candidates:
+            index = heapq.heappop(candidates)
+            if index == last:
+                continue  # A rule may have been triggered more than once.
+            last = index
+            subseq, repl = self.rules[index]
+            res = self._replace(seq, subseq, repl)
+            if res is not None:
+                seq = res
+                # Segments introduced by the replacement may trigger rules further down the list:
+                for i in self._triggered(repl, after=index):
+                    heapq.heappush(candidates, i)
+        return seq
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    A bounded memo, evicting the least recently used items and counting hits and misses.
+
+    Unlike with `functools.lru_cache`, cached values can be inspected and added explicitly. Values
+    are looked up using a sentinel, so falsy values are cached as well.
+
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.get('a', str.upper, 'a')
+    'A'
+    >>> (cache.hits, cache.misses)
+    (0, 1)
+    """
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key, factory: Callable[..., Any], *args) -> Any:
+        """Lookup `key`, computing the value as `factory(*args)` if it's not cached."""
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            value = self[key] = factory(*args)
+            return value
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def values(self):
+        """The cached values, from least to most recently used."""
+        return self._data.values()
+
+    def reset_stats(self):
+        """Reset the hit and miss counters."""
+        self.hits = self.misses = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class Requirement:
+    """An installed distribution, as listed in a requirements.txt file."""
+    name: str
+    version: str
+    # Whether the distribution provides lexibank datasets:
+    dataset: bool = False
+    # The URL the distribution was installed from - e.g. a pinned VCS URL (see PEP 610):
+    url: Optional[str] = None
+
+    def __str__(self):
+        return f'{self.name} @ {self.url}' if self.url else f'{self.name}=={self.version}'
+
+
+def _direct_url(dist: importlib.metadata.Distribution) -> Optional[str]:
+    """
+    The URL of a distribution installed from a VCS, an archive or a local directory - read from
+    `direct_url.json` as specified in PEP 610.
+    """
+    try:
+        info = json.loads(dist.read_text('direct_url.json') or 'null')
+    except ValueError:  # pragma: no cover
+        return None
+    if not isinstance(info, dict) or not info.get('url'):
+        return None
+    url, vcs = info['url'], info.get('vcs_info')
+    if vcs:
+        url = f"{vcs['vcs']}+{url}"
+        if vcs.get('commit_id'):
+            url += f"@{vcs['commit_id']}"
+    if info.get('subdirectory'):
+        url += f"#subdirectory={info['subdirectory']}"
+    return url
+
+
+@functools.lru_cache(maxsize=None)
+def installed_distributions() -> tuple[Requirement, ...]:
+    """
+    The installed distributions, read from the package metadata - without importing any modules.
+
+    Since reading the metadata of all installed distributions is slow, the result is cached for
+    the interpreter session.
+    """
+    res = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata['Name']
+        # Only the first of multiple distributions with the same name on sys.path is imported:
+        if name and name.lower() not in res:
+            res[name.lower()] = Requirement(
+                name,
+                dist.version,
+                dataset=any(ep.group == ENTRY_POINT for ep in dist.entry_points),
+                url=_direct_url(dist))
+    return tuple(res.values())
+
+
+def iter_requirements(exclude_datasets: bool = True) -> Generator[Requirement, None, None]:
+    """
+    The installed distributions providing packages which are imported in the current process.
+
+    Unlike `cldfbench.util.iter_requirements`, this does not run `pip freeze`.
+
+    :param exclude_datasets: Flag signaling whether to skip distributions providing lexibank \
+    datasets.
+    """
+    imported = set(m.split('.')[0].lower() for m in sys.modules)
+    for req in installed_distributions():
+        if exclude_datasets and req.dataset:
+            continue
+        name = req.name.lower()
+        if name in imported or name.replace('python-', '') in imported:
+            yield req
+
+
+def cache_dir() -> pathlib.Path:
+    """The directory for persistent caches of pylexibank."""
+    return pathlib.Path(os.environ.get(CACHE_DIR_ENV) or platformdirs.user_cache_dir('pylexibank'))
+
+
+def trusted(path: pathlib.Path) -> bool:
+    """Whether a file is owned and only writable by the current user."""
+    if not hasattr(os, 'getuid'):  # pragma: no cover
+        return True
+    stat = path.stat()
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+
+def evict_least_recently_used(paths: Iterable[pathlib.Path], maxcount: int):
+    """
+    Remove all but the `maxcount` most recently used - i.e. modified - files or directories.
+    """
+    paths = sorted(paths, key=lambda p: p.stat().st_mtime)
+    for p in paths[:max(len(paths) - maxcount, 0)]:
+        if p.is_dir():
+            shutil.rmtree(p, ignore_errors=True)
+        else:
+            p.unlink(missing_ok=True)
+
+
+class VersionedStore:
+    """
+    An SQLite database in the user's cache directory, keeping data for the `max_versions` most
+    recently used versions of some data source - e.g. of the CLTS or Glottolog data.
+
+    All tables listed in `tables` must have a `version` column.
+    """
+    def __init__(self, path: pathlib.Path, schema: str, tables: Iterable[str], max_versions: int):
+        self.path = path
+        self.schema = schema
+        self.tables = list(tables)
+        self.max_versions = max_versions
+
+    @contextlib.contextmanager
+    def connection(self):
+        """A connection to the database, committing a transaction when the context is left."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with contextlib.closing(sqlite3.connect(str(self.path), timeout=30)) as conn:
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS version (id TEXT PRIMARY KEY, last_used REAL);\n"
+                + self.schema)
+            with conn:
+                yield conn
+
+    def use(self, conn: sqlite3.Connection, version: str) -> bool:
+        """
+        Mark `version` as most recently used, evicting the data of outdated versions.
+
+        :return: Flag signaling whether data for `version` has been stored before.
+        """
+        exists = conn.execute("SELECT 1 FROM version WHERE id = ?", (version,)).fetchone()
+        conn.execute(
+            "INSERT OR REPLACE INTO version (id, last_used) VALUES (?, ?)", (version, time.time()))
+        conn.execute(
+            "DELETE FROM version WHERE id NOT IN "
+            "(SELECT id FROM version ORDER BY last_used DESC LIMIT ?)", (self.max_versions,))
+        for table in self.tables:
+            conn.execute(f"DELETE FROM {table} WHERE version NOT IN (SELECT id FROM version)")
+        return bool(exists)
 
 
 def split_by_year(s: str) -> tuple[Optional[str], Optional[str], str]:
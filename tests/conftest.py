@@ -15,6 +15,14 @@ from cldfcatalog.repository import get_test_repo
 import pylexibank
 
 
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory, monkeypatch):
+    # Make sure tests don't write to the user's cache directory:
+    d = tmp_path_factory.mktemp('cache')
+    monkeypatch.setenv('PYLEXIBANK_CACHE_DIR', str(d))
+    return d
+
+
 @pytest.fixture
 def git_repo(tmp_path):
     return get_test_repo(tmp_path, remote_url='https://github.com/lexibank/dataset.git')
@@ -3,8 +3,9 @@ import dataclasses
 
 import pytest
 
-from pylexibank.cldf import LexibankWriter
+from pylexibank.cldf import LexibankWriter, StreamedObjects
 from pylexibank import Language, Dataset
+from pylexibank.models import Lexeme
 from clldutils.jsonlib import load
 
 
@@ -50,6 +51,103 @@ def test_align_cognates(dataset, clts, mocker):
         assert lex['Segments'] == ['a', 'b']
 
 
+def test_glottolog_data(dataset, glottolog, mocker):
+    with LexibankWriter(
+        cldf_spec=dataset.get_lexibank_cldf_spec(),
+        dataset=dataset,
+        args=Namespace(glottolog=mocker.Mock(api=glottolog)),
+    ) as ds:
+        assert ds.glottolog_data([dict(Glottocode='abcd1234'), dict(Glottocode='x'), {}]) == [
+            dict(Latitude=None, Longitude=None, Glottolog_Name='A Language',
+                 ISO639P3code='abc', Family='A Language', Macroarea='Papunesia'),
+            {},
+            {}]
+        assert ds.add_languages() == ['1', '2']
+        # The Glottocode was looked up by ISO code:
+        assert ds.objects['LanguageTable'][-1]['Glottocode'] == 'abcd1234'
+        assert ds.objects['LanguageTable'][-1]['Macroarea'] == 'Papunesia'
+
+    dataset.glottolog = None
+    with LexibankWriter(
+            cldf_spec=dataset.get_lexibank_cldf_spec(), dataset=dataset, args=Namespace()) as ds:
+        assert ds.glottolog_index is None
+
+
+def test_process_forms(dataset, clts, mocker):
+    with LexibankWriter(
+        cldf_spec=dataset.get_lexibank_cldf_spec(),
+        dataset=dataset,
+        args=Namespace(clts=mocker.Mock(api=clts))
+    ) as ds:
+        kw = dict(Language_ID='l', Parameter_ID='p', Value='x')
+        result = ds.process_forms(
+            [
+                (dict(ID='1', Form='ab', **kw), None),
+                (dict(ID='2', Form='u', Segments=['u'], **kw), None),
+            ],
+            True)
+        assert [item['Segments'] for item, _, _ in result.forms] == [['a b'], ['a', 'b']]
+        assert result.analyses['l'].segments['a'] == 2
+        assert sum(result.sound_lookups) > 0
+        assert result.tokenizer_lookups == (0, 0)
+
+
+def test_pending_form(dataset, clts, mocker):
+    @dataclasses.dataclass
+    class Form(Lexeme):
+        def __post_init__(self):
+            # Validators see the same data - including segments - with and without workers:
+            assert self.Segments
+            super().__post_init__()
+
+    dataset.lexeme_class = Form
+    # A tokenizer memoizing results like the one created from orthography profiles:
+    dataset.tokenizer = lambda item, string, **kw: dataset.tokenizer_cache.get(
+        string, lambda: [' '.join(string)])
+
+    def add_forms(**kw):
+        dataset.tokenizer_cache.reset_stats()
+        with LexibankWriter(
+            cldf_spec=dataset.get_lexibank_cldf_spec(),
+            dataset=dataset,
+            args=Namespace(clts=mocker.Mock(api=clts), **kw)
+        ) as ds:
+            lex = ds.add_form(Language_ID='l', Parameter_ID='p', Value='ab', Form='ab')
+            pending = bool(ds._pending)
+            if pending:
+                # Rows only contain the values passed when adding the form ...
+                assert lex['Form'] == 'ab' and 'Segments' not in lex
+                # ... until the results of the workers are merged:
+                ds.flush()
+            res = dict(Segments=lex['Segments'], Row=lex)
+            lex2 = ds.add_form_with_segments(
+                Language_ID='l', Parameter_ID='p', Value='ab', Form='ab', Segments=['a', 'b'])
+            res['Rows'] = [dict(r) for r in ds.objects['FormTable']]
+            assert res['Rows'][-1] == lex2
+        # Tokenizer lookups in worker processes are counted, too:
+        res['Lookups'] = dataset.tokenizer_cache.hits + dataset.tokenizer_cache.misses
+        assert res['Lookups'] == 1
+        return pending, res
+
+    pending, serial = add_forms()
+    assert not pending
+    pending, parallel = add_forms(workers=2)
+    assert pending and parallel == serial
+
+
+def test_process_forms_incremental(dataset, clts, mocker):
+    with LexibankWriter(
+        cldf_spec=dataset.get_lexibank_cldf_spec(),
+        dataset=dataset,
+        args=Namespace(clts=mocker.Mock(api=clts), incremental=True)
+    ) as ds:
+        kw = dict(Language_ID='l', Parameter_ID='p', Value='x')
+        result = ds.process_forms([(dict(ID='1', Form='ab', **kw), None)], True)
+        assert result.segmentation_lookups == (0, 1) and len(result.segmentations['l']) == 1
+        assert ds.process_forms([(dict(ID='2', Form='ab', **kw), None)], True)\
+            .segmentation_lookups == (1, 0)
+
+
 def test_reqs(tmp_path, mocker, clts):
     class D(Dataset):
         dir = tmp_path
@@ -98,3 +196,76 @@ def test_custom_columns(tmp_path, clts, mocker):
     md = tmp_path.joinpath('cldf', 'cldf-metadata.json').read_text(encoding='utf8')
     assert '-+-+-' in md
     assert 'abcdefg' in md
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_stream(tmp_path, clts, mocker, stream):
+    class D(Dataset):
+        dir = tmp_path
+        id = 'x'
+        writer_options = dict(keep_languages=False, keep_parameters=False, stream=stream)
+
+        def cldf_specs(self):
+            spec = super().cldf_specs()
+            spec.zipped = {'FormTable'}
+            return spec
+
+        def cmd_makecldf(self, args):
+            for lid in ['l1', 'l2', 'l3']:
+                args.writer.add_language(ID=lid)
+            args.writer.add_concept(ID='c1')
+            args.writer.add_concept(ID='c2')
+            for i, lid in enumerate(['l1', 'l2', 'l1', 'l2', 'l1']):
+                lex = args.writer.add_form_with_segments(
+                    Language_ID=lid, Parameter_ID='c1', Value='x', Form='x', Segments=['x', 'y'])
+                args.writer.add_cognate(lexeme=lex, ID=str(i % 3), Cognateset_ID='1')
+            assert args.writer.objects['LanguageTable']
+            if stream:
+                # Rows are written to the CSV file while being added ...
+                assert len(self.cldf_dir.joinpath('forms.csv').read_text().splitlines()) == 5
+                # ... and are not available in memory:
+                with pytest.raises(ValueError):
+                    _ = args.writer.objects['FormTable']
+                with pytest.raises(ValueError):
+                    args.writer.align_cognates()
+                # The columns cannot be changed once rows have been written:
+                args.writer.cldf.add_columns('FormTable', 'Extra')
+                with pytest.raises(ValueError):
+                    args.writer._write_rows('FormTable')
+                args.writer.cldf.remove_columns('FormTable', 'Extra')
+
+    mocker.patch('pylexibank.cldf.LexibankWriter.buffer_size', 2)
+    D()._cmd_makecldf(Namespace(
+        log=mocker.Mock(), dev=False, verbose=False, clts=mocker.Mock(api=clts)))
+    cldf = D().cldf_reader()
+    assert [r['ID'] for r in cldf['LanguageTable']] == ['l1', 'l2']
+    assert [r['ID'] for r in cldf['ParameterTable']] == ['c1']
+    assert len(list(cldf['FormTable'])) == 5
+    assert [r['ID'] for r in cldf['CognateTable']] == ['0', '1', '2']
+    assert cldf['FormTable'].common_props['dc:extent'] == 5
+    assert D().cldf_dir.joinpath('forms.csv.zip').exists()
+
+
+def test_StreamedObjects():
+    objects = StreamedObjects({'FormTable': [], 'LanguageTable': []})
+    with pytest.raises(ValueError):
+        _ = objects['FormTable']
+    del objects['LanguageTable']
+    assert len(objects) == 1 and list(objects) == ['FormTable']
+
+
+def test_object_dict():
+    segments = ['a']
+    d = LexibankWriter._object_dict(
+        Lexeme, ID=1, Language_ID='l', Parameter_ID=2, Value='v', Form='f', Segments=segments)
+    assert d['ID'] == '1' and d['Parameter_ID'] == '2' and d['Segments'] == ['a']
+    # Lists are copied:
+    segments.append('b')
+    assert d['Segments'] == ['a']
+    assert list(d) == Lexeme.fieldnames()
+    with pytest.raises(ValueError):  # validated in __post_init__
+        LexibankWriter._object_dict(
+            Lexeme, ID=1, Language_ID='l', Parameter_ID=2, Value='', Form='')
+    with pytest.raises(ValueError):
+        LexibankWriter._object_dict(
+            Lexeme, ID=1, Language_ID='l/', Parameter_ID=2, Value='v', Form='f')
@@ -1,13 +1,17 @@
 import shlex
+import functools
 import logging
 import argparse
+import collections
 
 import pytest
 
 from csvw import dsv
+from pycldf import Dataset
 from clldutils import jsonlib
 from cldfbench.__main__ import main
 from pylexibank import cli_util
+from pylexibank.cldf import Options
 
 
 def test_warning(caplog):
@@ -19,6 +23,15 @@ def test_warning(caplog):
     assert caplog.records[-1].levelname == 'WARNING'
 
 
+def test_ParsedCLDF(dataset_cldf):
+    cldf = cli_util.ParsedCLDF(dataset_cldf.cldf_reader())
+    assert cldf['FormTable'] is cldf['FormTable']
+    assert cldf['FormTable', 'id'].name == 'fid'
+    assert cldf.directory == dataset_cldf.cldf_dir
+    row = next(cldf.iter_rows('FormTable', 'id'))
+    assert row['id'] == row['fid'] and 'id' not in cldf['FormTable'][0]
+
+
 def _main(cmd, **kw):
     kw.setdefault('log', logging.getLogger(__name__))
     main(['--no-config'] + shlex.split(cmd), **kw)
@@ -54,6 +67,13 @@ def test_makecldf_multi_profiles(repos):
     assert 'FREQUENCY' in (d / 'etc' / 'orthography' / 'p1.tsv').read_text(encoding='utf8')
 
 
+def test_grapheme_stats(dataset):
+    from pylexibank.commands.format_profile import grapheme_stats
+
+    stats = grapheme_stats(dataset, {'default': dataset.orthography_profile_dict[None]})
+    assert stats['default'].forms == len(list(dataset.cldf_reader()['FormTable']))
+
+
 def test_makecldf(repos, dataset, dataset_cldf, dataset_no_cognates, capsys, tmp_path):
     _main('lexibank.makecldf {0} --glottolog {1} --concepticon {1} --clts {1}'.format(
         str(dataset.dir / 'td.py'),
@@ -84,19 +104,89 @@ def test_makecldf(repos, dataset, dataset_cldf, dataset_no_cognates, capsys, tmp
     assert not dataset_no_cognates.cldf_dir.joinpath('cognates.csv').exists()
 
 
+def test_makecldf_workers(repos, dataset, mocker):
+    def run(*opts):
+        _main('lexibank.makecldf {0} --glottolog {1} --concepticon {1} --clts {1} {2}'.format(
+            str(dataset.dir / 'td.py'), repos, ' '.join(opts)))
+        return {
+            p.name: p.read_text(encoding='utf8') for p in [
+                dataset.cldf_dir / 'forms.csv',
+                dataset.cldf_dir / 'cognates.csv',
+                dataset.cldf_dir / '.transcription-report.json',
+                dataset.dir / 'TRANSCRIPTION.md']}
+
+    serial = run()
+    mocker.patch('pylexibank.cldf.LexibankWriter.chunk_size', 2)
+    assert run('--workers 2') == serial
+    assert run('--workers 2 --incremental') == serial
+    mocker.patch('pylexibank.cldf.LexibankWriter.buffer_size', 1)
+    mocker.patch('pylexibank.cldf.Options', functools.partial(Options, stream=True))
+    assert run() == serial
+    assert run('--workers 2') == serial
+
+
+def test_makecldf_incremental(repos, dataset, caplog):
+    def run():
+        _main('lexibank.makecldf {0} --glottolog {1} --concepticon {1} --clts {1} {2}'.format(
+            str(dataset.dir / 'td.py'), repos, '--incremental'), log=logging.getLogger(__name__))
+        return dataset.cldf_dir.joinpath('forms.csv').read_text(encoding='utf8')
+
+    def replayed():
+        return [r.message for r in caplog.records if 'Incremental build' in r.message][-1]
+
+    caplog.set_level(logging.INFO)
+    first = run()
+    assert 'replayed from cache' in replayed() and ' 0 forms tokenized' not in replayed()
+    assert run() == first
+    assert ' 0 forms tokenized' in replayed()
+
+    # Changing the orthography profile invalidates the cache:
+    profile = dataset.etc_dir / 'orthography.tsv'
+    profile.write_text(profile.read_text(encoding='utf8') + '\n', encoding='utf8')
+    assert run() == first
+    assert ' 0 forms tokenized' not in replayed()
+
+
 def test_check(dataset_cldf, caplog):
     _main('lexibank.check {0}'.format(str(dataset_cldf.dir / 'tdc.py')),
           log=logging.getLogger(__name__))
     assert [r for r in caplog.records if 'CONTRIBUTORS.md' in r.message]
 
 
+def test_check_workers(dataset_cldf, caplog):
+    _main('lexibank.check {0} --workers 2'.format(str(dataset_cldf.dir / 'tdc.py')),
+          log=logging.getLogger(__name__))
+    warnings = [r.message for r in caplog.records if r.levelname == 'WARNING']
+    assert any('CONTRIBUTORS.md' in w for w in warnings)
+    assert warnings[-1].endswith('warnings issued')
+
+
+def test_check_worker(dataset_cldf, mocker):
+    from pylexibank.commands import check
+
+    mocker.patch.object(check, '_FORKED', ([dataset_cldf], argparse.Namespace(log=None)))
+    records, warnings = check._check(0)
+    assert warnings and all(msg in [r[1] for r in records] for msg in warnings)
+
+
 def test_check_lexibank(dataset_cldf, caplog):
     _main(
         'lexibank.check_lexibank {0}'.format(str(dataset_cldf.dir / 'tdc.py')),
         log=logging.getLogger(__name__))
     warnings = [r.message for r in caplog.records if r.levelname == 'WARNING']
     print(warnings)
-    assert any('Cross-concept' in w for w in warnings)
+    assert any(w.endswith('Cross-concept cognate set 1: 1, 2') for w in warnings)
+
+
+def test_FormIndex(dataset_cldf):
+    from pylexibank.commands.check_lexibank import FormIndex
+
+    cldf = cli_util.ParsedCLDF(dataset_cldf.cldf_reader())
+    index = FormIndex.from_cldf(cldf)
+    assert 'abc xyz' in index.values
+    assert index.concepts[index.form_to_concept['2']] == '2'
+    index = FormIndex.from_cldf(cldf, values=False, concepts=False)
+    assert index.values is None and not index.form_to_concept
 
 
 def test_check_phonotactics(dataset, capsys):
@@ -114,7 +204,8 @@ def test_consonant_clusters(dataset, repos, caplog, capsys):
     warnings = [r.message for r in caplog.records if r.levelname == 'WARNING']
     out, _ = capsys.readouterr()
 
-    assert any("1 potentially problematic consonant cluster(s) with length >= 4" in w for w in warnings)
+    assert any(
+        "1 potentially problematic consonant cluster(s) with length >= 4" in w for w in warnings)
     assert out.strip() == """| Language_ID | Length | Cluster | Words |
 | :---------: | :----: | :-----------------: | :---: |
 | lang1 | 6 | ɡ̤ː ɡ̤ː b dʱʷ dʱʷ dʱʷ | axdou |"""
@@ -141,7 +232,22 @@ def test_language_profiles(dataset_cldf, repos):
     with pytest.raises(ValueError):
         _main('lexibank.language_profiles {0}'.format(str(dataset_cldf.dir / 'tdc.py')))
     d = repos / 'datasets' / 'test_dataset_cldf_capitalisation'
-    _main('lexibank.language_profiles {0}'.format(str(d / 'tdc.py')))
+    _main('lexibank.language_profiles {0} --workers 2'.format(str(d / 'tdc.py')))
+    assert d.joinpath('etc', 'orthography', '1.tsv').read_text(encoding='utf8').split('\n')[1] \
+        == 'a\ta\t1'
+
+
+def test_grapheme_counts(repos):
+    from pylexibank.commands.language_profiles import grapheme_counts
+
+    d = repos / 'datasets' / 'test_dataset_cldf_capitalisation' / 'cldf'
+    counts = grapheme_counts(cli_util.ParsedCLDF(Dataset.from_metadata(d / 'cldf-metadata.json')))
+    assert counts['1'] == collections.Counter('abcxyz')
+
+    forms = d.joinpath('forms.csv')
+    forms.write_text(forms.read_text(encoding='utf8').replace('x y z', ''), encoding='utf8')
+    with pytest.raises(ValueError):
+        grapheme_counts(cli_util.ParsedCLDF(Dataset.from_metadata(d / 'cldf-metadata.json')))
 
 
 def test_readme(dataset, repos):
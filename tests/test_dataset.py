@@ -59,7 +59,17 @@ def test_Dataset_tokenizer(tmp_path):
 
     etc.joinpath('orthography.tsv').write_text('Grapheme\tIPA\na\tc')
     ds = DS()
-    assert ds.tokenizer({}, 'a') == ['c']
+    item = {}
+    assert ds.tokenizer(item, 'a') == ['c']
+    assert ds.tokenizer(item, 'a') == ['c'] and item['Graphemes'] == '^ a $'
+    assert (ds.tokenizer_cache.hits, ds.tokenizer_cache.misses) == (1, 1)
+    # Options not supported by Segmenter are passed to segments.Tokenizer:
+    assert ds.tokenizer(item, 'a', errors='strict') == ['c']
+
+    # Memoized results are invalidated when the profiles are reloaded:
+    etc.joinpath('orthography.tsv').write_text('Grapheme\tIPA\na\td')
+    del ds.orthography_profile_dict
+    assert ds.tokenizer({}, 'a') == ['d']
 
 
 def test_BaseDataset(mocker, repos):
@@ -1,4 +1,8 @@
+import re
+import random
+
 import pytest
+from clldutils import text, misc
 
 from pylexibank.forms import *
 
@@ -58,6 +62,50 @@ def test_replacements():
         FormSpec(replacements=[(1, 2)])
 
 
+@pytest.mark.parametrize(
+    'replacements',
+    [
+        [('x', 'y')],
+        [(c, c.upper()) for c in 'abcdef'],
+        [(c, c.upper() + c) for c in 'abcdef'],  # replacements interact
+        [('a', '')] + [(c + 'b', 'x') for c in 'cdef'],  # removal creates new matches
+        [('ab', 'x'), ('bc', 'y'), ('c', 'z'), ('d', 'w'), ('e', 'v')],  # sources overlap
+        [('ab', 'x'), ('cd', 'y'), ('e', 'z'), ('f', 'w'), (' ', '_')],
+    ]
+)
+def test_compiled(replacements):
+    def legacy(spec, value):
+        res = []
+        for form in text.split_text_with_context(
+                value, separators=spec.separators, brackets=spec.brackets):
+            if form not in spec.missing_data:
+                for source, target in spec.replacements:
+                    form = form.replace(source, target)
+                if spec.strip_inside_brackets:
+                    form = text.strip_brackets(form, brackets=spec.brackets)
+                res.append(re.sub(r'\s+', ' ', form.strip()))
+        return misc.nfilter(res)
+
+    rng = random.Random(42)
+    for spec in [
+        FormSpec(replacements=replacements),
+        FormSpec(replacements=replacements, brackets={'(': ')', '[': ']'}, separators=';/,~'),
+        FormSpec(replacements=replacements, brackets={}, separators=''),
+    ]:
+        for _ in range(500):
+            value = ''.join(rng.choices('abcdef ()[];,~-?', k=rng.randint(0, 15)))
+            assert spec.split(None, value) == legacy(spec, value), value
+
+
+def test_compiled_invalidation():
+    spec = FormSpec()
+    assert spec.split(None, 'a|b') == ['a|b']
+    spec.separators = '|'
+    spec.replacements = [('a', 'x')]
+    assert spec.split(None, 'a|b') == ['x', 'b']
+    assert '_compiled' not in spec.as_markdown()
+
+
 @pytest.mark.parametrize(
     'morpheme,num,maxlen',
     [
@@ -71,3 +119,12 @@ def test_compute_consonant_cluster(morpheme, num, maxlen, clts):
     assert len(clusters) == num
     if clusters:
         assert max(len(c) for c in clusters) == maxlen
+
+
+def test_ConsonantClusters(clts):
+    clusters = ConsonantClusters(clts)
+    assert clusters('s c h + w i m m e n'.split()) == [['s', 'c', 'h'], ['w'], ['m', 'm'], ['n']]
+    assert clusters.encode('a c h'.split()) == b'\x00\x01\x01'
+    assert ConsonantClusters(clts, min_length=3)('s c h w i m m e n'.split()) == [
+        ['s', 'c', 'h', 'w']]
+    assert clusters([]) == []
@@ -0,0 +1,53 @@
+import pytest
+from cldfbench.catalogs import CachingGlottologAPI
+
+from pylexibank.glottolog import GlottologIndex, glottolog_version
+from pylexibank import glottolog as glottolog_module
+
+
+@pytest.fixture
+def api(repos):
+    book = repos / 'languoids' / 'tree' / 'book1242'
+    book.joinpath('bkkp1234').mkdir(parents=True)
+    book.joinpath('md.ini').write_text(
+        '[core]\nname = Bookkeeping\nlevel = family\n', encoding='utf8')
+    book.joinpath('bkkp1234', 'md.ini').write_text(
+        '[core]\nname = Spurious\nlevel = language\niso639-3 = xyz\n'
+        'latitude = 1.5\nlongitude = -2.0\n', encoding='utf8')
+    return CachingGlottologAPI(repos)
+
+
+def test_glottolog_version(api, repos):
+    version = glottolog_version(api)
+    assert version == glottolog_version(api)
+    repos.joinpath('languoids', 'tree', 'abcd1234', 'md.ini').write_text('x', encoding='utf8')
+    assert version != glottolog_version(api)
+
+
+def test_GlottologIndex(api, mocker):
+    index = GlottologIndex(api)
+    assert index.bookkeeping == {'bkkp1234'}
+    lg = index.get('bkkp1234')
+    assert (lg.family, lg.iso, lg.latitude, lg.longitude, lg.macroarea) == \
+        ('Bookkeeping', 'xyz', 1.5, -2.0, None)
+    lg = index.get('abcd1234')
+    assert (lg.family, lg.macroarea, lg.bookkeeping) == ('A Language', 'Papunesia', False)
+    assert set(index.languoids(['abcd1234', 'bkkp1234', 'abcd9999'])) == {'abcd1234', 'bkkp1234'}
+    assert index.get('abcd9999') is None
+
+    # The data is now read from the persistent index, without touching the Glottolog repository:
+    mocker.patch.object(api, 'languoids', mocker.Mock(side_effect=ValueError))
+    index = GlottologIndex(api)
+    assert index.get('bkkp1234').name == 'Spurious'
+
+
+def test_GlottologIndex_eviction(api, tmp_path, mocker):
+    mocker.patch.object(glottolog_module, 'MAX_VERSIONS', 2)
+    for version in ['1', '2', '3']:
+        mocker.patch.object(glottolog_module, 'glottolog_version', lambda _, v=version: v)
+        assert GlottologIndex(api, path=tmp_path / 'db.sqlite').get('abcd1234')
+
+    mocker.patch.object(api, 'languoids', mocker.Mock(return_value=[]))
+    for version, indexed in [('3', True), ('2', True), ('1', False)]:
+        mocker.patch.object(glottolog_module, 'glottolog_version', lambda _, v=version: v)
+        assert bool(GlottologIndex(api, path=tmp_path / 'db.sqlite').get('abcd1234')) == indexed
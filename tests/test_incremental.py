@@ -0,0 +1,119 @@
+from pylexibank.incremental import SegmentationCache
+
+
+def test_SegmentationCache(tmp_path, mocker):
+    etc = tmp_path / 'etc'
+    etc.joinpath('orthography').mkdir(parents=True)
+    etc.joinpath('orthography', 'l1.tsv').write_text('Grapheme\tIPA\na\ta\n', encoding='utf8')
+    dataset = mocker.Mock(
+        id='x', dir=tmp_path, etc_dir=etc, tokenizer=mocker.Mock(profile_based=True))
+
+    calls = []
+
+    def tokenizer(item, string, **kw):
+        calls.append(string)
+        item['Profile'] = kw.get('profile', 'default')
+        return list(string)
+
+    cache = SegmentationCache(dataset, directory=tmp_path / 'cache')
+    item = dict(Language_ID='l1')
+    assert cache(tokenizer, item, 'ab') == ['a', 'b']
+    assert cache(tokenizer, dict(Language_ID='l1'), 'ab', profile='l1') == ['a', 'b']
+    assert cache(tokenizer, dict(Language_ID='l2'), '') == []
+    cache.save()
+    assert len(calls) == 3
+
+    cache = SegmentationCache(dataset, directory=tmp_path / 'cache')
+    item = dict(Language_ID='l1')
+    assert cache(tokenizer, item, 'ab') == ['a', 'b']
+    assert item['Profile'] == 'default'
+    assert cache(tokenizer, dict(Language_ID='l1'), 'ab', profile='l1') == ['a', 'b']
+    assert cache(tokenizer, dict(Language_ID='l2'), '') == []
+    assert len(calls) == 3 and (cache.hits, cache.misses) == (3, 0)
+
+    # Changing a profile invalidates the cache for languages using it:
+    etc.joinpath('orthography', 'l1.tsv').write_text('Grapheme\tIPA\n', encoding='utf8')
+    cache = SegmentationCache(dataset, directory=tmp_path / 'cache')
+    assert cache(tokenizer, dict(Language_ID='l1'), 'ab') == ['a', 'b']
+    assert cache(tokenizer, dict(Language_ID='l2'), 'ab', profile='l1') == ['a', 'b']
+    assert cache(tokenizer, dict(Language_ID='l2'), '') == []
+    assert len(calls) == 5
+
+    # So does changing the rules applied with a profile:
+    cache.save()
+    etc.joinpath('orthography', 'l1.rules').write_text('a\tb\n', encoding='utf8')
+    cache = SegmentationCache(dataset, directory=tmp_path / 'cache')
+    assert cache(tokenizer, dict(Language_ID='l2'), 'ab', profile='l1') == ['a', 'b']
+    assert cache(tokenizer, dict(Language_ID='l2'), '') == []
+    assert len(calls) == 6 and (cache.hits, cache.misses) == (1, 1)
+
+    # The rules for the default profile are part of the fingerprint for all languages:
+    cache.save()
+    etc.joinpath('orthography.tsv').write_text('Grapheme\tIPA\n', encoding='utf8')
+    cache = SegmentationCache(dataset, directory=tmp_path / 'cache')
+    assert cache(tokenizer, dict(Language_ID='l2'), '') == []
+    cache.save()
+    etc.joinpath('orthography.rules').write_text('a\tb\n', encoding='utf8')
+    cache = SegmentationCache(dataset, directory=tmp_path / 'cache')
+    assert cache(tokenizer, dict(Language_ID='l2'), '') == []
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_SegmentationCache_prune(tmp_path, mocker):
+    dataset = mocker.Mock(
+        id='x', dir=tmp_path, etc_dir=tmp_path, tokenizer=mocker.Mock(profile_based=True))
+
+    def tokenizer(item, string, **kw):
+        return list(string)
+
+    cache = SegmentationCache(dataset, directory=tmp_path / 'cache')
+    for lid, form in [('l1', 'ab'), ('l1', 'cd'), ('l2', 'ef')]:
+        assert cache(tokenizer, dict(Language_ID=lid), form)
+    # Different tokenizer options require different results:
+    assert cache(tokenizer, dict(Language_ID='l1'), 'ab', column='x')
+    cache.save()
+    assert cache.misses == 4 and len(list(cache.dir.glob('*.json'))) == 2
+
+    # Results which have not been used in an incomplete run are kept:
+    cache = SegmentationCache(dataset, directory=tmp_path / 'cache')
+    assert cache(tokenizer, dict(Language_ID='l1'), 'ab')
+    cache.save(prune=False)
+    cache = SegmentationCache(dataset, directory=tmp_path / 'cache')
+    assert cache(tokenizer, dict(Language_ID='l1'), 'cd') and cache.hits == 1
+
+    # ... but are removed after a complete run:
+    cache.save()
+    cache = SegmentationCache(dataset, directory=tmp_path / 'cache')
+    assert len(list(cache.dir.glob('*.json'))) == 1
+    assert cache(tokenizer, dict(Language_ID='l1'), 'cd')
+    assert cache(tokenizer, dict(Language_ID='l1'), 'ab')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_SegmentationCache_custom_tokenizer(tmp_path, mocker):
+    tmp_path.joinpath('helper.py').write_text('x = 1', encoding='utf8')
+    tmp_path.joinpath('etc').mkdir()
+    tmp_path.joinpath('etc', 'lookup.csv').write_text('a,b', encoding='utf8')
+    dataset = mocker.Mock(id='x', dir=tmp_path, etc_dir=tmp_path / 'etc', tokenizer=mocker.Mock())
+
+    def tokenizer(item, string, **kw):
+        return [item['Parameter_ID'], string]
+
+    def run(**kw):
+        cache = SegmentationCache(dataset, directory=tmp_path / 'cache')
+        res = cache(tokenizer, dict(Language_ID='l', Parameter_ID='p', **kw), 'ab')
+        cache.save()
+        return res, cache.hits
+
+    assert run() == (['p', 'ab'], 0)
+    assert run() == (['p', 'ab'], 1)
+    # Custom tokenizers may use all data of the form:
+    assert run(Comment='x') == (['p', 'ab'], 0)
+    assert run(Comment='x', ID='1') == (['p', 'ab'], 1)
+    # ... and read other files - but not the badges written by makecldf:
+    tmp_path.joinpath('etc', 'badge_bipa.svg').write_text('<svg/>', encoding='utf8')
+    assert run(Comment='x') == (['p', 'ab'], 1)
+    tmp_path.joinpath('etc', 'lookup.csv').write_text('a,c', encoding='utf8')
+    assert run(Comment='x') == (['p', 'ab'], 0)
+    tmp_path.joinpath('helper.py').write_text('x = 2', encoding='utf8')
+    assert run(Comment='x') == (['p', 'ab'], 0)
@@ -0,0 +1,38 @@
+import sys
+import subprocess
+
+import pytest
+
+import pylexibank
+
+
+def test_lazy_imports():
+    # Importing the package must not import the heavy dependencies:
+    res = subprocess.check_output([
+        sys.executable,
+        '-c',
+        'import sys, pylexibank; '
+        'print(" ".join(m for m in ["lingpy", "cldfbench", "pycldf", "pyconcepticon"] '
+        'if m in sys.modules))'])
+    assert not res.strip()
+    # Submodules are still available as attributes:
+    subprocess.check_call([
+        sys.executable,
+        '-c',
+        'import pylexibank; pylexibank.profile.Profile; pylexibank.transcription.Report; '
+        'pylexibank.report.report; pylexibank.lingpy_util.settings'])
+
+
+def test_public_api():
+    for name in pylexibank.__all__:
+        assert getattr(pylexibank, name)
+        assert name in dir(pylexibank)
+    assert pylexibank.Dataset is pylexibank.dataset.Dataset
+    assert pylexibank.progressbar is pylexibank.util.progressbar
+    for name in [
+        'dataset', 'models', 'forms', 'metadata', 'util', 'cldf',
+        'profile', 'transcription', 'report', 'lingpy_util',
+    ]:
+        assert getattr(pylexibank, name).__name__ == f'pylexibank.{name}'
+    with pytest.raises(AttributeError):
+        _ = pylexibank.xyz
@@ -1,7 +1,13 @@
+import gc
+import weakref
+import random
 import logging
 import pathlib
 
-from pylexibank.profile import Profile
+import pytest
+import segments
+
+from pylexibank.profile import Profile, Segmenter
 
 
 def test_init():
@@ -28,6 +34,74 @@ def test_trim():
     )
     assert prf.trim() == 1
     assert 'ab' not in prf.graphemes
+    prf = Profile({'Grapheme': 'ab', 'IPA': 'x'}, {'Grapheme': 'a', 'IPA': 'x'})
+    assert prf.trim() == 0
+
+
+def _trim(profile):
+    """Trim a profile by tokenizing with profiles re-created without the rules to check."""
+    graphemes = list(profile.graphemes)
+    candidates = [g for g in graphemes if g[0] == "^" and g[-1] == "$"]
+    candidates += [g for g in graphemes if g[0] == "^" and g[-1] != "$"]
+    candidates += [g for g in graphemes if g[0] != "^" and g[-1] == "$"]
+    candidates += sorted([g for g in graphemes if len(g) > 1 and g not in candidates], key=len,
+                         reverse=True)
+    removed = 0
+    for grapheme in candidates:
+        t = segments.Tokenizer(profile=Profile(*[
+            dict(spec, Grapheme=g) for g, spec in profile.graphemes.items() if g != grapheme]))
+        if t(grapheme, column='IPA') == profile.graphemes[grapheme]['IPA']:
+            del profile.graphemes[grapheme]
+            removed += 1
+    return removed
+
+
+def test_trim_until_stable():
+    rng = random.Random(42)
+    for _ in range(300):
+        specs = {c: {'Grapheme': c, 'IPA': c.upper()} for c in 'abcd'}
+        for _ in range(rng.randint(1, 20)):
+            g = rng.choice(['^', '', '', '']) + ''.join(rng.choices('abcd', k=rng.randint(1, 4))) \
+                + rng.choice(['$', '', '', ''])
+            ipa = ' '.join(c.upper() for c in g.strip('^$'))
+            if rng.random() < 0.3:
+                ipa = ipa.replace(' ', '', 1) if rng.random() < 0.5 else rng.choice([None, 'X'])
+            specs[g] = {'Grapheme': g, 'IPA': ipa}
+        prf = Profile(*[dict(s) for s in specs.values()])
+        expected, removed = Profile(*[dict(s) for s in specs.values()]), 0
+        while (n := _trim(expected)):
+            removed += n
+        assert prf.trim(until_stable=True) == removed
+        assert list(prf.graphemes) == list(expected.graphemes)
+
+
+def test_trim_missing_column():
+    with pytest.raises(ValueError):
+        Profile({'Grapheme': 'ab', 'IPA': 'x y'}).trim(ipa_col='x')
+
+
+def test_Segmenter(tmp_path):
+    p = tmp_path / 'profile.tsv'
+    p.write_text(
+        'Grapheme\tIPA\tSCA\n^\tNULL\tNULL\n$\tNULL\tNULL\na\ta\tA\nab\ta b\tAB\n'
+        'abc\tx\tX\nc\tNULL\tNULL\nd\td\tD\n', encoding='utf8')
+    tmp_path.joinpath('profile.rules').write_text('x, z\n', encoding='utf8')
+    prf = Profile.from_file(p)
+    segmenter = Segmenter(prf)
+    tokenizer = segments.Tokenizer(prf, errors_replace=lambda c: f'<{c}>')
+
+    rng = random.Random(42)
+    for _ in range(500):
+        string = ''.join(rng.choices('^$abcdé ', k=rng.randint(0, 12)))
+        kw = dict(separator=' + ', form=rng.choice([None, 'NFD']))
+        assert segmenter(string, 'IPA', 'SCA', 'Grapheme', **kw) == (
+            tokenizer(string, **kw),
+            tokenizer(string, column='IPA', **kw),
+            tokenizer(string, column='SCA', **kw),
+            tokenizer(string, **kw))
+
+    with pytest.raises(ValueError):
+        segmenter('a', 'xyz')
 
 
 def test_augment(clts):
@@ -44,6 +118,35 @@ def test_augment(clts):
     assert prf.graphemes['^a']['SCA'] == 'S'
 
 
+def test_GraphemeStats():
+    from pylexibank.profile import GraphemeStats
+
+    prf = Profile({'Grapheme': 'a', 'IPA': 'x'}, {'Grapheme': 'b', 'IPA': 'y'})
+    forms = ['^{}$'.format(''.join(random.choices('ab', k=5))) for _ in range(100)]
+    stats = GraphemeStats(prf, examples=3)
+    for form in forms:
+        stats.add(form)
+    stats.augment()
+    a = prf.graphemes['a']
+    assert a['FREQUENCY'] == sum(f.count('a') for f in forms)
+    assert a['EXAMPLES'] == ';'.join([f[1:-1] for f in forms for c in f if c == 'a'][:3])
+
+    prf.augment(forms, examples=3, seed=42)
+    assert len(prf.graphemes['a']['EXAMPLES'].split(';')) == 3
+    assert prf.graphemes['a']['FREQUENCY'] == a['FREQUENCY']
+
+
+def test_annotate(clts):
+    from pylexibank.profile import annotate, ipa2sca
+
+    annotation = annotate('a  b/ƛ NULL', clts)
+    assert annotate('a  b/ƛ NULL', clts) is annotation
+    assert annotation.sca == ipa2sca('a  b/ƛ NULL', clts) == 'A T NULL'
+    assert annotation.bipa == 'a b/tɬ NULL' and not annotation.unknown
+    assert annotate('°', clts).unknown
+    assert annotate(None, clts).bipa is None and annotate(None, clts).sca == ''
+
+
 def test_write(tmp_path):
     fname = tmp_path / 'profile.tsv'
     prf = Profile({'Grapheme': 'ab', 'IPA': 'z'}, {'Grapheme': 'x', 'IPA': 'y'})
@@ -77,3 +180,78 @@ def test_check(caplog, tmp_path, clts):
     prf_path.write_text('Grapheme\tIPA\na\t°\n')
     prf.check(clts=clts, log=logging.getLogger(__name__))
     assert caplog.records[-1].levelname == 'ERROR'
+
+
+def test_Profiles(tmp_path):
+    from pylexibank.profile import Profiles
+
+    for name, ipa in [('l1', 'x'), ('l2', 'y'), ('l3', 'z')]:
+        tmp_path.joinpath(f'{name}.tsv').write_text(f'Grapheme\tIPA\na\t{ipa}', encoding='utf8')
+    profiles = Profiles({k: tmp_path / f'{k}.tsv' for k in ['l1', 'l2', 'l3']}, maxsize=2)
+    assert len(profiles) == 3 and 'l2' in profiles and not len(profiles.segmenters)
+    assert profiles.segmenter('l2')('^a$', 'IPA')[1] == 'y'
+    assert 'l2' in profiles.segmenters
+    for key in profiles:
+        assert profiles.segmenter(key) is profiles.segmenter(key)
+    assert len(profiles.segmenters) == 2
+    assert profiles['l1'] is profiles['l1']
+    with pytest.raises(KeyError):
+        _ = profiles['l4']
+
+    # Parse trees of evicted profiles are released:
+    profiles = Profiles({k: tmp_path / f'{k}.tsv' for k in ['l1', 'l2', 'l3']}, maxsize=1)
+    trees = []
+    for key in profiles:
+        assert profiles.segmenter(key)('^a$', 'IPA')
+        trees.append(weakref.ref(profiles[key].tree))
+    gc.collect()
+    assert [tree() is None for tree in trees] == [True, True, False]
+
+
+def test_Profile_lazy_tree(caplog):
+    prf = Profile(dict(Grapheme='a', IPA='b'), dict(Grapheme='a', IPA='c'))
+    assert prf.graphemes['a'] == dict(IPA='b')
+    assert 'duplicate grapheme' in caplog.records[-1].message
+    assert prf.tree.parse('^a$') == ['^', 'a', '$']
+    prf.graphemes['aa'] = dict(IPA='d')
+    prf.recreate_tree()
+    assert prf._tree is None and prf.tree.parse('aa') == ['aa']
+
+
+def test_CompiledProfiles(tmp_path, mocker, cache_dir, caplog):
+    from pylexibank import profile
+
+    cache = profile.CompiledProfiles(tmp_path / 'cache')
+    p = tmp_path / 'profile.tsv'
+    p.write_text('Grapheme\tIPA\nab\tx\nc\tNULL\n', encoding='utf8')
+    # Without cache, profile files are just parsed:
+    assert Profile.from_file(p, form='NFC')
+    assert not cache_dir.joinpath('profiles').exists()
+    prf = Profile.from_file(p, form='NFC', cache=cache)
+    assert len(list(cache.dir.glob('*.json'))) == 1
+    cached = Profile.from_file(p, form='NFC', cache=cache)
+    assert cached is not prf and cached.graphemes == prf.graphemes
+    assert cached.column_labels == prf.column_labels and cached.form == 'NFC'
+    assert cached.fname == p and Segmenter(cached)('ab', 'IPA') == ('ab', 'x')
+
+    # Cache files which may have been written by other users, or which are corrupt, are ignored:
+    cached = next(cache.dir.glob('*.json'))
+    cached.chmod(0o666)
+    assert Profile.from_file(p, form='NFC', cache=cache).graphemes == prf.graphemes
+    assert 'untrusted' in caplog.records[-1].message
+    cached.chmod(0o644)
+    header, data = cached.read_bytes().split(b'\n', maxsplit=1)
+    cached.write_bytes(header + b'\n' + data.replace(b'"x"', b'"y"'))
+    assert Profile.from_file(p, form='NFC', cache=cache).graphemes == prf.graphemes
+    assert 'untrusted' in caplog.records[-1].message
+    cached.write_bytes(b'{}\n')
+    assert Profile.from_file(p, form='NFC', cache=cache).graphemes == prf.graphemes
+    assert 'invalid' in caplog.records[-1].message
+
+    # Changed profiles are re-read, evicting the least recently used compiled profile:
+    mocker.patch.object(profile, 'MAX_COMPILED_PROFILES', 1)
+    p.write_text('Grapheme\tIPA\nab\ty\n', encoding='utf8')
+    assert Segmenter(Profile.from_file(p, cache=cache))('ab', 'IPA') == ('ab', 'y')
+    assert len(list(cache.dir.glob('*.json'))) == 1
+
+    assert cache.key(Profile, tmp_path / 'profile-metadata.json', None) is None
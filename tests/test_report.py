@@ -1,7 +1,12 @@
+import shutil
+import zipfile
+import collections
+
 import pytest
+import pycldf
 
 from pylexibank import Dataset
-from pylexibank.report import report
+from pylexibank.report import report, Counts
 
 
 @pytest.fixture
@@ -20,3 +25,28 @@ def test_report(ds):
 
 def test_report_full(dataset):
     assert report(dataset)
+
+
+def test_Counts(dataset, tmp_path):
+    cldf = dataset.cldf_reader()
+    counts = Counts.from_dataset(cldf, None)
+    forms = list(cldf['FormTable'])
+    assert counts.lexemes == len(forms)
+    assert counts.lids == collections.Counter(r['Language_ID'] for r in forms)
+    assert counts.cids == collections.Counter(r['Parameter_ID'] for r in forms)
+    assert counts.sids == collections.Counter(s for r in forms for s in r['Source'])
+    assert counts.missing_source == [r['ID'] for r in forms if not r['Source']]
+    synonyms = collections.defaultdict(collections.Counter)
+    for r in forms:
+        synonyms[r['Language_ID']][r['Parameter_ID']] += 1
+    assert counts.synonyms == synonyms
+    assert sum(counts.cognate_sets.values()) == len(list(cldf['CognateTable']))
+
+    # Zipped data is read with csvw:
+    shutil.copytree(dataset.cldf_dir, tmp_path / 'cldf')
+    fname = tmp_path / 'cldf' / 'forms.csv'
+    with zipfile.ZipFile(fname.parent / 'forms.csv.zip', 'w') as zipf:
+        zipf.write(fname, fname.name)
+    fname.unlink()
+    cldf = pycldf.Dataset.from_metadata(tmp_path / 'cldf' / 'cldf-metadata.json')
+    assert Counts.from_dataset(cldf, None) == counts
@@ -0,0 +1,56 @@
+import dataclasses
+
+import pytest
+
+from pylexibank.sounds import Sound, Sounds, SoundStore, clts_version
+from pylexibank import sounds as sounds_module
+
+
+def test_Sound(clts):
+    snd = Sound.from_clts('a', clts)
+    assert str(snd) == 'a' and snd.dolgo == 'V' and snd.sca == 'A' and not snd.unknown
+    assert Sound.from_clts('°', clts).unknown
+    # Sounds provide the attributes of pyclts symbols:
+    for grapheme in ['a', 'ʦ', 'xyz', '+']:
+        snd, symbol = Sound.from_clts(grapheme, clts), clts.bipa[grapheme]
+        for attr in ['grapheme', 'source', 'name', 'generated', 'codepoints', 'uname']:
+            assert getattr(snd, attr) == getattr(symbol, attr)
+        assert snd.s == str(snd) == str(symbol) and snd.type() == symbol.type()
+    assert dataclasses.replace(snd, bipa='\x00').uname == '?'
+
+
+def test_clts_version(clts, repos):
+    version = clts_version(clts)
+    assert version == clts_version(clts)
+    repos.joinpath('pkg', 'soundclasses', 'lingpy.tsv').write_text('x', encoding='utf8')
+    assert version != clts_version(clts)
+
+
+def test_Sounds(clts, mocker, cache_dir):
+    sounds = Sounds(clts)
+    assert sounds['a'].name == 'unrounded open front vowel'
+    assert [s.grapheme for s in sounds(['a', 'b'])] == ['a', 'b']
+    assert 'b' in sounds and len(sounds.new) == 2
+    sounds.save()
+    assert not sounds.new
+
+    # The sounds are now read from the persistent store, without touching CLTS:
+    sounds = Sounds(mocker.Mock(bipa=None), store=SoundStore(clts_version(clts)))
+    assert sounds['a'] == Sound.from_clts('a', clts)
+    with pytest.raises(TypeError):
+        _ = sounds['x']
+
+    sounds.update([Sound.from_clts('x', clts), Sound.from_clts('a', clts)])
+    assert sounds['x'].grapheme == 'x' and len(sounds.new) == 1
+
+
+def test_SoundStore_eviction(tmp_path, clts, mocker):
+    mocker.patch.object(sounds_module, 'MAX_VERSIONS', 2)
+    snd = Sound.from_clts('a', clts)
+    for version in ['1', '2', '3']:
+        store = SoundStore(version, path=tmp_path / 'db.sqlite')
+        store.load()
+        store.save([snd])
+    assert SoundStore('3', path=tmp_path / 'db.sqlite').load()
+    assert SoundStore('2', path=tmp_path / 'db.sqlite').load()
+    assert not SoundStore('1', path=tmp_path / 'db.sqlite').load()
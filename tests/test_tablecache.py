@@ -0,0 +1,97 @@
+import os
+import zipfile
+
+import pytest
+import pycldf
+
+from pylexibank import tablecache
+from pylexibank.tablecache import WordlistCache, CachedTable, HEADER
+
+
+def test_CachedTable(tmp_path):
+    rows = [
+        dict(ID='1', Segments=['a', 'b'], Value=1, Flag=True, Source=None),
+        dict(ID='2', Segments=['a', 'b'], Value=True, Flag=1, Source=None),
+        dict(ID='3', Segments=[], Value=1.5, Flag=None, Source='x'),
+    ]
+    table = CachedTable.from_rows(rows)
+    assert list(table) == rows and table[1:] == rows[1:] and table[-1] == rows[-1]
+    assert [type(v) for v in table.column('Value')] == [int, bool, float]
+    # List values are not shared between rows:
+    table[0]['Segments'].append('c')
+    assert table[1]['Segments'] == ['a', 'b']
+
+    table.write(tmp_path / 'table.bin', ('stamp',))
+    assert CachedTable.read(tmp_path / 'table.bin', ('other',)) is None
+    assert list(CachedTable.read(tmp_path / 'table.bin', ('stamp',))) == rows
+
+    # Files which may have been written by other users are not unpickled:
+    os.chmod(tmp_path / 'table.bin', 0o666)
+    assert CachedTable.read(tmp_path / 'table.bin', ('stamp',)) is None
+    os.chmod(tmp_path / 'table.bin', 0o644)
+    assert CachedTable.read(tmp_path / 'table.bin', ('stamp',))
+
+    # Neither are files with a wrong checksum for the pickled values:
+    data = bytearray((tmp_path / 'table.bin').read_bytes())
+    _, ldescription, lvalues = HEADER.unpack(data[:HEADER.size])
+    data[HEADER.size + ldescription + lvalues // 2] ^= 1
+    (tmp_path / 'table.bin').write_bytes(bytes(data))
+    assert CachedTable.read(tmp_path / 'table.bin', ('stamp',)) is None
+
+    CachedTable.from_rows([]).write(tmp_path / 'empty.bin', ('stamp',))
+    assert len(CachedTable.read(tmp_path / 'empty.bin', ('stamp',))) == 0
+
+
+def test_WordlistCache(dataset, mocker, cache_dir):
+    cldf = pycldf.Dataset.from_metadata(dataset.cldf_dir / 'cldf-metadata.json')
+    cache = WordlistCache(cldf)
+    for table in ['FormTable', 'LanguageTable', 'ParameterTable', 'CognateTable']:
+        assert list(cache[table]) == [dict(row) for row in cldf[table]]
+    assert cache['FormTable'] is cache['FormTable']
+    # The cache is written to the user's cache directory - not to the dataset:
+    assert cache.dir.joinpath('forms.csv.bin').exists()
+    assert cache_dir in cache.dir.parents
+    assert not any(p.suffix == '.bin' for p in dataset.dir.glob('**/*'))
+    row = next(cache.iter_rows('FormTable', 'id'))
+    assert row['id'] == row['ID']
+
+    # Now the tables are read from the cache:
+    cache = WordlistCache(cldf)
+    mocker.patch.object(CachedTable, 'from_rows', mocker.Mock(side_effect=ValueError))
+    assert len(cache['FormTable']) == len(list(cldf['FormTable']))
+
+    # Unless the data changed:
+    fname = dataset.cldf_dir / 'forms.csv'
+    os.utime(fname, ns=(fname.stat().st_atime_ns, fname.stat().st_mtime_ns + 1000))
+    with pytest.raises(ValueError):
+        _ = WordlistCache(cldf)['FormTable']
+
+
+def test_WordlistCache_eviction(dataset, mocker, cache_dir):
+    mocker.patch.object(tablecache, 'MAX_WORDLISTS', 2)
+    old = []
+    for i in range(3):
+        old.append(cache_dir / 'wordlists' / f'ds{i}')
+        old[-1].mkdir(parents=True)
+        old[-1].joinpath('forms.csv.bin').write_bytes(b'')
+        os.utime(old[-1], (i, i))
+    cldf = pycldf.Dataset.from_metadata(dataset.cldf_dir / 'cldf-metadata.json')
+    cache = WordlistCache(cldf)
+    _ = cache['FormTable']
+    # Only the least recently used caches are evicted:
+    assert cache.dir.exists() and old[2].exists()
+    assert not old[0].exists() and not old[1].exists()
+
+    # Reading from the cache marks it as recently used:
+    os.utime(cache.dir, (0, 0))
+    _ = WordlistCache(cldf)['FormTable']
+    assert cache.dir.stat().st_mtime > old[2].stat().st_mtime
+
+
+def test_WordlistCache_zipped(dataset):
+    fname = dataset.cldf_dir / 'forms.csv'
+    with zipfile.ZipFile(fname.parent / 'forms.csv.zip', 'w') as zipf:
+        zipf.write(fname, fname.name)
+    fname.unlink()
+    cldf = pycldf.Dataset.from_metadata(dataset.cldf_dir / 'cldf-metadata.json')
+    assert list(WordlistCache(cldf)['FormTable']) == [dict(row) for row in cldf['FormTable']]
@@ -2,7 +2,7 @@ import pytest
 
 import pyclts
 
-from pylexibank.transcription import analyze, Analysis, Report, analyze_segments
+from pylexibank.transcription import analyze, Analysis, Report, analyze_segments, CachedSegments
 
 
 def test_analyze(repos):
@@ -49,3 +49,22 @@ def test_Report(clts):
     assert rep.stats.invalid_words_count == 1
     assert '✓' in str(rep)
     assert 'stats' in rep.to_json()
+
+
+def test_CachedSegments(clts):
+    cache = CachedSegments()
+    assert cache.sounds(clts) is cache.sounds(clts)
+    assert cache.sounds(clts)['a'].bipa == 'a'
+    assert cache.sounds(clts)['a'].dolgo == 'V'
+    assert cache.stats() == (1, 1)
+    # Falsy results are cached, too:
+    assert cache.sounds(clts)[''].dolgo == ''
+    assert cache.sounds(clts)[''].dolgo == ''
+    assert cache.stats() == (2, 2)
+    cache.reset_stats()
+    assert cache.stats() == (0, 0)
+    with pytest.deprecated_call():
+        assert cache.get_bipa('a', clts) is cache.sounds(clts)['a']
+    with pytest.deprecated_call():
+        assert cache.get_dolgo('a', clts) == 'V'
+
@@ -1,3 +1,6 @@
+import sys
+import json
+import random
 from collections import Counter
 from pathlib import Path
 
@@ -18,6 +21,52 @@ def test_iter_repl(seq, subseq, repl, out):
     assert list(util.iter_repl(seq, subseq, repl)) == out
 
 
+@pytest.mark.parametrize(
+    'replacements,segments,out',
+    [
+        ({'x y': 'u', 'u': 'a b'}, ['x', 'y', 'u'], ['a', 'b', 'a', 'b']),
+        ({'u': 'a b', 'x y': 'u'}, ['x', 'y', 'u'], ['u', 'a', 'b']),
+        ({'a': 'b', 'b': 'c', 'c c': 'd'}, ['a', 'b', 'x'], ['d', 'x']),
+        ({'a': 'b', 'c': 'a', 'b b': 'c'}, ['a', 'c'], ['b', 'a']),
+        ({'a a': 'a'}, ['a', 'a', 'a'], ['a', 'a']),
+        ({'': 'a', 'b': ''}, ['b', 'c'], ['c']),
+        ({}, ['a'], ['a']),
+    ]
+)
+def test_SegmentReplacer(replacements, segments, out):
+    assert util.SegmentReplacer(replacements)(segments) == out
+
+
+def test_SegmentReplacer_equivalence():
+    rng = random.Random(42)
+    alphabet = 'abcdef'
+    replacements = {}
+    for _ in range(30):
+        replacements[' '.join(rng.choices(alphabet, k=rng.randint(1, 3)))] = \
+            ' '.join(rng.choices(alphabet, k=rng.randint(0, 3)))
+    replacer = util.SegmentReplacer(replacements)
+    for _ in range(200):
+        segments = rng.choices(alphabet, k=rng.randint(1, 10))
+        expected = segments
+        for k, v in replacements.items():
+            expected = list(util.iter_repl(expected, k.split(), v.split()))
+        assert replacer(segments) == expected
+
+
+def test_LRUCache():
+    cache = util.LRUCache(maxsize=2)
+    assert cache.get('a', lambda: 0) == 0
+    assert cache.get('a', lambda: 1) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache['b'] = 2
+    assert cache.get('a', lambda: 1) == 0
+    cache['c'] = 3
+    assert 'b' not in cache and 'a' in cache and len(cache) == 2
+    assert list(cache.values()) == [0, 3]
+    cache.reset_stats()
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
 def test_jsondump(tmp_path):
     fname = tmp_path / 'dump.json'
     res = util.jsondump({'a': 2}, fname)
@@ -95,3 +144,39 @@ def test_get_concepts(concepticon):
         id_factory=lambda c: c.number + 'x',
         lookup_factory=lambda c: c['chi'])
     assert id_lookup['xyz'] == '1x'
+
+
+def test_iter_requirements(tmp_path, monkeypatch):
+    def dist(name, version, entry_points='', direct_url=None):
+        d = tmp_path / f'{name}-{version}.dist-info'
+        d.mkdir()
+        d.joinpath('METADATA').write_text(
+            f'Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n', encoding='utf8')
+        d.joinpath('entry_points.txt').write_text(entry_points, encoding='utf8')
+        if direct_url:
+            d.joinpath('direct_url.json').write_text(json.dumps(direct_url), encoding='utf8')
+
+    dist('python-xyzmod', '1.0')
+    dist('lexibank_xyzds', '0.1', '[lexibank.dataset]\nxyzds = lexibank_xyzds:Dataset\n')
+    dist('xyzvcs', '0.1.dev0', direct_url=dict(
+        url='https://github.com/x/xyzvcs',
+        vcs_info=dict(vcs='git', commit_id='abc123'),
+        dir_info=dict(editable=True)))
+    dist('xyzarchive', '2.0', direct_url=dict(
+        url='https://example.org/xyzarchive.zip', archive_info={}, subdirectory='src'))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ['xyzmod', 'lexibank_xyzds', 'xyzvcs', 'xyzarchive']:
+        monkeypatch.setitem(sys.modules, name, None)
+    util.installed_distributions.cache_clear()
+    try:
+        reqs = {str(r) for r in util.iter_requirements()}
+        assert 'python-xyzmod==1.0' in reqs
+        # VCS installs are pinned to the commit:
+        assert 'xyzvcs @ git+https://github.com/x/xyzvcs@abc123' in reqs
+        assert 'xyzarchive @ https://example.org/xyzarchive.zip#subdirectory=src' in reqs
+        assert 'lexibank_xyzds==0.1' not in reqs
+        assert 'lexibank_xyzds==0.1' in {
+            str(r) for r in util.iter_requirements(exclude_datasets=False)}
+        assert util.installed_distributions() is util.installed_distributions()
+    finally:
+        util.installed_distributions.cache_clear()